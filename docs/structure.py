@@ -29,21 +29,36 @@ PAGES = [
         'functions': [
             boxes.apply_non_max_suppression,
             boxes.offset,
+            boxes.offset_boxes,
             boxes.clip,
+            boxes.clip_boxes,
             boxes.compute_iou,
             boxes.compute_ious,
             boxes.decode,
+            boxes.compute_decode_constants,
+            boxes.decode_with_constants,
             boxes.denormalize_box,
+            boxes.denormalize_boxes,
             boxes.encode,
             boxes.flip_left_right,
             boxes.make_box_square,
+            boxes.make_boxes_square,
             boxes.match,
+            boxes.index_prior_boxes,
+            boxes.match_with_index,
+            boxes.match_and_encode,
             boxes.nms_per_class,
+            boxes.nms_per_class_vectorized,
+            boxes.compute_pairwise_ious,
             boxes.to_image_coordinates,
             boxes.to_center_form,
             boxes.to_one_hot,
             boxes.to_normalized_coordinates,
             boxes.to_corner_form,
+            boxes.sample_expansion,
+            boxes.sample_crop,
+            boxes.crop_boxes,
+            boxes.compute_crop_flip_resize_matrix,
             boxes.extract_bounding_box_corners
         ],
     },
@@ -95,7 +110,15 @@ PAGES = [
                              camera.Camera.stop]),
             (camera.VideoPlayer, [camera.VideoPlayer.step,
                                   camera.VideoPlayer.run,
-                                  camera.VideoPlayer.record])
+                                  camera.VideoPlayer.record,
+                                  camera.VideoPlayer.statistics]),
+            (camera.FrameGrabber, [camera.FrameGrabber.start,
+                                   camera.FrameGrabber.read,
+                                   camera.FrameGrabber.stop]),
+            (camera.StageTimer, [camera.StageTimer.update]),
+            (camera.VideoProcessor, [camera.VideoProcessor.process]),
+            (camera.JSONLinesWriter, [camera.JSONLinesWriter.last_frame]),
+            (camera.NPZWriter, [camera.NPZWriter.last_frame])
         ],
     },
 
@@ -125,6 +148,8 @@ PAGES = [
         'functions': [
             image.resize_image,
             image.convert_color_space,
+            image.convert_color_space_batch,
+            image.apply_lookup_tables,
             image.load_image,
             image.show_image,
             image.warp_affine,
@@ -137,6 +162,11 @@ PAGES = [
             image.random_brightness,
             image.random_contrast,
             image.random_hue,
+            image.random_saturation_batch,
+            image.random_brightness_batch,
+            image.random_contrast_batch,
+            image.random_hue_batch,
+            image.random_saturation_hue_batch,
             image.flip_left_right,
             image.random_flip_left_right,
             image.crop_image,
@@ -186,6 +216,9 @@ PAGES = [
             heatmaps.get_tags_heatmap,
             heatmaps.get_keypoints_locations,
             heatmaps.get_top_k_keypoints_numpy,
+            heatmaps.max_pooling_heatmaps,
+            heatmaps.get_top_k_values,
+            heatmaps.extract_heatmap_peaks,
             heatmaps.get_valid_detections
         ],
     },
@@ -199,6 +232,8 @@ PAGES = [
             standard.get_transformation_scale,
             standard.compare_vertical_neighbours,
             standard.compare_horizontal_neighbours,
+            standard.compare_vertical_neighbours_batch,
+            standard.compare_horizontal_neighbours_batch,
             standard.get_all_indices_of_array,
             standard.gather_nd,
             standard.calculate_norm,
@@ -319,6 +354,7 @@ PAGES = [
             processors.RandomBrightness,
             processors.RandomContrast,
             processors.RandomHue,
+            processors.RandomSaturationHue,
             processors.ResizeImages,
             processors.ResizeImages,
             processors.RandomImageBlur,
@@ -364,6 +400,7 @@ PAGES = [
             processors.ToImageBoxCoordinates,
             processors.ToNormalizedBoxCoordinates,
             processors.RandomSampleCrop,
+            processors.RandomExpandCropFlipResize,
             processors.RandomTranslation,
             processors.RandomRotation,
             processors.RandomKeypointTranslation,
@@ -386,8 +423,10 @@ PAGES = [
             processors.ClipBoxes2D,
             processors.FilterClassBoxes2D,
             processors.CropBoxes2D,
+            processors.PredictBoxes2D,
             processors.ToBoxes2D,
             processors.MatchBoxes,
+            processors.MatchAndEncodeBoxes,
             processors.EncodeBoxes,
             processors.DecodeBoxes,
             processors.NonMaximumSuppressionPerClass,
@@ -477,7 +516,7 @@ PAGES = [
             processors.CopyDomain,
             processors.ExtendInputs,
             processors.SequenceWrapper,
-            processors.Predict,
+            (processors.Predict, [processors.Predict.call_batch]),
             processors.ToClassName,
             processors.ExpandDims,
             processors.BoxClassToOneHotVector,
@@ -591,6 +630,8 @@ PAGES = [
         'page': 'abstract/messages.md',
         'classes': [
             (messages.Box2D, [messages.Box2D.contains]),
+            (messages.Boxes2D, [messages.Boxes2D.to_list,
+                                messages.Boxes2D.from_list]),
             messages.Pose6D
         ]
     },
@@ -600,8 +641,11 @@ PAGES = [
     {
         'page': 'abstract/sequence.md',
         'classes': [
+            sequence.SequenceExtra,
             sequence.ProcessingSequence,
-            sequence.GeneratingSequence
+            sequence.GeneratingSequence,
+            sequence.ParallelProcessingSequence,
+            sequence.ParallelGeneratingSequence
         ]
     },
 
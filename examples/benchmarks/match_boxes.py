@@ -0,0 +1,44 @@
+import argparse
+from timeit import timeit
+
+import numpy as np
+from paz.models.detection.utils import create_prior_boxes
+from paz.processors import MatchBoxes
+
+description = 'Benchmark of the indexed and dense prior box matching'
+parser = argparse.ArgumentParser(description=description)
+parser.add_argument('-n', '--num_boxes', nargs='+', type=int,
+                    default=[1, 3, 10, 30],
+                    help='Number of ground truth boxes per sample')
+parser.add_argument('-r', '--repetitions', default=200, type=int,
+                    help='Number of repetitions per measurement')
+args = parser.parse_args()
+
+
+def sample_boxes(num_boxes, random_state):
+    x_min, y_min = random_state.uniform(0.0, 0.8, (2, num_boxes))
+    width, height = random_state.uniform(0.02, 0.5, (2, num_boxes))
+    class_args = random_state.randint(1, 21, num_boxes)
+    return np.stack([x_min, y_min, np.minimum(x_min + width, 1.0),
+                     np.minimum(y_min + height, 1.0), class_args], axis=1)
+
+
+random_state = np.random.RandomState(777)
+for model_name, configuration in [['SSD300', 'VOC'], ['SSD512', 'COCO']]:
+    prior_boxes = create_prior_boxes(configuration)
+    indexed = MatchBoxes(prior_boxes, indexed=True)
+    dense = MatchBoxes(prior_boxes, indexed=False)
+    print('{} with {} prior boxes'.format(model_name, len(prior_boxes)))
+    print('{:>6} {:>14} {:>14} {:>8}'.format(
+        'boxes', 'indexed [ms]', 'dense [ms]', 'speedup'))
+    for num_boxes in args.num_boxes:
+        boxes = sample_boxes(num_boxes, random_state)
+        assert np.array_equal(indexed(boxes.copy()), dense(boxes.copy()))
+        indexed_time = timeit(lambda: indexed(boxes.copy()),
+                              number=args.repetitions)
+        dense_time = timeit(lambda: dense(boxes.copy()),
+                            number=args.repetitions)
+        indexed_time = 1000 * indexed_time / args.repetitions
+        dense_time = 1000 * dense_time / args.repetitions
+        print('{:>6} {:>14.3f} {:>14.3f} {:>8.2f}'.format(
+            num_boxes, indexed_time, dense_time, dense_time / indexed_time))
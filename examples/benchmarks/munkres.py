@@ -0,0 +1,32 @@
+import argparse
+from timeit import timeit
+
+import numpy as np
+from paz.processors import Munkres
+
+description = 'Benchmark of the vectorized and step-wise Munkres solvers'
+parser = argparse.ArgumentParser(description=description)
+parser.add_argument('-s', '--sizes', nargs='+', type=int,
+                    default=[5, 10, 25, 50, 100, 200],
+                    help='Sizes of the square cost matrices')
+parser.add_argument('-r', '--repetitions', default=5, type=int,
+                    help='Number of repetitions per measurement')
+parser.add_argument('-m', '--max_stepwise_size', default=100, type=int,
+                    help='Largest size evaluated with the step-wise solver')
+args = parser.parse_args()
+
+vectorized, stepwise = Munkres(vectorized=True), Munkres(vectorized=False)
+print('{:>6} {:>16} {:>16}'.format(
+    'size', 'vectorized [ms]', 'step-wise [ms]'))
+for size in args.sizes:
+    cost_matrix = np.random.rand(size, size)
+    solve = (lambda: vectorized.compute(cost_matrix.copy()))
+    vectorized_time = 1000 * timeit(solve, number=args.repetitions)
+    vectorized_time = vectorized_time / args.repetitions
+    stepwise_time = np.nan
+    if size <= args.max_stepwise_size:
+        solve = (lambda: stepwise.compute(cost_matrix.copy()))
+        stepwise_time = 1000 * timeit(solve, number=args.repetitions)
+        stepwise_time = stepwise_time / args.repetitions
+    print('{:>6} {:>16.3f} {:>16.3f}'.format(
+        size, vectorized_time, stepwise_time))
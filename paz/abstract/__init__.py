@@ -1,4 +1,5 @@
 from .loader import Loader
 from .sequence import GeneratingSequence, ProcessingSequence
-from .messages import Box2D, Pose6D
+from .sequence import ParallelGeneratingSequence, ParallelProcessingSequence
+from .messages import Box2D, Boxes2D, Pose6D
 from .processor import Processor, SequentialProcessor
@@ -1,3 +1,5 @@
+import numpy as np
+
 from ..backend.groups.quaternion import rotation_vector_to_quaternion
 
 
@@ -86,6 +88,83 @@ class Box2D(object):
         return (inside_range_x and inside_range_y)
 
 
+class Boxes2D(object):
+    """Columnar set of bounding boxes 2D with class labels and scores.
+        Coordinates, scores and class indices are stored as arrays and
+        ``Box2D`` messages are only built when single boxes are accessed.
+
+    # Properties
+        coordinates: Numpy array of shape ``(num_boxes, 4)`` with the
+            ``[x_min, y_min, x_max, y_max]`` coordinates of every box.
+        scores: Numpy array of shape ``(num_boxes)``.
+        class_args: Numpy array of ints of shape ``(num_boxes)`` indicating
+            the class index of every box.
+        class_names: List of strings or ``None``. Maps ``class_args`` to
+            class names.
+
+    # Methods
+        to_list()
+        from_list()
+    """
+    def __init__(self, coordinates, scores, class_args, class_names=None):
+        self.coordinates = np.asarray(coordinates).reshape(-1, 4)
+        self.scores = np.asarray(scores).reshape(-1)
+        self.class_args = np.asarray(class_args, dtype=int).reshape(-1)
+        self.class_names = class_names
+
+    @property
+    def class_name(self):
+        """Numpy array of the class names of every box or ``None``."""
+        if self.class_names is None:
+            return None
+        return np.asarray(self.class_names, dtype=object)[self.class_args]
+
+    def __len__(self):
+        return len(self.coordinates)
+
+    def __getitem__(self, arg):
+        if isinstance(arg, (int, np.integer)):
+            class_name = None
+            if self.class_names is not None:
+                class_name = self.class_names[self.class_args[arg]]
+            return Box2D(self.coordinates[arg], self.scores[arg], class_name)
+        return Boxes2D(self.coordinates[arg], self.scores[arg],
+                       self.class_args[arg], self.class_names)
+
+    def __iter__(self):
+        for arg in range(len(self)):
+            yield self[arg]
+
+    def __repr__(self):
+        return 'Boxes2D({} boxes, {})'.format(len(self), self.class_names)
+
+    def to_list(self):
+        """Builds one ``Box2D`` message per box.
+
+        # Returns
+            List of ``Box2D`` messages.
+        """
+        return list(self)
+
+    @classmethod
+    def from_list(cls, boxes2D, class_names):
+        """Instantiates a ``Boxes2D`` object from a list of ``Box2D``.
+
+        # Arguments
+            boxes2D: List of ``Box2D`` messages.
+            class_names: List of strings containing all box class names.
+
+        # Returns
+            ``Boxes2D`` object.
+        """
+        class_to_arg = dict(zip(class_names, range(len(class_names))))
+        coordinates = [box2D.coordinates for box2D in boxes2D]
+        scores = [box2D.score for box2D in boxes2D]
+        class_args = [class_to_arg[box2D.class_name] for box2D in boxes2D]
+        coordinates = np.array(coordinates, dtype=float).reshape(-1, 4)
+        return cls(coordinates, scores, class_args, class_names)
+
+
 class Pose6D(object):
     """ Pose estimation results with 6D coordinates.
 
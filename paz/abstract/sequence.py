@@ -1,27 +1,103 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 from tensorflow.keras.utils import Sequence
 import numpy as np
 from .processor import SequentialProcessor
 
 
 class SequenceExtra(Sequence):
-    def __init__(self, pipeline, batch_size, as_list=False):
+    """Base class of the sequences that place the processed samples of
+    ``pipeline`` into batches.
+
+    # Arguments
+        pipeline: ``SequentialProcessor`` ending with a ``SequenceWrapper``.
+        batch_size: Int.
+        as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
+            lists. If false ``inputs`` and ``labels`` are dispatched as
+            dictionaries.
+        dtype: Numpy dtype of the batches of every tensor whose dtype is
+            not declared in the ``SequenceWrapper`` of the pipeline.
+        num_buffers: Int or ``None``. If ``None`` new batches are allocated
+            at every step. Otherwise batches are written into a ring of
+            ``num_buffers`` preallocated buffers handed out in round-robin
+            order. It must be larger than the number of batches held at
+            the same time e.g. by the queue of ``model.fit``.
+        batch_processors: Dictionary or ``None``. Maps input names to
+            processors applied to the processed samples of the batch of that
+            input once all of them are placed e.g.
+            ``{'image': AugmentImage(batch=True)}``. These inputs must be
+            declared with dtype ``uint8``.
+    """
+    def __init__(self, pipeline, batch_size, as_list=False, dtype=np.float64,
+                 num_buffers=None, batch_processors=None):
         if not isinstance(pipeline, SequentialProcessor):
             raise ValueError('``processor`` must be a ``SequentialProcessor``')
         self.output_wrapper = pipeline.processors[-1]
         self.pipeline = pipeline
         self.inputs_name_to_shape = self.output_wrapper.inputs_name_to_shape
         self.labels_name_to_shape = self.output_wrapper.labels_name_to_shape
+        self.inputs_name_to_dtype = getattr(
+            self.output_wrapper, 'inputs_name_to_dtype', {})
+        self.labels_name_to_dtype = getattr(
+            self.output_wrapper, 'labels_name_to_dtype', {})
         self.ordered_input_names = self.output_wrapper.ordered_input_names
         self.ordered_label_names = self.output_wrapper.ordered_label_names
         self.batch_size = batch_size
         self.as_list = as_list
+        self.dtype = dtype
+        self.num_buffers = num_buffers
+        if batch_processors is None:
+            batch_processors = {}
+        self._validate_batch_processors(batch_processors)
+        self.batch_processors = batch_processors
+        self._buffers = []
+        self._buffer_arg = 0
+        self._buffer_lock = threading.Lock()
+
+    def _validate_batch_processors(self, batch_processors):
+        for name in batch_processors.keys():
+            if name not in self.inputs_name_to_shape:
+                raise ValueError('Invalid batch processor input %s' % name)
+            dtype = self.inputs_name_to_dtype.get(name, self.dtype)
+            if np.dtype(dtype) != np.uint8:
+                raise ValueError('Batch processor input %s must be of type '
+                                 '``uint8``' % name)
 
-    def make_empty_batches(self, name_to_shape):
+    def make_empty_batches(self, name_to_shape, name_to_dtype=None):
+        if name_to_dtype is None:
+            name_to_dtype = {}
         batch = {}
         for name, shape in name_to_shape.items():
-            batch[name] = np.zeros((self.batch_size, *shape))
+            dtype = name_to_dtype.get(name, self.dtype)
+            batch[name] = np.zeros((self.batch_size, *shape), dtype)
         return batch
 
+    def _make_empty_buffers(self):
+        inputs = self.make_empty_batches(
+            self.inputs_name_to_shape, self.inputs_name_to_dtype)
+        labels = self.make_empty_batches(
+            self.labels_name_to_shape, self.labels_name_to_dtype)
+        return inputs, labels
+
+    def _get_empty_buffers(self):
+        """Returns new zero-filled batches if ``num_buffers`` is ``None``.
+        Otherwise it hands out a ring of ``num_buffers`` preallocated
+        batches in round-robin order.
+        """
+        if self.num_buffers is None:
+            return self._make_empty_buffers()
+        with self._buffer_lock:
+            if self._buffer_arg == len(self._buffers):
+                self._buffers.append(self._make_empty_buffers())
+            buffers = self._buffers[self._buffer_arg]
+            self._buffer_arg = (self._buffer_arg + 1) % self.num_buffers
+        return buffers
+
+    def _clear_samples(self, batch, start_arg):
+        for data in batch.values():
+            data[start_arg:] = 0
+
     def _to_list(self, batch, names):
         return [batch[name] for name in names]
 
@@ -35,10 +111,16 @@ class SequenceExtra(Sequence):
         unprocessed_batch = data[batch_arg_A:batch_arg_B]
         return unprocessed_batch
 
+    def _count_samples(self, batch_index):
+        return self.batch_size
+
     def __getitem__(self, batch_index):
-        inputs = self.make_empty_batches(self.inputs_name_to_shape)
-        labels = self.make_empty_batches(self.labels_name_to_shape)
+        inputs, labels = self._get_empty_buffers()
         inputs, labels = self.process_batch(inputs, labels, batch_index)
+        num_samples = self._count_samples(batch_index)
+        for name, processor in self.batch_processors.items():
+            batch = inputs[name][:num_samples]
+            inputs[name][:num_samples] = processor(batch)
         if self.as_list:
             inputs = self._to_list(inputs, self.ordered_input_names)
             labels = self._to_list(labels, self.ordered_label_names)
@@ -47,6 +129,17 @@ class SequenceExtra(Sequence):
     def process_batch(self, inputs, labels, batch_index=None):
         raise NotImplementedError
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_buffers'] = []
+        state['_buffer_arg'] = 0
+        del state['_buffer_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._buffer_lock = threading.Lock()
+
 
 class ProcessingSequence(SequenceExtra):
     """Sequence generator used for processing samples given in ``data``.
@@ -58,15 +151,21 @@ class ProcessingSequence(SequenceExtra):
         as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
             lists. If false ``inputs`` and ``labels`` are dispatched as
             dictionaries.
+        dtype, num_buffers, batch_processors: See ``SequenceExtra``.
     """
-    def __init__(self, processor, batch_size, data, as_list=False):
+    def __init__(self, processor, batch_size, data, as_list=False,
+                 dtype=np.float64, num_buffers=None, batch_processors=None):
         self.data = data
         super(ProcessingSequence, self).__init__(
-            processor, batch_size, as_list)
+            processor, batch_size, as_list, dtype, num_buffers,
+            batch_processors)
 
     def __len__(self):
         return int(np.ceil(len(self.data) / float(self.batch_size)))
 
+    def _count_samples(self, batch_index):
+        return len(self._get_unprocessed_batch(self.data, batch_index))
+
     def process_batch(self, inputs, labels, batch_index):
         unprocessed_batch = self._get_unprocessed_batch(self.data, batch_index)
 
@@ -74,6 +173,8 @@ class ProcessingSequence(SequenceExtra):
             sample = self.pipeline(unprocessed_sample.copy())
             self._place_sample(sample['inputs'], sample_arg, inputs)
             self._place_sample(sample['labels'], sample_arg, labels)
+        self._clear_samples(inputs, len(unprocessed_batch))
+        self._clear_samples(labels, len(unprocessed_batch))
         return inputs, labels
 
 
@@ -87,11 +188,14 @@ class GeneratingSequence(SequenceExtra):
         as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
             lists. If false ``inputs`` and ``labels`` are dispatched as
             dictionaries.
+        dtype, num_buffers, batch_processors: See ``SequenceExtra``.
     """
-    def __init__(self, processor, batch_size, num_steps, as_list=False):
+    def __init__(self, processor, batch_size, num_steps, as_list=False,
+                 dtype=np.float64, num_buffers=None, batch_processors=None):
         self.num_steps = num_steps
         super(GeneratingSequence, self).__init__(
-            processor, batch_size, as_list)
+            processor, batch_size, as_list, dtype, num_buffers,
+            batch_processors)
 
     def __len__(self):
         return self.num_steps
@@ -102,3 +206,217 @@ class GeneratingSequence(SequenceExtra):
             self._place_sample(sample['inputs'], sample_arg, inputs)
             self._place_sample(sample['labels'], sample_arg, labels)
         return inputs, labels
+
+
+_WORKER_PIPELINE = None
+
+
+def _initialize_worker(pipeline):
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = pipeline
+
+
+def _process_sample(sample, seed=None, pipeline=None):
+    """Processes a single sample inside a thread or process worker.
+    Samples equal to ``None`` are generated by calling the pipeline without
+    arguments.
+    """
+    if pipeline is None:
+        pipeline = _WORKER_PIPELINE
+    if seed is not None:
+        np.random.seed(seed)
+    if sample is None:
+        return pipeline()
+    return pipeline(sample.copy())
+
+
+class ParallelSequenceExtra(SequenceExtra):
+    """Sequence that processes the samples of each batch in a pool of
+    workers and prefetches the following batches.
+
+    # Arguments
+        pipeline: ``SequentialProcessor`` used for processing each sample.
+        batch_size: Int.
+        as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
+            lists. If false ``inputs`` and ``labels`` are dispatched as
+            dictionaries.
+        num_workers: Int. Number of workers processing samples.
+        use_processes: Bool. If ``True`` samples are processed in a pool of
+            processes, else in a pool of threads. The pipeline must be
+            picklable when using processes.
+        max_queue_size: Int. Maximum number of batches being prefetched.
+        seed: Int or ``None``. When using processes, every sample is
+            processed with its own seed derived from ``seed``, the epoch,
+            the batch index and its position in the batch. Batches are
+            therefore reproducible regardless of which worker processed
+            them. Threads run the pipeline concurrently on the shared
+            global numpy random state, therefore random draws in thread
+            mode are not reproducible.
+        dtype, num_buffers, batch_processors: See ``SequenceExtra``.
+    """
+    def __init__(self, pipeline, batch_size, as_list=False, num_workers=4,
+                 use_processes=False, max_queue_size=4, seed=None,
+                 dtype=np.float64, num_buffers=None, batch_processors=None):
+        super(ParallelSequenceExtra, self).__init__(
+            pipeline, batch_size, as_list, dtype, num_buffers,
+            batch_processors)
+        self.num_workers = num_workers
+        self.use_processes = use_processes
+        self.max_queue_size = max_queue_size
+        if seed is None:
+            seed = np.random.randint(0, 2**31 - 1)
+        self.seed = seed
+        self.epoch = 0
+        self._executor = None
+        self._pending_batches = {}
+
+    def _get_samples(self, batch_index):
+        raise NotImplementedError
+
+    def _build_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(
+                self.num_workers, initializer=_initialize_worker,
+                initargs=(self.pipeline,))
+        return ThreadPoolExecutor(self.num_workers)
+
+    def _compute_seed(self, batch_index, sample_arg):
+        entropy = [self.seed, self.epoch, batch_index, sample_arg]
+        return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+    def _submit_batch(self, batch_index):
+        if self._executor is None:
+            self._executor = self._build_executor()
+        futures = []
+        for sample_arg, sample in enumerate(self._get_samples(batch_index)):
+            if self.use_processes:
+                seed = self._compute_seed(batch_index, sample_arg)
+                args = (_process_sample, sample, seed)
+            else:
+                args = (_process_sample, sample, None, self.pipeline)
+            futures.append(self._executor.submit(*args))
+        return futures
+
+    def _prefetch(self, batch_index):
+        next_index = batch_index + 1
+        while ((len(self._pending_batches) < self.max_queue_size) and
+               (next_index < len(self))):
+            if next_index not in self._pending_batches:
+                futures = self._submit_batch(next_index)
+                self._pending_batches[next_index] = futures
+            next_index = next_index + 1
+
+    def process_batch(self, inputs, labels, batch_index):
+        futures = self._pending_batches.pop(batch_index, None)
+        if futures is None:
+            futures = self._submit_batch(batch_index)
+        self._prefetch(batch_index)
+        for sample_arg, future in enumerate(futures):
+            sample = future.result()
+            self._place_sample(sample['inputs'], sample_arg, inputs)
+            self._place_sample(sample['labels'], sample_arg, labels)
+        self._clear_samples(inputs, len(futures))
+        self._clear_samples(labels, len(futures))
+        return inputs, labels
+
+    def _cancel_pending_batches(self):
+        for futures in self._pending_batches.values():
+            for future in futures:
+                future.cancel()
+        self._pending_batches = {}
+
+    def on_epoch_end(self):
+        self._cancel_pending_batches()
+        self.epoch = self.epoch + 1
+
+    def close(self):
+        """Cancels all prefetched batches and shuts down the workers.
+        """
+        self._cancel_pending_batches()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def __getstate__(self):
+        state = super(ParallelSequenceExtra, self).__getstate__()
+        state['_executor'] = None
+        state['_pending_batches'] = {}
+        return state
+
+
+class ParallelProcessingSequence(ParallelSequenceExtra):
+    """Sequence generator used for processing samples given in ``data``
+    with a pool of workers. Batches are returned in the same order and
+    with the same layout as in ``ProcessingSequence``.
+
+    # Arguments
+        processor: Function, used for processing elements of ``data``.
+        batch_size: Int.
+        data: List. Each element of the list is processed by ``processor``.
+        as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
+            lists. If false ``inputs`` and ``labels`` are dispatched as
+            dictionaries.
+        num_workers: Int. Number of workers processing samples.
+        use_processes: Bool. If ``True`` samples are processed in a pool of
+            processes, else in a pool of threads.
+        max_queue_size: Int. Maximum number of batches being prefetched.
+        seed: Int or ``None``. Seed from which the seed of each processed
+            sample is derived when ``use_processes`` is ``True``.
+        dtype, num_buffers, batch_processors: See ``SequenceExtra``.
+
+    # Notes
+        Prefetching assumes batches are requested in increasing order.
+        Use ``model.fit(..., shuffle=False)`` and shuffle ``data`` instead.
+    """
+    def __init__(self, processor, batch_size, data, as_list=False,
+                 num_workers=4, use_processes=False, max_queue_size=4,
+                 seed=None, dtype=np.float64, num_buffers=None,
+                 batch_processors=None):
+        self.data = data
+        super(ParallelProcessingSequence, self).__init__(
+            processor, batch_size, as_list, num_workers, use_processes,
+            max_queue_size, seed, dtype, num_buffers, batch_processors)
+
+    def __len__(self):
+        return int(np.ceil(len(self.data) / float(self.batch_size)))
+
+    def _count_samples(self, batch_index):
+        return len(self._get_unprocessed_batch(self.data, batch_index))
+
+    def _get_samples(self, batch_index):
+        return self._get_unprocessed_batch(self.data, batch_index)
+
+
+class ParallelGeneratingSequence(ParallelSequenceExtra):
+    """Sequence generator used for generating samples with a pool of
+    workers.
+
+    # Arguments
+        processor: Function used for generating and processing ``samples``.
+        batch_size: Int.
+        num_steps: Int. Number of steps for each epoch.
+        as_list: Bool, if True ``inputs`` and ``labels`` are dispatched as
+            lists. If false ``inputs`` and ``labels`` are dispatched as
+            dictionaries.
+        num_workers: Int. Number of workers generating samples.
+        use_processes: Bool. If ``True`` samples are generated in a pool of
+            processes, else in a pool of threads.
+        max_queue_size: Int. Maximum number of batches being prefetched.
+        seed: Int or ``None``. Seed from which the seed of each generated
+            sample is derived when ``use_processes`` is ``True``.
+        dtype, num_buffers, batch_processors: See ``SequenceExtra``.
+    """
+    def __init__(self, processor, batch_size, num_steps, as_list=False,
+                 num_workers=4, use_processes=False, max_queue_size=4,
+                 seed=None, dtype=np.float64, num_buffers=None,
+                 batch_processors=None):
+        self.num_steps = num_steps
+        super(ParallelGeneratingSequence, self).__init__(
+            processor, batch_size, as_list, num_workers, use_processes,
+            max_queue_size, seed, dtype, num_buffers, batch_processors)
+
+    def __len__(self):
+        return self.num_steps
+
+    def _get_samples(self, batch_index):
+        return [None] * self.batch_size
@@ -23,18 +23,19 @@ def to_corner_form(boxes):
     """Transform from center coordinates to corner coordinates.
 
     # Arguments
-        boxes: Numpy array with shape `(num_boxes, 4)`.
+        boxes: Numpy array with shape `(num_boxes, 4)` or with any number of
+            leading dimensions e.g. `(batch_size, num_boxes, 4)`.
 
     # Returns
-        Numpy array with shape `(num_boxes, 4)`.
+        Numpy array with the same shape as `boxes`.
     """
-    center_x, center_y = boxes[:, 0:1], boxes[:, 1:2]
-    W, H = boxes[:, 2:3], boxes[:, 3:4]
+    center_x, center_y = boxes[..., 0:1], boxes[..., 1:2]
+    W, H = boxes[..., 2:3], boxes[..., 3:4]
     x_min = center_x - (W / 2.0)
     x_max = center_x + (W / 2.0)
     y_min = center_y - (H / 2.0)
     y_max = center_y + (H / 2.0)
-    return np.concatenate([x_min, y_min, x_max, y_max], axis=1)
+    return np.concatenate([x_min, y_min, x_max, y_max], axis=-1)
 
 
 def encode(matched, priors, variances=[0.1, 0.1, 0.2, 0.2]):
@@ -71,22 +72,77 @@ def decode(predictions, priors, variances=[0.1, 0.1, 0.2, 0.2]):
     """Decode default boxes into the ground truth boxes
 
     # Arguments
-        loc: Numpy array of shape `(num_priors, 4)`.
+        loc: Numpy array of shape `(num_priors, 4)` or
+            `(batch_size, num_priors, 4)`.
         priors: Numpy array of shape `(num_priors, 4)`.
         variances: List of two floats. Variances of prior boxes.
 
     # Returns
-        decoded boxes: Numpy array of shape `(num_priors, 4)`.
+        decoded boxes: Numpy array with the same shape as `predictions`.
     """
-    center_x = predictions[:, 0:1] * priors[:, 2:3] * variances[0]
+    center_x = predictions[..., 0:1] * priors[:, 2:3] * variances[0]
     center_x = center_x + priors[:, 0:1]
-    center_y = predictions[:, 1:2] * priors[:, 3:4] * variances[1]
+    center_y = predictions[..., 1:2] * priors[:, 3:4] * variances[1]
     center_y = center_y + priors[:, 1:2]
-    W = priors[:, 2:3] * np.exp(predictions[:, 2:3] * variances[2])
-    H = priors[:, 3:4] * np.exp(predictions[:, 3:4] * variances[3])
-    boxes = np.concatenate([center_x, center_y, W, H], axis=1)
+    W = priors[:, 2:3] * np.exp(predictions[..., 2:3] * variances[2])
+    H = priors[:, 3:4] * np.exp(predictions[..., 3:4] * variances[3])
+    boxes = np.concatenate([center_x, center_y, W, H], axis=-1)
     boxes = to_corner_form(boxes)
-    return np.concatenate([boxes, predictions[:, 4:]], 1)
+    return np.concatenate([boxes, predictions[..., 4:]], -1)
+
+
+def compute_decode_constants(priors, variances=[0.1, 0.1, 0.2, 0.2],
+                             dtype=np.float32):
+    """Precomputes the prior box constants used by ``decode_with_constants``.
+    Constants are stored with the coordinates in the first axis.
+
+    # Arguments
+        priors: Numpy array of shape `(num_priors, 4)`.
+        variances: List of four floats. Variances of prior boxes.
+        dtype: Numpy dtype of the constants.
+
+    # Returns
+        Three numpy arrays: scales of shape `(4, num_priors)`, offsets of
+            shape `(4, num_priors)` and half sizes of shape
+            `(2, num_priors)`.
+    """
+    scales = np.empty((4, len(priors)))
+    scales[0] = priors[:, 2] * variances[0]
+    scales[1] = priors[:, 3] * variances[1]
+    scales[2] = variances[2]
+    scales[3] = variances[3]
+    offsets = np.zeros((4, len(priors)))
+    offsets[0:2] = priors[:, 0:2].T
+    half_sizes = priors[:, 2:4].T / 2.0
+    return (scales.astype(dtype), offsets.astype(dtype),
+            half_sizes.astype(dtype))
+
+
+def decode_with_constants(predictions, scales, offsets, half_sizes):
+    """Decode default boxes as ``decode`` using the constants given by
+    ``compute_decode_constants``.
+
+    # Arguments
+        predictions: Numpy array of shape `(num_priors, 4 + num_classes)`
+            or `(batch_size, num_priors, 4 + num_classes)`.
+        scales: Numpy array of shape `(4, num_priors)`.
+        offsets: Numpy array of shape `(4, num_priors)`.
+        half_sizes: Numpy array of shape `(2, num_priors)`.
+
+    # Returns
+        decoded boxes: Numpy array with the same shape as `predictions`.
+    """
+    # coordinates are moved to the second to last axis for long inner loops
+    boxes = np.swapaxes(predictions[..., 0:4], -1, -2) * scales
+    boxes += offsets
+    box_half_sizes = np.exp(boxes[..., 2:4, :], out=boxes[..., 2:4, :])
+    box_half_sizes *= half_sizes
+    decoded = predictions.astype(boxes.dtype, copy=True)
+    decoded_boxes = np.swapaxes(decoded[..., 0:4], -1, -2)
+    np.subtract(boxes[..., 0:2, :], box_half_sizes,
+                out=decoded_boxes[..., 0:2, :])
+    np.add(boxes[..., 0:2, :], box_half_sizes, out=decoded_boxes[..., 2:4, :])
+    return decoded
 
 
 def compute_ious(boxes_A, boxes_B):
@@ -177,6 +233,203 @@ def match(boxes, prior_boxes, positive_iou=0.5, negative_iou=0.0):
     return matched_boxes
 
 
+def index_prior_boxes(prior_boxes, decimals=2, num_rows=32):
+    """Builds a spatial index of prior boxes used by ``match_with_index``.
+    Prior boxes are bucketed by their rounded width and height and by rows
+    of their center y-coordinate. Inside each bucket prior boxes are sorted
+    by their center x-coordinate. The corner form and areas of the prior
+    boxes are also cached.
+
+    # Arguments
+        prior_boxes: Numpy array of shape `(num_prior_boxes, 4)`.
+            where the four coordinates are in center form coordinates.
+        decimals: Int. Number of decimals used to bucket prior box shapes.
+        num_rows: Int. Number of rows used to bucket prior box centers.
+
+    # Returns
+        Dictionary with the prior boxes index.
+    """
+    corners = to_corner_form(prior_boxes)
+    areas = (corners[:, 2] - corners[:, 0]) * (corners[:, 3] - corners[:, 1])
+    y_min, y_max = np.min(prior_boxes[:, 1]), np.max(prior_boxes[:, 1])
+    rows = (prior_boxes[:, 1] - y_min) / max(y_max - y_min, 1e-8)
+    rows = np.minimum(np.floor(rows * num_rows), num_rows - 1)
+    buckets = np.concatenate(
+        [np.round(prior_boxes[:, 2:4], decimals), rows[:, None]], axis=1)
+    buckets, bucket_args = np.unique(buckets, axis=0, return_inverse=True)
+    bucket_args = bucket_args.ravel()
+    num_buckets = len(buckets)
+    half_widths = np.zeros(num_buckets)
+    np.maximum.at(half_widths, bucket_args, (corners[:, 2] - corners[:, 0]))
+    half_widths = half_widths / 2.0
+    bucket_y_min = np.full(num_buckets, np.inf)
+    np.minimum.at(bucket_y_min, bucket_args, corners[:, 1])
+    bucket_y_max = np.full(num_buckets, -np.inf)
+    np.maximum.at(bucket_y_max, bucket_args, corners[:, 3])
+    x_min, x_max = np.min(prior_boxes[:, 0]), np.max(prior_boxes[:, 0])
+    x_range = x_max - x_min
+    # buckets are separated by empty gaps of size x_range + 1 in the keys
+    span = 2.0 * x_range + 1.0
+    keys = (bucket_args * span) + (prior_boxes[:, 0] - x_min)
+    order = np.argsort(keys, kind='stable')
+    return {'corners': corners, 'areas': areas, 'order': order,
+            'keys': keys[order], 'half_widths': half_widths,
+            'y_min': bucket_y_min, 'y_max': bucket_y_max,
+            'x_min': x_min, 'x_range': x_range, 'span': span,
+            'tolerance': 1e-6 * span}
+
+
+def compute_candidate_pairs(boxes, prior_index):
+    """Finds all pairs of prior boxes and boxes that overlap.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4)` in corner form.
+        prior_index: Dictionary built with ``index_prior_boxes``.
+
+    # Returns
+        Two arrays with the prior box and box argument of each pair.
+    """
+    half_widths, x_min = prior_index['half_widths'], prior_index['x_min']
+    x_range, tolerance = prior_index['x_range'], prior_index['tolerance']
+    num_buckets, num_boxes = len(half_widths), len(boxes)
+    lower = boxes[None, :, 0] - half_widths[:, None] - x_min
+    upper = boxes[None, :, 2] + half_widths[:, None] - x_min
+    lower = np.clip(lower, -tolerance, x_range + tolerance) - tolerance
+    upper = np.clip(upper, -tolerance, x_range + tolerance) + tolerance
+    offsets = np.arange(num_buckets)[:, None] * prior_index['span']
+    lower_args = np.searchsorted(prior_index['keys'], lower + offsets, 'left')
+    upper_args = np.searchsorted(prior_index['keys'], upper + offsets, 'right')
+    y_overlaps = np.logical_and(
+        prior_index['y_min'][:, None] < boxes[None, :, 3],
+        prior_index['y_max'][:, None] > boxes[None, :, 1])
+    counts = np.where(y_overlaps, upper_args - lower_args, 0).ravel()
+    starts = np.repeat(lower_args.ravel() - np.cumsum(counts) + counts, counts)
+    prior_args = prior_index['order'][starts + np.arange(np.sum(counts))]
+    box_args = np.repeat(np.tile(np.arange(num_boxes), num_buckets), counts)
+    priors, boxes = prior_index['corners'][prior_args], boxes[box_args]
+    overlaps = ((priors[:, 0] < boxes[:, 2]) & (priors[:, 2] > boxes[:, 0]) &
+                (priors[:, 1] < boxes[:, 3]) & (priors[:, 3] > boxes[:, 1]))
+    return prior_args[overlaps], box_args[overlaps]
+
+
+def compute_max_matches_with_index(boxes, prior_index):
+    """Computes for each prior box the box with the largest intersection
+    over union, considering only overlapping prior boxes and boxes.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4 + 1)` in corner form.
+        prior_index: Dictionary built with ``index_prior_boxes``.
+
+    # Returns
+        Two numpy arrays of shape `(num_prior_boxes)` with the largest
+            intersection over union and the argument of its box. Ties are
+            resolved with the first box as in ``np.argmax``.
+    """
+    prior_args, box_args = compute_candidate_pairs(boxes, prior_index)
+    priors, pair_boxes = prior_index['corners'][prior_args], boxes[box_args]
+    xy_min = np.maximum(priors[:, 0:2], pair_boxes[:, 0:2])
+    xy_max = np.minimum(priors[:, 2:4], pair_boxes[:, 2:4])
+    intersection = np.maximum(0.0, xy_max - xy_min)
+    intersection_area = intersection[:, 0] * intersection[:, 1]
+    box_areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union_area = (prior_index['areas'][prior_args] + box_areas[box_args]
+                  ) - intersection_area
+    union_area = np.maximum(union_area, 1e-8)
+    ious = np.clip(intersection_area / union_area, 0.0, 1.0)
+
+    num_priors = len(prior_index['corners'])
+    per_prior_which_box_iou = np.zeros(num_priors, dtype=ious.dtype)
+    np.maximum.at(per_prior_which_box_iou, prior_args, ious)
+    is_max = ious == per_prior_which_box_iou[prior_args]
+    per_prior_which_box_arg = np.full(num_priors, len(boxes))
+    np.minimum.at(
+        per_prior_which_box_arg, prior_args[is_max], box_args[is_max])
+    # without overlaps ``np.argmax`` selects the first box
+    per_prior_which_box_arg[per_prior_which_box_iou == 0.0] = 0
+    return per_prior_which_box_iou, per_prior_which_box_arg
+
+
+def match_with_index(boxes, prior_index, positive_iou=0.5):
+    """Matches each prior box with a ground truth box as ``match``, but
+    computing intersection over unions only between overlapping boxes.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_ground_truh_boxes, 4 + 1)`,
+            where the first the first four coordinates correspond to
+            box coordinates and the last coordinates is the class
+            argument. This boxes should be the ground truth boxes.
+        prior_index: Dictionary built with ``index_prior_boxes``.
+        positive_iou: Float between [0, 1]. Intersection over union
+            used to determine which box is considered a positive box.
+
+    # Returns
+        numpy array of shape `(num_prior_boxes, 4 + 1)`. Identical to the
+            output of ``match``.
+    """
+    max_matches = compute_max_matches_with_index(boxes, prior_index)
+    per_prior_which_box_iou, per_prior_which_box_arg = max_matches
+    matched_boxes = np.take(boxes, per_prior_which_box_arg, axis=0)
+    positive_mask = np.greater_equal(per_prior_which_box_iou, positive_iou)
+    matched_boxes[:, 4] = np.where(positive_mask, matched_boxes[:, 4], 0.0)
+    return matched_boxes
+
+
+def match_and_encode(boxes, prior_boxes, prior_index, num_classes,
+                     positive_iou=0.5, variances=[0.1, 0.1, 0.2, 0.2],
+                     output=None):
+    """Matches, encodes and one-hot encodes the classes of ground truth
+    boxes writing the results in a single output array. The results are
+    equal to applying ``match``, ``encode`` and ``to_one_hot``.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4 + 1)` in corner form
+            with the class argument in the last coordinate.
+        prior_boxes: Numpy array of shape `(num_prior_boxes, 4)`.
+            where the four coordinates are in center form coordinates.
+        prior_index: Dictionary built with ``index_prior_boxes``.
+        num_classes: Int. Total number of classes.
+        positive_iou: Float between [0, 1]. Intersection over union
+            used to determine which box is considered a positive box.
+        variances: List of four floats.
+        output: Numpy array of shape `(num_prior_boxes, 4 + num_classes)`
+            or None.
+
+    # Returns
+        Numpy array of shape `(num_prior_boxes, 4 + num_classes)`
+            containing the encoded boxes and one-hot vectors. Without
+            boxes all prior boxes are background with zero encoded boxes.
+    """
+    num_priors = len(prior_boxes)
+    if output is None:
+        output = np.empty((num_priors, 4 + num_classes), dtype=np.float32)
+    output[:, 4:] = 0.0
+    if len(boxes) == 0:
+        output[:, :4] = 0.0
+        output[:, 4] = 1.0
+        return output
+
+    max_matches = compute_max_matches_with_index(boxes, prior_index)
+    per_prior_which_box_iou, box_args = max_matches
+    # center form of the ground truth boxes is gathered for all priors
+    x_min, y_min = boxes[:, 0], boxes[:, 1]
+    x_max, y_max = boxes[:, 2], boxes[:, 3]
+    center_x, center_y = (x_max + x_min) / 2.0, (y_max + y_min) / 2.0
+    W, H = x_max - x_min, y_max - y_min
+    output[:, 0] = ((center_x[box_args] - prior_boxes[:, 0]) /
+                    prior_boxes[:, 2]) / variances[0]
+    output[:, 1] = ((center_y[box_args] - prior_boxes[:, 1]) /
+                    prior_boxes[:, 3]) / variances[1]
+    output[:, 2] = np.log(
+        (W[box_args] / prior_boxes[:, 2]) + 1e-8) / variances[2]
+    output[:, 3] = np.log(
+        (H[box_args] / prior_boxes[:, 3]) + 1e-8) / variances[3]
+
+    positive_mask = np.greater_equal(per_prior_which_box_iou, positive_iou)
+    class_args = np.where(positive_mask, boxes[box_args, 4], 0.0)
+    output[np.arange(num_priors), 4 + class_args.astype(int)] = 1.0
+    return output
+
+
 def match2(boxes, prior_boxes, iou_threshold=0.5):
     """Matches each prior box with a ground truth box (box from `boxes`).
     It then selects which matched box will be considered positive e.g. iou > .5
@@ -349,6 +602,99 @@ def nms_per_class(box_data, nms_thresh=.45, conf_thresh=0.01, top_k=200):
     return output
 
 
+def compute_pairwise_ious(boxes):
+    """Calculates the intersection over union between all pairs of boxes
+    sharing the same leading dimensions. The operations follow the same order
+    as in ``apply_non_max_suppression`` such that both give identical values.
+
+    # Arguments
+        boxes: Numpy array with shape `(..., num_boxes, 4)` in corner form.
+
+    # Returns
+        Numpy array of shape `(..., num_boxes, num_boxes)`.
+    """
+    x_min, y_min = boxes[..., 0], boxes[..., 1]
+    x_max, y_max = boxes[..., 2], boxes[..., 3]
+    areas = (x_max - x_min) * (y_max - y_min)
+    inner_x_min = np.maximum(x_min[..., None, :], x_min[..., :, None])
+    inner_y_min = np.maximum(y_min[..., None, :], y_min[..., :, None])
+    inner_x_max = np.minimum(x_max[..., None, :], x_max[..., :, None])
+    inner_y_max = np.minimum(y_max[..., None, :], y_max[..., :, None])
+    inner_box_widths = np.maximum(inner_x_max - inner_x_min, 0.0)
+    inner_box_heights = np.maximum(inner_y_max - inner_y_min, 0.0)
+    intersections = inner_box_widths * inner_box_heights
+    unions = areas[..., None, :] + areas[..., :, None] - intersections
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return intersections / unions
+
+
+def nms_per_class_vectorized(box_data, nms_thresh=.45, conf_thresh=0.01,
+                             top_k=200):
+    """Applies non-maximum-suppression to all classes, and optionally all
+    samples of a batch, at once. The `top_k` most confident boxes of every
+    class are gathered into a single tensor and suppressed with a
+    precomputed pairwise IoU matrix, giving the same output as
+    ``nms_per_class``.
+
+    # Arguments
+        box_data: Numpy array of shape `(num_prior_boxes, 4 + num_classes)`
+            or `(batch_size, num_prior_boxes, 4 + num_classes)`.
+        nsm_thresh: Float. Non-maximum suppression threshold.
+        conf_thresh: Float. Filter scores with a lower confidence value before
+            performing non-maximum supression.
+        top_k: Integer. Maximum number of boxes per class outputted by nms.
+
+    Returns
+        Numpy array of shape `(num_classes, top_k, 5)` or
+            `(batch_size, num_classes, top_k, 5)` if `box_data` is batched.
+    """
+    is_batched = box_data.ndim == 3
+    if not is_batched:
+        box_data = np.expand_dims(box_data, 0)
+    decoded_boxes, class_predictions = box_data[..., :4], box_data[..., 4:]
+    batch_size, num_priors, num_classes = class_predictions.shape
+    output = np.zeros((batch_size, num_classes, top_k, 5))
+    num_candidates = min(top_k, num_priors)
+    if num_candidates == 0 or num_classes < 2:
+        return output if is_batched else output[0]
+
+    # skip the background class and gather the top-k scores of every class
+    scores = np.swapaxes(class_predictions[..., 1:], 1, 2)
+    scores = np.where(scores >= conf_thresh, scores, -np.inf)
+    if num_candidates < num_priors:
+        candidate_args = np.argpartition(scores, -num_candidates, axis=-1)
+        candidate_args = candidate_args[..., -num_candidates:]
+    else:
+        candidate_args = np.broadcast_to(np.arange(num_priors), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidate_args, axis=-1)
+    sorted_args = np.argsort(candidate_scores, axis=-1)[..., ::-1]
+    candidate_args = np.take_along_axis(candidate_args, sorted_args, axis=-1)
+    candidate_scores = np.take_along_axis(candidate_scores, sorted_args, -1)
+    sample_args = np.arange(batch_size)[:, None, None]
+    candidate_boxes = decoded_boxes[sample_args, candidate_args]
+
+    # greedy suppression in score order over all classes and samples
+    is_kept = np.isfinite(candidate_scores)
+    ious = compute_pairwise_ious(candidate_boxes)
+    overlaps = np.logical_not(ious <= nms_thresh)
+    max_num_valid = np.max(np.sum(is_kept, axis=-1))
+    for rank in range(max_num_valid - 1):
+        suppressed = overlaps[..., rank, rank + 1:]
+        suppressed = np.logical_and(suppressed, is_kept[..., rank, None])
+        is_kept[..., rank + 1:] &= np.logical_not(suppressed)
+
+    # move the kept boxes to the front while preserving their score order
+    kept_args = np.argsort(np.logical_not(is_kept), axis=-1, kind='stable')
+    selections = np.concatenate(
+        [candidate_boxes, candidate_scores[..., None]], axis=-1)
+    selections = np.take_along_axis(selections, kept_args[..., None], 2)
+    num_kept = np.sum(is_kept, axis=-1, keepdims=True)
+    valid_mask = np.arange(num_candidates) < num_kept
+    selections = np.where(valid_mask[..., None], selections, 0.0)
+    output[:, 1:, :num_candidates] = selections
+    return output if is_batched else output[0]
+
+
 def to_one_hot(class_indices, num_classes):
     """ Transform from class index to one-hot encoded vector.
 
@@ -460,6 +806,88 @@ def denormalize_box(box, image_shape):
     return (x_min, y_min, x_max, y_max)
 
 
+def make_boxes_square(boxes):
+    """Makes an array of boxes square with sides equal to their longest
+        original side. Vectorized version of ``make_box_square``.
+
+    # Arguments
+        boxes: Numpy array with shape `(num_boxes, 4)` with point corner
+            coordinates.
+
+    # Returns
+        Numpy array of ints of shape `(num_boxes, 4)`.
+    """
+    x_min, y_min, x_max, y_max = np.moveaxis(boxes[:, :4], -1, 0)
+    center_x = (x_max + x_min) / 2.0
+    center_y = (y_max + y_min) / 2.0
+    width = x_max - x_min
+    height = y_max - y_min
+    tall = height >= width
+    half_box = np.where(tall, height, width) / 2.0
+    square_boxes = np.stack([
+        np.where(tall, np.trunc(center_x - half_box), x_min),
+        np.where(tall, y_min, np.trunc(center_y - half_box)),
+        np.where(tall, np.trunc(center_x + half_box), x_max),
+        np.where(tall, y_max, np.trunc(center_y + half_box))], axis=1)
+    return square_boxes.astype(int)
+
+
+def offset_boxes(boxes, offset_scales):
+    """Apply offsets to an array of boxes. Vectorized version of ``offset``.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4)` containing coordinates
+            in point form.
+        offset_scales: List of floats having x and y scales respectively.
+
+    # Returns
+        Numpy array of ints of shape `(num_boxes, 4)`.
+    """
+    x_min, y_min, x_max, y_max = np.moveaxis(boxes[:, :4], -1, 0)
+    x_offset_scale, y_offset_scale = offset_scales
+    x_offset = (x_max - x_min) * x_offset_scale
+    y_offset = (y_max - y_min) * y_offset_scale
+    offsets = np.stack([-x_offset, -y_offset, y_offset, x_offset], axis=1)
+    return (boxes[:, :4] + offsets).astype(int)
+
+
+def clip_boxes(boxes, image_shape):
+    """Clips an array of boxes to valid image coordinates.
+        Vectorized version of ``clip``.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4)` containing coordinates
+            in point form i.e. [x_min, y_min, x_max, y_max].
+        image_shape: List of two integers indicating height and width of image
+            respectively.
+
+    # Returns
+        Numpy array of shape `(num_boxes, 4)`.
+    """
+    height, width = image_shape[:2]
+    lower_bounds = np.array([0, 0, -np.inf, -np.inf])
+    upper_bounds = np.array([np.inf, np.inf, width, height])
+    clipped_boxes = np.clip(boxes[:, :4], lower_bounds, upper_bounds)
+    return clipped_boxes.astype(boxes.dtype)
+
+
+def denormalize_boxes(boxes, image_shape):
+    """Scales an array of corner boxes from normalized values to image
+        dimensions. Vectorized version of ``denormalize_box``.
+
+    # Arguments
+        boxes: Numpy array of shape `(num_boxes, 4)` containing corner box
+            coordinates.
+        image_shape: List of integers with (height, width).
+
+    # Returns
+        Numpy array of ints of shape `(num_boxes, 4)`.
+    """
+    height, width = image_shape
+    scales = np.array([width, height, width, height])
+    return (boxes[:, :4] * scales).astype(int)
+
+
 def flip_left_right(boxes, width):
     """Flips box coordinates from left-to-right and vice-versa.
     # Arguments
@@ -506,6 +934,127 @@ def to_normalized_coordinates(boxes, image):
     return normalized_boxes
 
 
+def sample_expansion(height, width, max_ratio=2):
+    """Samples the shape of a canvas up to ``max_ratio`` times larger than
+        an image and the offset at which the image is placed in it.
+
+    # Arguments
+        height: Int. Image height.
+        width: Int. Image width.
+        max_ratio: Float. Maximum expansion ratio.
+
+    # Returns
+        Expanded height, expanded width, left offset and top offset as ints.
+    """
+    ratio = np.random.uniform(1, max_ratio)
+    left = np.random.uniform(0, width * ratio - width)
+    top = np.random.uniform(0, height * ratio - height)
+    return int(height * ratio), int(width * ratio), int(left), int(top)
+
+
+def sample_crop(boxes, height, width, sample_options, max_trials=50):
+    """Samples a crop of an image whose overlap with the ``boxes`` satisfies
+        a randomly chosen IOU constraint and that contains the center of at
+        least one box.
+
+    # Arguments
+        boxes: Numpy array of shape ``[num_boxes, 4]`` in image coordinates.
+        height: Int. Image height.
+        width: Int. Image width.
+        sample_options: List of ``None`` or tuples with the minimum and
+            maximum IOU of a crop. ``None`` values indicate no cropping.
+            ``None`` bounds are considered unbounded.
+        max_trials: Int. Number of crops sampled per option.
+
+    # Returns
+        Crop box ``[x_min, y_min, x_max, y_max]`` as ints and boolean mask of
+            the boxes whose center is inside the crop. ``(None, None)`` if
+            no cropping was sampled.
+    """
+    while True:
+        mode = sample_options[np.random.randint(len(sample_options))]
+        if mode is None:
+            return None, None
+
+        min_iou, max_iou = mode
+        if min_iou is None:
+            min_iou = float('-inf')
+        if max_iou is None:
+            max_iou = float('inf')
+
+        for _ in range(max_trials):
+            w = np.random.uniform(0.3 * width, width)
+            h = np.random.uniform(0.3 * height, height)
+
+            # aspect ratio constraint b/t .5 & 2
+            if h / w < 0.5 or h / w > 2:
+                continue
+
+            left = np.random.uniform(width - w)
+            top = np.random.uniform(height - h)
+            crop_box = np.array(
+                [int(left), int(top), int(left + w), int(top + h)])
+
+            overlap = compute_iou(crop_box, boxes)
+            if overlap.max() < min_iou or overlap.min() > max_iou:
+                continue
+
+            # keep boxes whose center is inside the crop
+            centers = (boxes[:, :2] + boxes[:, 2:4]) / 2.0
+            mask = ((crop_box[0] < centers[:, 0]) *
+                    (crop_box[1] < centers[:, 1]) *
+                    (crop_box[2] > centers[:, 0]) *
+                    (crop_box[3] > centers[:, 1]))
+            if not mask.any():
+                continue
+            return crop_box, mask
+
+
+def crop_boxes(boxes, crop_box, mask):
+    """Clips the selected boxes to a crop and moves them to its coordinates.
+
+    # Arguments
+        boxes: Numpy array of shape ``[num_boxes, N]`` where N >= 4.
+        crop_box: Numpy array ``[x_min, y_min, x_max, y_max]``.
+        mask: Boolean numpy array of shape ``[num_boxes]``.
+
+    # Returns
+        Numpy array of shape ``[num_selected_boxes, N]``.
+    """
+    cropped_boxes = boxes[mask].copy()
+    cropped_boxes[:, :2] = np.maximum(cropped_boxes[:, :2], crop_box[:2])
+    cropped_boxes[:, 2:4] = np.minimum(cropped_boxes[:, 2:4], crop_box[2:])
+    cropped_boxes[:, :4] -= np.tile(crop_box[:2], 2)
+    return cropped_boxes
+
+
+def compute_crop_flip_resize_matrix(offset, crop_shape, flip, size):
+    """Computes the affine matrix that translates an image by ``offset``,
+        crops the region ``crop_shape`` at the origin, flips it left-right
+        and resizes it to ``size``. The matrix maps pixel centers as used by
+        ``cv2.warpAffine``.
+
+    # Arguments
+        offset: List of two floats ``(x, y)`` with the translation.
+        crop_shape: List of two ints ``(height, width)`` of the crop.
+        flip: Boolean. If ``True`` the crop is flipped left-right.
+        size: List of two ints ``(height, width)`` of the output.
+
+    # Returns
+        Numpy array of shape ``(2, 3)``.
+    """
+    scale_y = size[0] / crop_shape[0]
+    scale_x = size[1] / crop_shape[1]
+    x_scale, x_shift = scale_x, scale_x * offset[0]
+    if flip:
+        x_scale, x_shift = -scale_x, scale_x * (crop_shape[1] - offset[0])
+    y_scale, y_shift = scale_y, scale_y * offset[1]
+    # continuous coordinates are displaced half a pixel from pixel centers
+    x_shift = x_shift + 0.5 * x_scale - 0.5
+    y_shift = y_shift + 0.5 * y_scale - 0.5
+    return np.array([[x_scale, 0.0, x_shift], [0.0, y_scale, y_shift]])
+
+
 def extract_bounding_box_corners(points3D):
     """Extracts the (x_min, y_min, z_min) and the (x_max, y_max, z_max)
         coordinates from an array of  points3D
@@ -1,8 +1,15 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+
 import cv2
 import numpy as np
 
 from ..backend.image import resize_image, convert_color_space, show_image
-from ..backend.image import BGR2RGB
+from ..backend.image import BGR2RGB, RGB2BGR
 
 
 class Camera(object):
@@ -132,6 +139,141 @@ class Camera(object):
         self.intrinsics = intrinsics
 
 
+class StageTimer(object):
+    """Measures the frames per second and the latency of a pipeline stage
+        over a sliding window of its last iterations.
+
+    # Arguments
+        window_size: Int. Number of iterations used for the estimates.
+    """
+    def __init__(self, window_size=30):
+        self.window_size = window_size
+        self._durations = deque(maxlen=window_size)
+        self._timestamps = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def update(self, start_time, end_time=None):
+        """Registers an iteration that started at ``start_time``.
+
+        # Arguments
+            start_time: Float. Time given by ``time.perf_counter``.
+            end_time: Float or ``None``. If ``None`` the current time is used.
+        """
+        if end_time is None:
+            end_time = time.perf_counter()
+        with self._lock:
+            self._durations.append(end_time - start_time)
+            self._timestamps.append(end_time)
+
+    @property
+    def fps(self):
+        with self._lock:
+            if len(self._timestamps) < 2:
+                return 0.0
+            elapsed_time = self._timestamps[-1] - self._timestamps[0]
+            return (len(self._timestamps) - 1) / max(elapsed_time, 1e-9)
+
+    @property
+    def latency(self):
+        with self._lock:
+            if len(self._durations) == 0:
+                return 0.0
+            return float(np.mean(self._durations))
+
+
+class FrameGrabber(object):
+    """Reads camera frames in a background thread keeping only the latest
+        frame. Frames that are not read before a new one arrives are dropped.
+
+    # Arguments
+        camera: Started ``Camera``.
+        timer: ``StageTimer`` or ``None``. Timer of the capture stage.
+    """
+    def __init__(self, camera, timer=None):
+        self.camera = camera
+        self.timer = timer
+        self.num_dropped_frames = 0
+        self._frame, self._timestamp = None, None
+        self._frame_arg, self._read_frame_arg = 0, 0
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts the capture thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture(self):
+        while not self._stop_event.is_set():
+            start_time = time.perf_counter()
+            frame = self.camera.read()
+            if frame is None:
+                time.sleep(0.001)
+                continue
+            with self._condition:
+                if self._frame_arg > self._read_frame_arg:
+                    self.num_dropped_frames = self.num_dropped_frames + 1
+                self._frame, self._timestamp = frame, start_time
+                self._frame_arg = self._frame_arg + 1
+                self._condition.notify_all()
+            if self.timer is not None:
+                self.timer.update(start_time)
+
+    def read(self, timeout=None):
+        """Returns the latest frame that has not been read yet.
+
+        # Arguments
+            timeout: Float or ``None``. Maximum time in seconds to wait for
+                a new frame.
+
+        # Returns
+            Frame and its capture time, or ``(None, None)`` if no new frame
+                arrived before ``timeout``.
+        """
+        with self._condition:
+            has_new_frame = self._condition.wait_for(
+                lambda: (self._frame_arg > self._read_frame_arg or
+                         self._stop_event.is_set()), timeout)
+            if not has_new_frame or self._frame_arg == self._read_frame_arg:
+                return None, None
+            self._read_frame_arg = self._frame_arg
+            return self._frame, self._timestamp
+
+    def stop(self):
+        """Stops the capture thread."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def put_latest(bounded_queue, item):
+    """Puts ``item`` in a bounded queue dropping its oldest item if full.
+
+    # Arguments
+        bounded_queue: ``queue.Queue`` with a ``maxsize``.
+        item: Any object.
+
+    # Returns
+        Boolean indicating if an item was dropped.
+    """
+    try:
+        bounded_queue.put_nowait(item)
+        return False
+    except queue.Full:
+        try:
+            bounded_queue.get_nowait()
+        except queue.Empty:
+            pass
+        bounded_queue.put_nowait(item)
+        return True
+
+
 class VideoPlayer(object):
     """Performs visualization inferences in a real-time video.
 
@@ -141,17 +283,33 @@ class VideoPlayer(object):
             output a dictionary with key 'image' containing a visualization
             of the inferences. Built-in pipelines can be found in
             ``paz/processing/pipelines``.
+        camera: ``Camera``.
+        topic: String. Key of the pipeline output that is displayed.
+        pipelined: Boolean. If ``True`` frames are captured in a background
+            thread that keeps only the latest frame, inferences run in a
+            worker thread, and rendering and video writing run in the
+            calling thread. The stages are connected by bounded queues.
+        queue_size: Int. Maximum number of inferences waiting to be
+            rendered. Older inferences are dropped when the queue is full.
 
     # Methods
         run()
         record()
+        statistics()
     """
 
-    def __init__(self, image_size, pipeline, camera, topic='image'):
+    def __init__(self, image_size, pipeline, camera, topic='image',
+                 pipelined=False, queue_size=2):
         self.image_size = image_size
         self.pipeline = pipeline
         self.camera = camera
         self.topic = topic
+        self.pipelined = pipelined
+        self.queue_size = queue_size
+        self.timers = {'capture': StageTimer(), 'inference': StageTimer(),
+                       'render': StageTimer(), 'total': StageTimer()}
+        self.num_dropped_frames = 0
+        self.num_dropped_inferences = 0
 
     def step(self):
         """ Runs the pipeline process once
@@ -170,10 +328,92 @@ class VideoPlayer(object):
         frame = convert_color_space(frame, BGR2RGB)
         return self.pipeline(frame)
 
+    def statistics(self):
+        """Returns the live counters of every stage.
+
+        # Returns
+            Dictionary with the frames per second and the latency in seconds
+                of every stage, and the number of dropped frames and
+                inferences.
+        """
+        statistics = {}
+        for name, timer in self.timers.items():
+            statistics[name] = {'fps': timer.fps, 'latency': timer.latency}
+        statistics['dropped_frames'] = self.num_dropped_frames
+        statistics['dropped_inferences'] = self.num_dropped_inferences
+        return statistics
+
+    def _infer(self, grabber, outputs, stop_event):
+        try:
+            while not stop_event.is_set():
+                frame, timestamp = grabber.read(timeout=0.1)
+                if frame is None:
+                    continue
+                start_time = time.perf_counter()
+                output = self.pipeline(convert_color_space(frame, BGR2RGB))
+                self.timers['inference'].update(start_time)
+                if put_latest(outputs, (output, timestamp)):
+                    self.num_dropped_inferences = (
+                        self.num_dropped_inferences + 1)
+        except Exception as error:
+            self._infer_error = error
+            stop_event.set()
+
+    def _run_pipelined(self, render):
+        """Runs the pipelined stages until ``render`` returns ``False``.
+
+        # Arguments
+            render: Function that takes the pipeline output and returns a
+                boolean indicating if the player should continue.
+        """
+        self.camera.start()
+        grabber = FrameGrabber(self.camera, self.timers['capture']).start()
+        outputs = queue.Queue(self.queue_size)
+        stop_event = threading.Event()
+        self._infer_error = None
+        worker = threading.Thread(
+            target=self._infer, args=(grabber, outputs, stop_event),
+            daemon=True)
+        worker.start()
+        try:
+            while True:
+                self.num_dropped_frames = grabber.num_dropped_frames
+                try:
+                    output, timestamp = outputs.get(timeout=0.1)
+                except queue.Empty:
+                    if not worker.is_alive():
+                        break
+                    continue
+                start_time = time.perf_counter()
+                should_continue = render(output)
+                self.timers['render'].update(start_time)
+                self.timers['total'].update(timestamp)
+                if not should_continue:
+                    break
+        finally:
+            stop_event.set()
+            worker.join()
+            grabber.stop()
+            self.num_dropped_frames = grabber.num_dropped_frames
+            self.camera.stop()
+        if self._infer_error is not None:
+            raise self._infer_error
+
+    def _show(self, output, writer=None):
+        image = resize_image(output[self.topic], tuple(self.image_size))
+        show_image(image, 'inference', wait=False)
+        if writer is not None:
+            writer.write(image)
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
+
     def run(self):
         """Opens camera and starts continuous inference using ``pipeline``,
         until the user presses ``q`` inside the opened window.
         """
+        if self.pipelined:
+            self._run_pipelined(self._show)
+            cv2.destroyAllWindows()
+            return
         self.camera.start()
         while True:
             output = self.step()
@@ -195,19 +435,384 @@ class VideoPlayer(object):
             fourCC: String. Indicates the four character code of the video.
             e.g. XVID, MJPG, X264.
         """
-        self.start()
         fourCC = cv2.VideoWriter_fourcc(*fourCC)
-        writer = cv2.VideoWriter(name, fourCC, fps, self.image_size)
+        writer = cv2.VideoWriter(name, fourCC, fps, tuple(self.image_size))
+        if self.pipelined:
+            self._run_pipelined(lambda output: self._show(output, writer))
+            writer.release()
+            cv2.destroyAllWindows()
+            return
+        self.camera.start()
         while True:
             output = self.step()
             if output is None:
                 continue
-            image = resize_image(output['image'], tuple(self.image_size))
+            image = resize_image(output[self.topic], tuple(self.image_size))
             show_image(image, 'inference', wait=False)
             writer.write(image)
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-        self.stop()
+        self.camera.stop()
         writer.release()
         cv2.destroyAllWindows()
+
+
+def to_serializable(value):
+    """Converts pipeline outputs into JSON serializable values. Arrays are
+        converted into lists and messages such as ``Box2D`` or ``Pose6D``
+        into dictionaries with their attributes.
+
+    # Arguments
+        value: Any pipeline output.
+
+    # Returns
+        Serializable value.
+    """
+    if isinstance(value, dict):
+        return {key: to_serializable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_serializable(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, '__dict__'):
+        return {key.lstrip('_'): to_serializable(item)
+                for key, item in vars(value).items()}
+    return str(value)
+
+
+class JSONLinesWriter(object):
+    """Streams the outputs of every frame as one JSON line.
+
+    # Arguments
+        filepath: String. Path to the ``.jsonl`` file.
+        exclude: List of strings with the output keys that are not written.
+            If ``None`` only ``'image'`` is excluded.
+        resume: Boolean. If ``True`` lines are appended to an existing file
+            after removing a partially written last line.
+    """
+    def __init__(self, filepath, exclude=None, resume=False):
+        if exclude is None:
+            exclude = ['image']
+        self.filepath = filepath
+        self.exclude = exclude
+        self.resume = resume
+        self._file = None
+
+    def _read_valid_lines(self):
+        """Returns the last frame index and the size in bytes of the lines
+        that were completely written.
+        """
+        last_frame, valid_size = -1, 0
+        if not os.path.isfile(self.filepath):
+            return last_frame, valid_size
+        with open(self.filepath, 'rb') as results_file:
+            for line in results_file:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    last_frame = json.loads(line.decode('utf-8'))['frame']
+                except (ValueError, KeyError):
+                    break
+                valid_size = valid_size + len(line)
+        return last_frame, valid_size
+
+    def last_frame(self):
+        """Returns the index of the last written frame or ``-1``."""
+        return self._read_valid_lines()[0]
+
+    def _open(self):
+        if not self.resume:
+            return open(self.filepath, 'w')
+        valid_size = self._read_valid_lines()[1]
+        results_file = open(self.filepath, 'a')
+        results_file.truncate(valid_size)
+        return results_file
+
+    def write(self, frame_arg, output):
+        if self._file is None:
+            self._file = self._open()
+        results = {key: value for key, value in output.items()
+                   if key not in self.exclude}
+        results = to_serializable(results)
+        results['frame'] = int(frame_arg)
+        self._file.write(json.dumps(results) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class NPZWriter(object):
+    """Streams the outputs of every frame into one ``.npz`` file per frame.
+        Lists of messages are stored as one array per attribute with keys
+        ``'<output>/<attribute>'``.
+
+    # Arguments
+        directory: String. Directory of the ``.npz`` files.
+        exclude: List of strings with the output keys that are not written.
+            If ``None`` only ``'image'`` is excluded.
+    """
+    def __init__(self, directory, exclude=None):
+        if exclude is None:
+            exclude = ['image']
+        self.directory = directory
+        self.exclude = exclude
+
+    def last_frame(self):
+        """Returns the index of the last written frame or ``-1``."""
+        if not os.path.isdir(self.directory):
+            return -1
+        frame_args = [int(filename[6:-4])
+                      for filename in os.listdir(self.directory)
+                      if filename.startswith('frame_')
+                      and filename.endswith('.npz')]
+        return max(frame_args, default=-1)
+
+    def _to_arrays(self, key, value):
+        arrays = {}
+        value = to_serializable(value)
+        if (isinstance(value, list) and len(value) > 0 and
+                all(isinstance(item, dict) for item in value)):
+            for attribute in value[0].keys():
+                attribute_values = [item[attribute] for item in value]
+                arrays.update(self._to_arrays(
+                    key + '/' + attribute, attribute_values))
+            return arrays
+        try:
+            arrays[key] = np.asarray(value)
+            if arrays[key].dtype == object:
+                raise ValueError
+        except ValueError:
+            arrays[key] = np.array(json.dumps(value))
+        return arrays
+
+    def write(self, frame_arg, output):
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        arrays = {}
+        for key, value in output.items():
+            if key not in self.exclude:
+                arrays.update(self._to_arrays(key, value))
+        filepath = os.path.join(
+            self.directory, 'frame_{:08d}.npz'.format(frame_arg))
+        np.savez(filepath, **arrays)
+
+    def close(self):
+        pass
+
+
+def _put_until_stopped(bounded_queue, item, stop_event):
+    while not stop_event.is_set():
+        try:
+            bounded_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get_until_stopped(bounded_queue, stop_event):
+    while not stop_event.is_set():
+        try:
+            return bounded_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+
+class VideoProcessor(object):
+    """Runs a pipeline over a video file without displaying it.
+        Frames are decoded in a background thread, inferences run in the
+        calling thread and the annotated video and the results are written
+        in another thread. The stages are connected by bounded queues.
+
+    # Arguments
+        pipeline: Function. Should take an RGB image as input and it should
+            output a dictionary. If it has a ``call_batch`` method and
+            ``batch_size`` is larger than one, frames are processed in
+            batches with it.
+        batch_size: Int. Number of frames given at once to the pipeline.
+        stride: Int. Only frames whose index is a multiple of ``stride``
+            are processed.
+        topic: String. Key of the pipeline output written in the video.
+        queue_size: Int. Maximum number of batches waiting in every queue.
+
+    # Methods
+        process()
+    """
+    def __init__(self, pipeline, batch_size=1, stride=1, topic='image',
+                 queue_size=4):
+        self.pipeline = pipeline
+        self.batch_size = batch_size
+        self.stride = stride
+        self.topic = topic
+        self.queue_size = queue_size
+        self.timers = {'decode': StageTimer(), 'inference': StageTimer(),
+                       'write': StageTimer()}
+
+    def _decode(self, video_path, start_frame, max_frames, frames,
+                stop_event):
+        capture = cv2.VideoCapture(video_path)
+        try:
+            frame_arg, num_frames, batch = 0, 0, []
+            while not stop_event.is_set():
+                if max_frames is not None and num_frames >= max_frames:
+                    break
+                start_time = time.perf_counter()
+                if frame_arg < start_frame or (frame_arg % self.stride) != 0:
+                    if not capture.grab():
+                        break
+                    frame_arg = frame_arg + 1
+                    continue
+                is_valid, frame = capture.read()
+                if not is_valid:
+                    break
+                frame = convert_color_space(frame, BGR2RGB)
+                batch.append((frame_arg, frame))
+                self.timers['decode'].update(start_time)
+                frame_arg, num_frames = frame_arg + 1, num_frames + 1
+                if len(batch) == self.batch_size:
+                    _put_until_stopped(frames, batch, stop_event)
+                    batch = []
+            if len(batch) > 0:
+                _put_until_stopped(frames, batch, stop_event)
+        except Exception as error:
+            self._decode_error = error
+        finally:
+            capture.release()
+            _put_until_stopped(frames, None, stop_event)
+
+    def _write(self, outputs, video_writer, results_writer, stop_event):
+        try:
+            while True:
+                batch = outputs.get()
+                if batch is None:
+                    break
+                start_time = time.perf_counter()
+                for frame_arg, output in batch:
+                    if video_writer is not None and self.topic in output:
+                        image = convert_color_space(
+                            output[self.topic], RGB2BGR)
+                        video_writer(image)
+                    if results_writer is not None:
+                        results_writer.write(frame_arg, output)
+                self.timers['write'].update(start_time)
+        except Exception as error:
+            self._write_error = error
+            stop_event.set()
+
+    def _infer(self, images):
+        if self.batch_size > 1 and hasattr(self.pipeline, 'call_batch'):
+            return self.pipeline.call_batch(images)
+        return [self.pipeline(image) for image in images]
+
+    def _build_video_writer(self, video_path, fps, fourCC):
+        state = {'writer': None}
+
+        def write(image):
+            if state['writer'] is None:
+                height, width = image.shape[:2]
+                state['writer'] = cv2.VideoWriter(
+                    video_path, cv2.VideoWriter_fourcc(*fourCC),
+                    fps, (width, height))
+            state['writer'].write(image)
+
+        def release():
+            if state['writer'] is not None:
+                state['writer'].release()
+        return write, release
+
+    def process(self, video_path, output_path=None, results_path=None,
+                resume=False, fourCC='MJPG', max_frames=None):
+        """Processes a video file.
+
+        # Arguments
+            video_path: String. Path to the input video.
+            output_path: String or ``None``. Path of the annotated video.
+                When resuming, the starting frame is appended to its name.
+            results_path: String or ``None``. If it ends with ``.jsonl``
+                results are written as JSON lines. Otherwise it is a
+                directory with one ``.npz`` file per frame.
+            resume: Boolean. If ``True`` frames already written in
+                ``results_path`` are skipped.
+            fourCC: String. Four character code of the annotated video.
+            max_frames: Int or ``None``. Maximum number of processed frames.
+
+        # Returns
+            Dictionary with the number of processed frames, the elapsed time
+                in seconds, the throughput in frames per second and the
+                frames per second and latency of every stage.
+        """
+        results_writer = None
+        if results_path is not None:
+            if results_path.endswith('.jsonl'):
+                results_writer = JSONLinesWriter(results_path, resume=resume)
+            else:
+                results_writer = NPZWriter(results_path)
+        start_frame = 0
+        if resume and results_writer is not None:
+            start_frame = results_writer.last_frame() + 1
+        if output_path is not None and start_frame > 0:
+            root, extension = os.path.splitext(output_path)
+            output_path = '{}_{:08d}{}'.format(root, start_frame, extension)
+
+        video_writer, release_video_writer = None, None
+        if output_path is not None:
+            capture = cv2.VideoCapture(video_path)
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            capture.release()
+            video_writer, release_video_writer = self._build_video_writer(
+                output_path, fps / self.stride, fourCC)
+
+        frames = queue.Queue(self.queue_size)
+        outputs = queue.Queue(self.queue_size)
+        stop_event = threading.Event()
+        self._decode_error, self._write_error = None, None
+        decoder = threading.Thread(target=self._decode, daemon=True, args=(
+            video_path, start_frame, max_frames, frames, stop_event))
+        writer = threading.Thread(target=self._write, daemon=True, args=(
+            outputs, video_writer, results_writer, stop_event))
+        start_time, num_frames = time.perf_counter(), 0
+        decoder.start()
+        writer.start()
+        try:
+            while True:
+                batch = _get_until_stopped(frames, stop_event)
+                if batch is None:
+                    break
+                frame_args, images = zip(*batch)
+                inference_start_time = time.perf_counter()
+                batch_outputs = self._infer(list(images))
+                self.timers['inference'].update(inference_start_time)
+                num_frames = num_frames + len(batch)
+                _put_until_stopped(
+                    outputs, list(zip(frame_args, batch_outputs)), stop_event)
+        finally:
+            _put_until_stopped(outputs, None, stop_event)
+            stop_event.set()
+            writer.join()
+            decoder.join()
+            if release_video_writer is not None:
+                release_video_writer()
+            if results_writer is not None:
+                results_writer.close()
+        if self._decode_error is not None:
+            raise self._decode_error
+        if self._write_error is not None:
+            raise self._write_error
+
+        elapsed_time = time.perf_counter() - start_time
+        statistics = {'num_frames': num_frames,
+                      'start_frame': start_frame,
+                      'elapsed_time': elapsed_time,
+                      'fps': num_frames / max(elapsed_time, 1e-9)}
+        for name, timer in self.timers.items():
+            statistics[name] = {'fps': timer.fps, 'latency': timer.latency}
+        return statistics
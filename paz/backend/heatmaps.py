@@ -67,7 +67,7 @@ def get_top_k_keypoints_numpy(heatmaps, k):
         indices: Numpy array. Indices of top k keypoints.
     """
     num_of_objects, num_of_keypoints = heatmaps.shape[:2]
-    indices = np.zeros((num_of_objects, num_of_keypoints, k), dtype=np.int)
+    indices = np.zeros((num_of_objects, num_of_keypoints, k), dtype=int)
     values = np.zeros((num_of_objects, num_of_keypoints, k))
     for object_arg in range(num_of_objects):
         for keypoint_arg in range(num_of_keypoints):
@@ -78,6 +78,88 @@ def get_top_k_keypoints_numpy(heatmaps, k):
     return np.squeeze(values), indices
 
 
+def max_pooling_heatmaps(heatmaps, pool_size=3):
+    """Max pools the last two axes of a stack of heatmaps with stride one
+        and ``same`` padding. The window maximum is computed separately
+        along rows and columns. Borders are padded with ``-inf`` i.e.
+        padded values are never selected.
+
+    # Arguments
+        heatmaps: Numpy array of shape (..., H, W).
+        pool_size: Int. Odd size of the pooling window.
+
+    # Returns
+        Numpy array of shape (..., H, W) with the pooled values.
+    """
+    pad_before = (pool_size - 1) // 2
+    pad_after = pool_size - 1 - pad_before
+    padding = [(0, 0)] * (heatmaps.ndim - 2)
+    H, W = heatmaps.shape[-2:]
+    padded_rows = np.pad(heatmaps, padding + [(0, 0), (pad_before, pad_after)],
+                         constant_values=-np.inf)
+    max_values = padded_rows[..., 0:W]
+    for shift in range(1, pool_size):
+        max_values = np.maximum(max_values, padded_rows[..., shift:shift + W])
+    padded_columns = np.pad(max_values, padding + [
+        (pad_before, pad_after), (0, 0)], constant_values=-np.inf)
+    max_values = padded_columns[..., 0:H, :]
+    for shift in range(1, pool_size):
+        max_values = np.maximum(
+            max_values, padded_columns[..., shift:shift + H, :])
+    return max_values
+
+
+def get_top_k_values(values, k):
+    """Selects the ``k`` largest values of the last axis with
+        ``np.argpartition``. Only the selected values are sorted.
+        As in ``tf.math.top_k``, values are returned in descending order
+        and ties are resolved in favour of the lowest index.
+
+    # Arguments
+        values: Numpy array of shape (..., N).
+        k: Int. Number of values to select.
+
+    # Returns
+        top_k_values: Numpy array of shape (..., k).
+        indices: Numpy array of shape (..., k) with the indices of the
+            selected values in the last axis.
+    """
+    kth_args = np.argpartition(-values, k - 1, axis=-1)[..., k - 1:k]
+    kth_values = np.take_along_axis(values, kth_args, axis=-1)
+    greater_mask = values > kth_values
+    equal_mask = values == kth_values
+    num_missing = k - np.sum(greater_mask, axis=-1, keepdims=True)
+    tied_mask = equal_mask & (np.cumsum(equal_mask, axis=-1) <= num_missing)
+    selected_mask = greater_mask | tied_mask
+    indices = np.nonzero(selected_mask)[-1].reshape(*values.shape[:-1], k)
+    top_k_values = np.take_along_axis(values, indices, axis=-1)
+    order = np.argsort(-top_k_values, axis=-1, kind='stable')
+    top_k_values = np.take_along_axis(top_k_values, order, axis=-1)
+    indices = np.take_along_axis(indices, order, axis=-1)
+    return top_k_values, indices
+
+
+def extract_heatmap_peaks(heatmaps, k, pool_size=3):
+    """Extracts the ``k`` highest local maxima of every heatmap.
+        Values that are not equal to the maximum of their pooling window
+        are suppressed before the top ``k`` values are selected.
+
+    # Arguments
+        heatmaps: Numpy array of shape (..., H, W).
+        k: Int. Maximum number of peaks per heatmap.
+        pool_size: Int. Odd size of the pooling window.
+
+    # Returns
+        values: Numpy array of shape (..., k) with the peak values.
+        indices: Numpy array of shape (..., k) with the flattened
+            ``y * W + x`` location of every peak.
+    """
+    max_values = max_pooling_heatmaps(heatmaps, pool_size)
+    peaks = heatmaps * np.equal(max_values, heatmaps)
+    peaks = peaks.reshape(*heatmaps.shape[:-2], -1)
+    return get_top_k_values(peaks, k)
+
+
 def get_valid_detections(detection, detection_thresh):
     """Accept the keypoints whose score is greater than the
        detection threshold.
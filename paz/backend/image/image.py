@@ -1,7 +1,8 @@
 import numpy as np
 
 from .opencv_image import (convert_color_space, gaussian_image_blur,
-                           median_image_blur, warp_affine, RGB2HSV, HSV2RGB)
+                           median_image_blur, warp_affine, RGB2HSV, HSV2RGB,
+                           convert_color_space_batch, apply_lookup_tables)
 
 
 def cast_image(image, dtype):
@@ -82,6 +83,121 @@ def random_hue(image, delta=18):
     return image
 
 
+def _build_tables(function, values):
+    """Evaluates ``function`` on all uint8 values for every element of
+        ``values`` and casts the result into uint8 lookup tables.
+    """
+    pixels = np.arange(256, dtype=np.float32)[np.newaxis]
+    values = np.asarray(values, dtype=np.float32)[:, np.newaxis]
+    return cast_image(function(pixels, values), np.uint8)
+
+
+def _contrast_tables(alphas):
+    return _build_tables(
+        lambda pixels, alphas: np.clip(pixels * alphas, 0, 255), alphas)
+
+
+def _brightness_tables(deltas):
+    return _build_tables(
+        lambda pixels, deltas: np.clip(pixels + deltas, 0, 255), deltas)
+
+
+def _shift_hue(hues, deltas):
+    hues = hues + deltas
+    hues[hues > 179.0] -= 179.0
+    hues[hues < 0.0] += 179.0
+    return hues
+
+
+def _transform_HSV_batch(images, saturation_alphas, hue_deltas):
+    num_images = len(images)
+    tables = np.empty((num_images, 256, 3), dtype=np.uint8)
+    tables[:, :, 0] = _build_tables(_shift_hue, hue_deltas)
+    tables[:, :, 1] = _contrast_tables(saturation_alphas)
+    tables[:, :, 2] = np.arange(256, dtype=np.uint8)
+    if images.dtype != np.uint8:
+        raise ValueError('``images`` must be of type ``uint8``')
+    images = convert_color_space_batch(images, RGB2HSV)
+    images = apply_lookup_tables(images, tables)
+    return convert_color_space_batch(images, HSV2RGB)
+
+
+def random_saturation_batch(images, lower=0.3, upper=1.5):
+    """Applies a different random saturation to every RGB image of a batch.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+        lower: Float.
+        upper: Float.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+    """
+    alphas = np.random.uniform(lower, upper, len(images))
+    return _transform_HSV_batch(images, alphas, np.zeros(len(images)))
+
+
+def random_brightness_batch(images, delta=32):
+    """Applies a different random brightness to every RGB image of a batch.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+        delta: Int.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+    """
+    deltas = np.random.uniform(-delta, delta, len(images))
+    return apply_lookup_tables(images, _brightness_tables(deltas))
+
+
+def random_contrast_batch(images, lower=0.5, upper=1.5):
+    """Applies a different random contrast to every RGB image of a batch.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+        lower: Float.
+        upper: Float.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+    """
+    alphas = np.random.uniform(lower, upper, len(images))
+    return apply_lookup_tables(images, _contrast_tables(alphas))
+
+
+def random_hue_batch(images, delta=18):
+    """Applies a different random hue to every RGB image of a batch.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+        delta: Int.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+    """
+    deltas = np.random.uniform(-delta, delta, len(images))
+    return _transform_HSV_batch(images, np.ones(len(images)), deltas)
+
+
+def random_saturation_hue_batch(images, lower=0.3, upper=1.5, delta=18):
+    """Applies a different random saturation and hue to every RGB image of
+        a batch sharing a single conversion to and from HSV.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+        lower: Float. Lower bound of the saturation factor.
+        upper: Float. Upper bound of the saturation factor.
+        delta: Int. Maximum hue shift.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, 3)`` and type uint8.
+    """
+    saturation_alphas = np.random.uniform(lower, upper, len(images))
+    hue_deltas = np.random.uniform(-delta, delta, len(images))
+    return _transform_HSV_batch(images, saturation_alphas, hue_deltas)
+
+
 def flip_left_right(image):
     """Flips an image left and right.
 
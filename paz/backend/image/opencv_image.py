@@ -47,6 +47,44 @@ def convert_color_space(image, flag):
     return cv2.cvtColor(image, flag)
 
 
+def convert_color_space_batch(images, flag):
+    """Converts a batch of images to a different color space with a single
+        call by stacking the images along their rows.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, C)``.
+        flag: PAZ or openCV flag. e.g. paz.backend.image.RGB2HSV.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, C')``.
+    """
+    num_images, H, W = images.shape[:3]
+    images = np.ascontiguousarray(images).reshape(num_images * H, W, -1)
+    images = cv2.cvtColor(images, flag)
+    return images.reshape(num_images, H, W, -1)
+
+
+def apply_lookup_tables(images, tables):
+    """Maps the values of every image with its own lookup table.
+
+    # Arguments
+        images: Numpy array of shape ``(N, H, W, C)`` and type uint8.
+        tables: Numpy array of type uint8 and shape ``(N, 256)`` or
+            ``(N, 256, C)`` for one table per channel.
+
+    # Returns
+        Numpy array of shape ``(N, H, W, C)`` and type uint8.
+    """
+    if images.dtype != np.uint8:
+        raise ValueError('``images`` must be of type ``uint8``')
+    images = np.ascontiguousarray(images)
+    tables = np.ascontiguousarray(tables, dtype=np.uint8)
+    mapped_images = np.empty_like(images)
+    for image, table, mapped_image in zip(images, tables, mapped_images):
+        cv2.LUT(image, table.reshape(256, 1, -1), dst=mapped_image)
+    return mapped_images
+
+
 def load_image(filepath, num_channels=3):
     """Load image from a ''filepath''.
 
@@ -91,3 +91,108 @@ def find_smallest_uncovered(n, row_covered, col_covered, cost_matrix):
                         minval > cost_matrix[i][j]:
                     minval = cost_matrix[i][j]
     return minval
+
+
+def to_cost_array(cost_matrix):
+    """Transforms a cost matrix into a float array in which ``DISALLOWED``
+    entries are replaced by ``np.inf``.
+
+    # Arguments
+        cost_matrix: List or numpy array of shape `(num_rows, num_cols)`.
+
+    # Returns
+        Numpy array of shape `(num_rows, num_cols)`.
+    """
+    cost_matrix = np.array(cost_matrix)
+    if cost_matrix.dtype == object:
+        is_disallowed = np.vectorize(
+            lambda x: isinstance(x, DISALLOWED_OBJ), otypes=[bool])
+        disallowed_mask = is_disallowed(cost_matrix)
+        cost_matrix = np.where(disallowed_mask, np.inf, cost_matrix)
+    return cost_matrix.astype(np.float64)
+
+
+def _augment_row(cost_matrix, row_arg, u, v, col_to_row, row_to_col):
+    """Finds the shortest augmenting path starting at ``row_arg`` and
+    updates the dual variables and the assignments in place.
+    """
+    num_rows, num_cols = cost_matrix.shape
+    shortest_paths = np.full(num_cols, np.inf)
+    path = np.full(num_cols, -1)
+    scanned_rows = np.zeros(num_rows, dtype=bool)
+    scanned_cols = np.zeros(num_cols, dtype=bool)
+    min_value, sink, row = 0.0, -1, row_arg
+    while sink == -1:
+        scanned_rows[row] = True
+        reduced_costs = min_value + cost_matrix[row] - u[row] - v
+        improved = np.logical_and(
+            reduced_costs < shortest_paths, np.logical_not(scanned_cols))
+        path[improved] = row
+        shortest_paths[improved] = reduced_costs[improved]
+        remaining_paths = np.where(scanned_cols, np.inf, shortest_paths)
+        min_value = np.min(remaining_paths)
+        if min_value == np.inf:
+            raise UnsolvableMatrix("Matrix cannot be solved!")
+        # prefer unassigned columns to terminate the path early
+        candidates = np.flatnonzero(remaining_paths == min_value)
+        unassigned = candidates[col_to_row[candidates] == -1]
+        col = unassigned[0] if len(unassigned) > 0 else candidates[0]
+        scanned_cols[col] = True
+        if col_to_row[col] == -1:
+            sink = col
+        else:
+            row = col_to_row[col]
+
+    u[row_arg] = u[row_arg] + min_value
+    scanned_rows[row_arg] = False
+    scanned_row_args = np.flatnonzero(scanned_rows)
+    u[scanned_row_args] += min_value - shortest_paths[
+        row_to_col[scanned_row_args]]
+    v[scanned_cols] -= min_value - shortest_paths[scanned_cols]
+
+    col = sink
+    while True:
+        row = path[col]
+        col_to_row[col] = row
+        row_to_col[row], col = col, row_to_col[row]
+        if row == row_arg:
+            break
+
+
+def compute_assignment(cost_matrix):
+    """Solves the linear assignment problem with the shortest augmenting
+    path algorithm of Jonker-Volgenant, as formulated by Crouse, 2016.
+    Each path search scans the columns with vectorized reduced costs,
+    giving an ``O(n^3)`` solver that handles rectangular matrices without
+    padding them.
+
+    # Arguments
+        cost_matrix: List or numpy array of shape `(num_rows, num_cols)`.
+            Entries can be ``DISALLOWED`` objects or ``np.inf``.
+
+    # Returns
+        List of `(row, col)` tuples sorted by row with the assignments of
+            minimum total cost.
+
+    # References
+        - [On implementing 2D rectangular assignment algorithms](
+            https://ieeexplore.ieee.org/document/7738348)
+    """
+    cost_matrix = to_cost_array(cost_matrix)
+    if cost_matrix.size == 0:
+        return []
+    transpose = cost_matrix.shape[0] > cost_matrix.shape[1]
+    if transpose:
+        cost_matrix = cost_matrix.T
+    num_rows, num_cols = cost_matrix.shape
+    u, v = np.zeros(num_rows), np.zeros(num_cols)
+    col_to_row = np.full(num_cols, -1)
+    row_to_col = np.full(num_rows, -1)
+    for row_arg in range(num_rows):
+        _augment_row(cost_matrix, row_arg, u, v, col_to_row, row_to_col)
+
+    rows, cols = np.arange(num_rows), row_to_col
+    if transpose:
+        rows, cols = cols, rows
+    order = np.argsort(rows)
+    return [(int(rows[arg]), int(cols[arg])) for arg in order]
@@ -102,6 +102,45 @@ def compare_horizontal_neighbours(x, y, image, offset=0.25):
     return x
 
 
+def compare_vertical_neighbours_batch(x, y, images, image_args, offset=0.25):
+    """Vectorized ``compare_vertical_neighbours`` for many pixels, each
+    pixel being compared in its own image of ``images``.
+
+    # Arguments
+        x: Numpy array. x coordinates of the pixels to be compared.
+        y: Numpy array. y coordinates of the pixels to be compared.
+        images: Numpy array of shape `(num_images, H, W)`.
+        image_args: Numpy array. Index of the image of each pixel.
+        offset: Float.
+    """
+    int_x, int_y = x.astype(int), y.astype(int)
+    lower_y = np.minimum(int_y + 1, images.shape[2] - 1)
+    upper_y = np.maximum(int_y - 1, 0)
+    is_lower_larger = (images[image_args, int_x, lower_y] >
+                       images[image_args, int_x, upper_y])
+    return np.where(is_lower_larger, y + offset, y - offset)
+
+
+def compare_horizontal_neighbours_batch(x, y, images, image_args,
+                                        offset=0.25):
+    """Vectorized ``compare_horizontal_neighbours`` for many pixels, each
+    pixel being compared in its own image of ``images``.
+
+    # Arguments
+        x: Numpy array. x coordinates of the pixels to be compared.
+        y: Numpy array. y coordinates of the pixels to be compared.
+        images: Numpy array of shape `(num_images, H, W)`.
+        image_args: Numpy array. Index of the image of each pixel.
+        offset: Float.
+    """
+    int_x, int_y = x.astype(int), y.astype(int)
+    left_x = np.maximum(0, int_x - 1)
+    right_x = np.minimum(int_x + 1, images.shape[1] - 1)
+    is_right_larger = (images[image_args, right_x, int_y] >
+                       images[image_args, left_x, int_y])
+    return np.where(is_right_larger, x + offset, x - offset)
+
+
 def get_all_indices_of_array(array):
     """Get all the indices of an array.
 
@@ -215,7 +254,12 @@ def max_pooling_2d(image, pool_size=3, strides=1, padding='same'):
 
     image = pad_matrix(image, pool_size, strides, padding)
     H, W = image.shape[:2]
-    for y in range(0, H - pool_size + 1, strides):
-        for x in range(0, W - pool_size + 1, strides):
-            max_image[y][x] = np.max(image[y:y + pool_size, x:x + pool_size])
+    row_stride, col_stride = image.strides[:2]
+    windows = np.lib.stride_tricks.as_strided(
+        image, (H - pool_size + 1, W - pool_size + 1, *image.shape[2:],
+                pool_size, pool_size),
+        (row_stride, col_stride, *image.strides[2:], row_stride, col_stride),
+        writeable=False)
+    windows = windows[::strides, ::strides]
+    max_image[::strides, ::strides] = np.max(windows, axis=(-2, -1))
     return max_image
@@ -1,12 +1,136 @@
 import os
 from tensorflow.keras.utils import to_categorical
 import numpy as np
+import cv2
 
-from .utils import get_class_names
+from .utils import get_class_names, get_file_signature
 from ..abstract import Loader
 from ..backend.image import resize_image
 
 
+FER_SPLITS = {'train': 'Training', 'val': 'PublicTest', 'test': 'PrivateTest'}
+FER_SIZE = (48, 48)
+
+
+def build_FER_store(filepath, store_path):
+    """Parses all faces of a ``fer2013.csv`` file in bulk and writes for
+        every split a ``uint8`` array of faces with shape ``(N, 48, 48)``
+        and a ``uint8`` array of emotion labels with shape ``(N)``.
+
+    # Arguments
+        filepath: String. Path to ``fer2013.csv`` file.
+        store_path: String. Directory in which the ``.npy`` files are written.
+    """
+    with open(filepath, 'r') as csv_file:
+        csv_file.readline()
+        rows = [line.rstrip().split(',') for line in csv_file if line.strip()]
+    emotions, pixels, usages = zip(*rows)
+    emotions = np.array(emotions, dtype=np.uint8)
+    usages = np.array(usages)
+    faces = np.fromstring(' '.join(pixels), dtype=np.uint8, sep=' ')
+    faces = faces.reshape(-1, *FER_SIZE)
+    if not os.path.exists(store_path):
+        os.makedirs(store_path)
+    for split, usage in FER_SPLITS.items():
+        mask = usages == usage
+        np.save(os.path.join(store_path, split + '_faces.npy'), faces[mask])
+        np.save(os.path.join(store_path, split + '_emotions.npy'),
+                emotions[mask])
+    signature = get_file_signature(filepath)
+    np.save(os.path.join(store_path, 'signature.npy'), signature)
+
+
+def load_FER_store(filepath, store_path, split):
+    """Loads the faces and emotion labels of a split from the store.
+        The store is (re)built if it is missing or if the CSV file changed.
+
+    # Arguments
+        filepath: String. Path to ``fer2013.csv`` file.
+        store_path: String. Directory of the store.
+        split: String. Valid option contain 'train', 'val' or 'test'.
+
+    # Returns
+        Memory-mapped ``uint8`` faces of shape ``(N, 48, 48)`` and
+            ``uint8`` emotion labels of shape ``(N)``.
+    """
+    signature_filepath = os.path.join(store_path, 'signature.npy')
+    signature = get_file_signature(filepath)
+    if not (os.path.isfile(signature_filepath) and
+            np.array_equal(np.load(signature_filepath), signature)):
+        build_FER_store(filepath, store_path)
+    faces_filepath = os.path.join(store_path, split + '_faces.npy')
+    emotions_filepath = os.path.join(store_path, split + '_emotions.npy')
+    faces = np.load(faces_filepath, mmap_mode='r')
+    emotions = np.load(emotions_filepath)
+    return faces, emotions
+
+
+def resize_faces(faces, size, max_channels=512):
+    """Resizes a batch of gray faces with one OpenCV call per chunk by
+        stacking the faces along the channel axis.
+
+    # Arguments
+        faces: Numpy array of shape ``(N, H, W)``.
+        size: List of two ints.
+        max_channels: Int. Maximum number of faces resized in one call.
+
+    # Returns
+        Float64 numpy array of shape ``(N, size[1], size[0])``.
+    """
+    faces = np.asarray(faces, dtype=np.float64)
+    if tuple(size) == faces.shape[1:][::-1]:
+        return faces
+    resized_faces = np.empty((len(faces), size[1], size[0]))
+    for start in range(0, len(faces), max_channels):
+        chunk = faces[start:start + max_channels].transpose(1, 2, 0)
+        chunk = cv2.resize(chunk, tuple(size)).reshape(size[1], size[0], -1)
+        resized_faces[start:start + max_channels] = chunk.transpose(2, 0, 1)
+    return resized_faces
+
+
+class FERSamples(object):
+    """Lazy sequence of face samples read from a ``uint8`` store.
+        Faces are converted and resized in batches when they are accessed.
+
+    # Arguments
+        faces: Numpy array of shape ``(N, 48, 48)``.
+        labels: Numpy array of shape ``(N, num_classes)``.
+        image_size: List of two ints.
+        sample_args: Array of ints or ``None``. Indices of the faces in the
+            sequence. If ``None`` all faces are used.
+    """
+    def __init__(self, faces, labels, image_size, sample_args=None):
+        if sample_args is None:
+            sample_args = np.arange(len(faces))
+        self.faces = faces
+        self.labels = labels
+        self.image_size = image_size
+        self.sample_args = sample_args
+
+    def __len__(self):
+        return len(self.sample_args)
+
+    def __getitem__(self, arg):
+        if isinstance(arg, slice):
+            sample_args = self.sample_args[arg]
+            faces = resize_faces(self.faces[sample_args], self.image_size)
+            return [{'image': face, 'label': self.labels[sample_arg]}
+                    for face, sample_arg in zip(faces, sample_args)]
+        sample_arg = self.sample_args[arg]
+        face = resize_faces(self.faces[sample_arg:sample_arg + 1],
+                            self.image_size)[0]
+        return {'image': face, 'label': self.labels[sample_arg]}
+
+    def __iter__(self):
+        for start in range(0, len(self), 512):
+            for sample in self[start:start + 512]:
+                yield sample
+
+    def shuffle(self):
+        """Shuffles the order of the samples in place."""
+        np.random.shuffle(self.sample_args)
+
+
 class FER(Loader):
     """Class for loading FER2013 emotion classification dataset.
     # Arguments
@@ -16,14 +140,18 @@ class FER(Loader):
             class names.
         image_size: List of length two. Indicates the shape in which
             the image will be resized.
+        cache_path: String or None. If given, faces are stored in this
+            directory as ``uint8`` ``.npy`` files per split, memory-mapped
+            on later runs, and ``load_data`` returns a lazy ``FERSamples``
+            sequence that resizes the faces in batches.
 
     # References
         -[FER2013 Dataset and Challenge](kaggle.com/c/challenges-in-\
             representation-learning-facial-expression-recognition-challenge)
     """
 
-    def __init__(
-            self, path, split='train', class_names='all', image_size=(48, 48)):
+    def __init__(self, path, split='train', class_names='all',
+                 image_size=(48, 48), cache_path=None):
 
         if class_names == 'all':
             class_names = get_class_names('FER')
@@ -31,10 +159,16 @@ class FER(Loader):
         path = os.path.join(path, 'fer2013.csv')
         super(FER, self).__init__(path, split, class_names, 'FER')
         self.image_size = image_size
-        self._split_to_filter = {'train': 'Training', 'val': 'PublicTest',
-                                 'test': 'PrivateTest'}
+        self.cache_path = cache_path
+        self._split_to_filter = FER_SPLITS
 
     def load_data(self):
+        if self.cache_path is not None:
+            faces, emotions = load_FER_store(
+                self.path, self.cache_path, self.split)
+            emotions = to_categorical(emotions, self.num_classes)
+            return FERSamples(faces, emotions, self.image_size)
+
         data = np.genfromtxt(self.path, str, delimiter=',', skip_header=1)
         data = data[data[:, -1] == self._split_to_filter[self.split]]
         faces = np.zeros((len(data), *self.image_size))
@@ -2,6 +2,7 @@ import os
 import numpy as np
 
 from .utils import get_class_names
+from .fer import FER_SPLITS, FERSamples, load_FER_store
 from ..abstract import Loader
 from ..backend.image import resize_image
 
@@ -20,6 +21,9 @@ class FERPlus(Loader):
             class names.
         image_size: List of length two. Indicates the shape in which
             the image will be resized.
+        cache_path: String or None. If given, faces are read from the
+            ``uint8`` store shared with ``FER`` and ``load_data`` returns a
+            lazy ``FERSamples`` sequence.
 
     # References
         - [FerPlus](https://www.kaggle.com/c/challenges-in-representation-\
@@ -27,7 +31,7 @@ class FERPlus(Loader):
         - [FER2013](https://arxiv.org/abs/1608.01041)
     """
     def __init__(self, path, split='train', class_names='all',
-                 image_size=(48, 48)):
+                 image_size=(48, 48), cache_path=None):
 
         if class_names == 'all':
             class_names = get_class_names('FERPlus')
@@ -35,12 +39,27 @@ class FERPlus(Loader):
         super(FERPlus, self).__init__(path, split, class_names, 'FERPlus')
 
         self.image_size = image_size
+        self.cache_path = cache_path
         self.images_path = os.path.join(self.path, 'fer2013.csv')
         self.labels_path = os.path.join(self.path, 'fer2013new.csv')
-        self.split_to_filter = {
-            'train': 'Training', 'val': 'PublicTest', 'test': 'PrivateTest'}
+        self.split_to_filter = FER_SPLITS
+
+    def _load_labels(self):
+        emotions = np.genfromtxt(self.labels_path, str, '#', ',', 1)
+        emotions = emotions[emotions[:, 0] == self.split_to_filter[self.split]]
+        emotions = emotions[:, 2:10].astype(float)
+        N = np.sum(emotions, axis=1)
+        mask = N != 0
+        return emotions / np.expand_dims(np.where(mask, N, 1), 1), mask
 
     def load_data(self):
+        if self.cache_path is not None:
+            faces, _ = load_FER_store(
+                self.images_path, self.cache_path, self.split)
+            emotions, mask = self._load_labels()
+            return FERSamples(
+                faces, emotions, self.image_size, np.flatnonzero(mask))
+
         data = np.genfromtxt(self.images_path, str, '#', ',', 1)
         data = data[data[:, -1] == self.split_to_filter[self.split]]
         faces = np.zeros((len(data), *self.image_size))
@@ -49,13 +68,8 @@ class FERPlus(Loader):
             face = resize_image(face, self.image_size)
             faces[sample_arg, :, :] = face
 
-        emotions = np.genfromtxt(self.labels_path, str, '#', ',', 1)
-        emotions = emotions[emotions[:, 0] == self.split_to_filter[self.split]]
-        emotions = emotions[:, 2:10].astype(float)
-        N = np.sum(emotions, axis=1)
-        mask = N != 0
-        N, faces, emotions = N[mask], faces[mask], emotions[mask]
-        emotions = emotions / np.expand_dims(N, 1)
+        emotions, mask = self._load_labels()
+        faces, emotions = faces[mask], emotions[mask]
 
         data = []
         for face, emotion in zip(faces, emotions):
@@ -1,13 +1,151 @@
 import os
 import mmap
+import shutil
+from itertools import islice
 
 import numpy as np
 
+from .utils import get_file_signature
 from ..abstract import Loader
 
 
 CLASS_DESCRIPTIONS_FILE = 'class-descriptions-boxable.csv'
 BBOX_ANNOTATIONS_FILE = '{}-annotations-bbox.csv'
+BBOX_INDEX_DIRECTORY = '{}-annotations-bbox-index'
+INDEX_COLUMNS = ['image_ids', 'offsets', 'labels', 'boxes', 'label_names']
+
+
+def build_annotations_index(annotations_filepath, index_path,
+                            chunk_size=1000000):
+    """Converts an OpenImages bounding box CSV file into a columnar index
+        of ``.npy`` files that can be memory-mapped. Boxes are grouped by
+        image, keeping the order in which images and boxes appear in the CSV.
+
+    # Arguments
+        annotations_filepath: String. Path to the bounding box CSV file.
+        index_path: String. Directory in which the index is written.
+        chunk_size: Int. Number of CSV lines parsed at once.
+
+    # Returns
+        String with the ``index_path``.
+    """
+    image_to_arg, label_to_arg = dict(), dict()
+    image_args, labels, boxes = [], [], []
+    with open(annotations_filepath, 'r') as annotations_file:
+        annotations_file.readline()
+        while True:
+            lines = list(islice(annotations_file, chunk_size))
+            if len(lines) == 0:
+                break
+            rows = [line.split(',', 8) for line in lines]
+            columns = list(zip(*rows))
+            image_args.append(np.array([image_to_arg.setdefault(
+                image_id, len(image_to_arg)) for image_id in columns[0]],
+                dtype=np.int64))
+            labels.append(np.array([label_to_arg.setdefault(
+                label, len(label_to_arg)) for label in columns[2]],
+                dtype=np.int32))
+            x_min, x_max, y_min, y_max = columns[4:8]
+            boxes.append(np.array([x_min, y_min, x_max, y_max],
+                                  dtype=np.float32).T)
+    image_args = np.concatenate(image_args + [np.zeros(0, np.int64)])
+    labels = np.concatenate(labels + [np.zeros(0, np.int32)])
+    boxes = np.concatenate(boxes + [np.zeros((0, 4), np.float32)])
+    sorted_args = np.argsort(image_args, kind='stable')
+    num_boxes = np.bincount(image_args, minlength=len(image_to_arg))
+    index = {'image_ids': np.array(list(image_to_arg.keys()), dtype=str),
+             'offsets': np.concatenate([[0], np.cumsum(num_boxes)]),
+             'labels': labels[sorted_args],
+             'boxes': boxes[sorted_args],
+             'label_names': np.array(list(label_to_arg.keys()), dtype=str)}
+
+    temporal_path = index_path.rstrip(os.sep) + '.tmp'
+    if os.path.exists(temporal_path):
+        shutil.rmtree(temporal_path)
+    os.makedirs(temporal_path)
+    for column_name, column in index.items():
+        np.save(os.path.join(temporal_path, column_name + '.npy'), column)
+    signature = get_file_signature(annotations_filepath)
+    np.save(os.path.join(temporal_path, 'signature.npy'), signature)
+    if os.path.exists(index_path):
+        shutil.rmtree(index_path)
+    os.replace(temporal_path, index_path)
+    return index_path
+
+
+def load_annotations_index(annotations_filepath, index_path):
+    """Loads the memory-mapped columns of an OpenImages bounding box index.
+        The index is (re)built if it is missing or if the CSV file changed.
+
+    # Arguments
+        annotations_filepath: String. Path to the bounding box CSV file.
+        index_path: String. Directory of the index.
+
+    # Returns
+        Dictionary with keys ``image_ids``, ``offsets``, ``labels``,
+            ``boxes`` and ``label_names``.
+    """
+    signature_filepath = os.path.join(index_path, 'signature.npy')
+    signature = get_file_signature(annotations_filepath)
+    if not (os.path.isfile(signature_filepath) and
+            np.array_equal(np.load(signature_filepath), signature)):
+        build_annotations_index(annotations_filepath, index_path)
+    index = dict()
+    for column_name in INDEX_COLUMNS:
+        filepath = os.path.join(index_path, column_name + '.npy')
+        index[column_name] = np.load(filepath, mmap_mode='r')
+    return index
+
+
+class OpenImagesSamples(object):
+    """Lazy sequence of OpenImages samples. Each sample is materialized
+        from the memory-mapped index only when it is accessed.
+
+    # Arguments
+        images_path: String. Directory containing the images.
+        image_ids: Array of strings with the id of every indexed image.
+        image_args: Array of ints. Indices of the images in the sequence.
+        offsets: Array of ints. Start of the boxes of every image.
+        boxes: Array of shape ``(num_boxes, 4)``.
+        class_args: Array of shape ``(num_boxes)``. Class argument of
+            every box or ``-1`` if the box is filtered out.
+    """
+    def __init__(self, images_path, image_ids, image_args, offsets, boxes,
+                 class_args):
+        self.images_path = images_path
+        self.image_ids = image_ids
+        self.image_args = image_args
+        self.offsets = offsets
+        self.boxes = boxes
+        self.class_args = class_args
+
+    def __len__(self):
+        return len(self.image_args)
+
+    def _get_sample(self, image_arg):
+        start, end = self.offsets[image_arg], self.offsets[image_arg + 1]
+        class_args = self.class_args[start:end]
+        mask = class_args >= 0
+        boxes = np.empty((np.count_nonzero(mask), 5), dtype=np.float32)
+        boxes[:, :4] = self.boxes[start:end][mask]
+        boxes[:, 4] = class_args[mask]
+        image_path = os.path.join(
+            self.images_path, str(self.image_ids[image_arg]) + '.jpg')
+        return {'image': image_path, 'boxes': boxes}
+
+    def __getitem__(self, arg):
+        if isinstance(arg, slice):
+            return [self._get_sample(image_arg)
+                    for image_arg in self.image_args[arg]]
+        return self._get_sample(self.image_args[arg])
+
+    def __iter__(self):
+        for image_arg in self.image_args:
+            yield self._get_sample(image_arg)
+
+    def shuffle(self):
+        """Shuffles the order of the samples in place."""
+        np.random.shuffle(self.image_args)
 
 
 class OpenImages(Loader):
@@ -20,10 +158,13 @@ class OpenImages(Loader):
             e.g. `train`, `val` or `test`
         class_names: `all` or list. If list it should contain as elements
             the strings of the class names.
+        index_path: String or None. Directory of the memory-mapped
+            annotation index. If ``None`` it is placed next to the CSV
+            file. The index is built the first time the split is loaded.
 
     """
-    # TODO Allow selection of subset of class names.
-    def __init__(self, path, split='train', class_names='all'):
+    def __init__(self, path, split='train', class_names='all',
+                 index_path=None):
 
         if split == 'val':
             split = 'validation'
@@ -34,6 +175,11 @@ class OpenImages(Loader):
         super(OpenImages, self).__init__(
             path, split, class_names, 'OpenImages')
 
+        if index_path is None:
+            index_path = os.path.join(
+                self.path, BBOX_INDEX_DIRECTORY.format(self.split))
+        self.index_path = index_path
+
         self.machine_to_human_name = dict()
         self.machine_to_arg = dict()
         self.load_class_names()
@@ -43,7 +189,7 @@ class OpenImages(Loader):
 
     def load_class_names(self):
         classes_file = os.path.join(self.path, CLASS_DESCRIPTIONS_FILE)
-        class_data = np.loadtxt(classes_file, delimiter=",", dtype=np.str)
+        class_data = np.loadtxt(classes_file, delimiter=",", dtype=str)
 
         # class ID zero is background
         self.machine_to_arg['background'] = 0
@@ -77,52 +223,35 @@ class OpenImages(Loader):
         return lines
 
     def load_data(self):
+        """Loads the split from its memory-mapped annotation index.
 
-        data = dict()
+        # Returns
+            ``OpenImagesSamples`` sequence whose elements are dictionaries
+                with keys ``image`` and ``boxes``. Boxes are float32
+                arrays of shape ``(num_boxes, 5)``.
+        """
         annotations_filepath = os.path.join(
             self.path, BBOX_ANNOTATIONS_FILE.format(self.split))
-        # num_lines = self._get_num_lines(annotations_filepath)
-        machine_names = self.machine_to_human_name.keys()
-        # load file manually, line by line, in order to reduce memory usage
-        with open(annotations_filepath, 'r') as annotations_file:
-            # skip header
-            annotations_file.readline()
-
-            # for line in tqdm(annotations_file, total=num_lines):
-            for line in annotations_file:
-                row = line.split(",")
-
-                image_filename = row[0] + ".jpg"
-                x_min = float(row[4])
-                x_max = float(row[5])
-                y_min = float(row[6])
-                y_max = float(row[7])
-
-                machine_name = row[2]
-                if machine_name not in machine_names:
-                    continue
-
-                human_name = self.machine_to_human_name[machine_name]
-
-                absolute_image_path = os.path.join(
-                    self.path, self.split, image_filename)
-
-                if human_name in self.class_names:
-                    class_arg = self.machine_to_arg[machine_name]
-
-                    if absolute_image_path not in data:
-                        data[absolute_image_path] = []
+        index = load_annotations_index(annotations_filepath, self.index_path)
+        label_to_class_arg = np.array(
+            [self.machine_to_arg.get(label_name, -1)
+             for label_name in index['label_names']], dtype=np.int32)
+        class_args = label_to_class_arg[index['labels']]
+        selected = np.concatenate([[0], np.cumsum(class_args >= 0)])
+        offsets = np.asarray(index['offsets'])
+        num_boxes = selected[offsets[1:]] - selected[offsets[:-1]]
+        image_args = np.flatnonzero(num_boxes > 0)
 
-                    sample_data = [x_min, y_min, x_max, y_max, class_arg]
-                    data[absolute_image_path].append(sample_data)
-                    self.class_distribution[human_name] += 1
+        class_counts = np.bincount(class_args[class_args >= 0],
+                                   minlength=len(self.class_names))
+        for class_arg, class_name in enumerate(self.class_names):
+            self.class_distribution[class_name] = int(class_counts[class_arg])
 
-        formatted_data = []
-        for image_path, ground_truth in data.items():
-            sample = {'image': image_path, 'boxes': ground_truth}
-            formatted_data.append(sample)
+        images_path = os.path.join(self.path, self.split)
+        data = OpenImagesSamples(images_path, index['image_ids'], image_args,
+                                 offsets, index['boxes'], class_args)
 
         msg = '{} split: loaded {} images with {} bounding box annotations'
         num_of_boxes = sum(self.class_distribution.values())
         print(msg.format(self.split, len(data), num_of_boxes))
-        return formatted_data
+        return data
@@ -1,3 +1,7 @@
+import os
+import numpy as np
+
+
 def get_class_names(dataset_name='VOC2007'):
     """Gets label names for the classes of the supported datasets.
 
@@ -93,3 +97,17 @@ def get_arg_to_class(class_names):
     """
 
     return dict(zip(list(range(len(class_names))), class_names))
+
+
+def get_file_signature(filepath):
+    """Computes a signature of a file used to invalidate cached data.
+
+    # Arguments
+        filepath: String. Path to file.
+
+    # Returns
+        Numpy array with the modification time in nanoseconds and the size
+            in bytes of the file.
+    """
+    file_stats = os.stat(filepath)
+    return np.array([file_stats.st_mtime_ns, file_stats.st_size], np.int64)
@@ -1,4 +1,5 @@
 import os
+import hashlib
 from xml.etree import ElementTree
 from .utils import get_class_names
 
@@ -21,6 +22,9 @@ class VOC(Loader):
             will be added to the returned data.
         evaluate: Boolean. If ``True`` returned data will be loaded without
             normalization for a direct evaluation.
+        cache_path: String or None. Directory in which the parsed
+            annotations are cached. The cache is invalidated if any
+            annotation file is modified.
 
     # Return
         data: List of dictionaries with keys corresponding to the image paths
@@ -31,12 +35,14 @@ class VOC(Loader):
     """
     # TODO check for split
     def __init__(self, path=None, split='train', class_names='all',
-                 name='VOC2007', with_difficult_samples=True, evaluate=False):
+                 name='VOC2007', with_difficult_samples=True, evaluate=False,
+                 cache_path=None):
 
         super(VOC, self).__init__(path, split, class_names, name)
 
         self.with_difficult_samples = with_difficult_samples
         self.evaluate = evaluate
+        self.cache_path = cache_path
         self._class_names = class_names
         if class_names == 'all':
             self._class_names = get_class_names('VOC')
@@ -63,7 +69,8 @@ class VOC(Loader):
                                 self._class_names,
                                 self.with_difficult_samples,
                                 self.path,
-                                self.evaluate)
+                                self.evaluate,
+                                self.cache_path)
         self.images_path = self.parser.images_path
         self.arg_to_class = self.parser.arg_to_class
         ground_truth_data = self.parser.load_data()
@@ -77,6 +84,8 @@ class VOCParser(object):
 
     # Arguments
         data_path: Data path to VOC2007 annotations
+        cache_path: String or None. Directory in which the parsed
+            annotations are cached as an ``.npz`` file.
 
     # Return
         data: Dictionary which keys correspond to the image names
@@ -87,7 +96,7 @@ class VOCParser(object):
     def __init__(self, dataset_name='VOC2007', split='train',
                  class_names='all', with_difficult_samples=True,
                  dataset_path='../datasets/VOCdevkit/',
-                 evaluate=False):
+                 evaluate=False, cache_path=None):
 
         if dataset_name not in ['VOC2007', 'VOC2012']:
             raise Exception('Invalid dataset name.')
@@ -101,6 +110,7 @@ class VOCParser(object):
         self.images_path = os.path.join(self.dataset_path, 'JPEGImages/')
         self.with_difficult_samples = with_difficult_samples
         self.evaluate = evaluate
+        self.cache_path = cache_path
 
         self.class_names = class_names
         if self.class_names == 'all':
@@ -121,8 +131,62 @@ class VOCParser(object):
             splitted_filenames.append(filename)
         return splitted_filenames
 
+    def _get_cache_filepath(self):
+        key = [os.path.abspath(self.dataset_path), self.split,
+               list(self.class_names), self.with_difficult_samples,
+               self.evaluate]
+        key = hashlib.sha1(repr(key).encode()).hexdigest()
+        filename = '_'.join([self.dataset_name, self.split, key]) + '.npz'
+        return os.path.join(self.cache_path, filename)
+
+    def _compute_mtimes(self, filenames):
+        split_file = os.path.join(self.split_prefix, self.split) + '.txt'
+        filepaths = [split_file] + [self.annotations_path + filename
+                                    for filename in filenames]
+        return np.array([os.stat(filepath).st_mtime_ns
+                         for filepath in filepaths], dtype=np.int64)
+
+    def _load_cache(self, filepath, mtimes):
+        if not os.path.isfile(filepath):
+            return False
+        with np.load(filepath) as cache:
+            if not np.array_equal(cache['mtimes'], mtimes):
+                return False
+            splits = np.cumsum(cache['num_boxes'])[:-1]
+            image_names = cache['image_names'].tolist()
+            boxes = np.split(cache['boxes'], splits)
+            difficulties = np.split(cache['difficulties'], splits)
+        for image_name, box_data, difficulty in zip(
+                image_names, boxes, difficulties):
+            sample = {'image': self.images_path + image_name,
+                      'boxes': box_data}
+            if self.evaluate:
+                sample['difficulties'] = difficulty
+            self.data.append(sample)
+        return True
+
+    def _save_cache(self, filepath, image_names, difficulties, mtimes):
+        if not os.path.exists(self.cache_path):
+            os.makedirs(self.cache_path)
+        boxes = [sample['boxes'] for sample in self.data]
+        num_boxes = np.array([len(box_data) for box_data in boxes])
+        boxes = np.concatenate(boxes + [np.zeros((0, 5))])
+        difficulties = np.concatenate(difficulties + [np.zeros(0, bool)])
+        temporal_filepath = filepath + '.tmp'
+        with open(temporal_filepath, 'wb') as cache_file:
+            np.savez(cache_file, image_names=np.array(image_names, dtype=str),
+                     num_boxes=num_boxes, boxes=boxes,
+                     difficulties=difficulties, mtimes=mtimes)
+        os.replace(temporal_filepath, filepath)
+
     def _preprocess_XML(self):
         filenames = self._load_filenames()
+        if self.cache_path is not None:
+            mtimes = self._compute_mtimes(filenames)
+            cache_filepath = self._get_cache_filepath()
+            if self._load_cache(cache_filepath, mtimes):
+                return
+        image_names, images_difficulties = [], []
         for filename in filenames:
             filename_path = self.annotations_path + filename
             tree = ElementTree.parse(filename_path)
@@ -166,12 +230,17 @@ class VOCParser(object):
             image_path = self.images_path + image_name
             box_data = np.asarray(box_data)
             difficulties = np.asarray(difficulties, dtype=bool)
+            image_names.append(image_name)
+            images_difficulties.append(difficulties)
             if self.evaluate:
                 self.data.append({'image': image_path,
                                   'boxes': box_data,
                                   'difficulties': difficulties})
             else:
                 self.data.append({'image': image_path, 'boxes': box_data})
+        if self.cache_path is not None:
+            self._save_cache(
+                cache_filepath, image_names, images_difficulties, mtimes)
 
     def load_data(self):
         return self.data
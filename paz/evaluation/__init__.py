@@ -1 +1,4 @@
 from .detection import evaluateMAP
+from .detection import evaluateMAPParallel
+from .detection import IncrementalMAPEvaluator
+from .detection import DetectionsCache
@@ -1,8 +1,114 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from ..backend.boxes import compute_ious
 from ..backend.image import load_image
 
 
+def match_detections(predicted_boxes, predicted_class_args,
+                     predicted_scores, ground_truth_boxes,
+                     ground_truth_class_args, difficulties=None,
+                     iou_thresh=0.5):
+    """Matches the predictions of a single image to its ground truths.
+
+    Arguments:
+        predicted_boxes: Array of shape ``(num_predictions, 4)``.
+        predicted_class_args: Array of shape ``(num_predictions)``.
+        predicted_scores: Array of shape ``(num_predictions)``.
+        ground_truth_boxes: Array of shape ``(num_ground_truths, 4)``.
+        ground_truth_class_args: Array of shape ``(num_ground_truths)``.
+        difficulties: Boolean array of shape ``(num_ground_truths)`` or
+            None. If None all ground truths are considered ``Easy``.
+        iou_thresh (float): A prediction is correct if its Intersection over
+            Union with the ground truth is above this value..
+
+    Returns:
+        List of tuples ``(class_arg, num_easy, scores, matches)`` for each
+            class present in the image. ``scores`` and ``matches`` are
+            sorted from maximum to minimum score. A match is 1 for true
+            positives, 0 for false positives and -1 for difficult ones.
+    """
+    # setting difficulties to ``Easy`` if they are None
+    if difficulties is None:
+        difficulties = np.zeros(len(ground_truth_boxes), dtype=bool)
+    # iterating over each class present in the image
+    class_args = np.concatenate(
+        (predicted_class_args, ground_truth_class_args))
+    class_args = np.unique(class_args).astype(int)
+    image_matches = []
+    for class_arg in class_args:
+        # masking predictions by class
+        class_mask = class_arg == predicted_class_args
+        class_predicted_boxes = predicted_boxes[class_mask]
+        class_predicted_scores = predicted_scores[class_mask]
+        # sort score from maximum to minimum for masked predictions
+        sorted_args = class_predicted_scores.argsort()[::-1]
+        class_predicted_boxes = class_predicted_boxes[sorted_args]
+        class_predicted_scores = class_predicted_scores[sorted_args]
+        # masking ground truths by class
+        class_mask = class_arg == ground_truth_class_args
+        class_ground_truth_boxes = ground_truth_boxes[class_mask]
+        class_difficulties = difficulties[class_mask]
+        # the number of positives equals the number of easy boxes
+        num_easy = np.logical_not(class_difficulties).sum()
+        class_matches = np.zeros(len(class_predicted_boxes), dtype=np.int8)
+        image_matches.append(
+            (class_arg, num_easy, class_predicted_scores, class_matches))
+        # if not predicted or ground truth boxes all matches are zeros
+        if ((len(class_predicted_boxes) == 0) or
+                (len(class_ground_truth_boxes) == 0)):
+            continue
+
+        # evaluation on VOC follows integer typed bounding boxes.
+        class_predicted_boxes = class_predicted_boxes.copy()
+        class_predicted_boxes[:, 2:] = (
+            class_predicted_boxes[:, 2:] + 1)
+        class_ground_truth_boxes = class_ground_truth_boxes.copy()
+        class_ground_truth_boxes[:, 2:] = (
+            class_ground_truth_boxes[:, 2:] + 1)
+
+        ious = compute_ious(
+            class_predicted_boxes, class_ground_truth_boxes)
+        ground_truth_args = ious.argmax(axis=1)
+        # set -1 if there is no matching ground truth
+        ground_truth_args[ious.max(axis=1) < iou_thresh] = -1
+        selected = np.zeros(len(class_ground_truth_boxes), dtype=bool)
+        for arg, ground_truth_arg in enumerate(ground_truth_args):
+            if ground_truth_arg >= 0:
+                if class_difficulties[ground_truth_arg]:
+                    class_matches[arg] = -1
+                elif not selected[ground_truth_arg]:
+                    class_matches[arg] = 1
+                selected[ground_truth_arg] = True
+    return image_matches
+
+
+def boxes2D_to_arrays(boxes2D, class_to_arg):
+    """Transforms a list of ``Boxes2D`` into arrays of predictions.
+
+    Arguments:
+        boxes2D: List of ``Boxes2D`` messages.
+        class_to_arg: Dict. of class names and their id
+
+    Returns:
+        predicted_boxes: Array of shape ``(num_boxes, 4)``.
+        predicted_class_args: Array of shape ``(num_boxes)``.
+        predicted_scores: Array of shape ``(num_boxes)``.
+    """
+    predicted_boxes, predicted_class_args, predicted_scores = [], [], []
+    for box2D in boxes2D:
+        predicted_scores.append(box2D.score)
+        predicted_class_args.append(class_to_arg[box2D.class_name])
+        predicted_boxes.append(list(box2D.coordinates))
+    predicted_boxes = np.array(predicted_boxes, dtype=np.float32)
+    predicted_class_args = np.array(predicted_class_args)
+    predicted_scores = np.array(predicted_scores, dtype=np.float32)
+    return predicted_boxes, predicted_class_args, predicted_scores
+
+
 def compute_matches(dataset, detector, class_to_arg, iou_thresh=0.5):
     """
     Arguments:
@@ -18,7 +124,6 @@ def compute_matches(dataset, detector, class_to_arg, iou_thresh=0.5):
         score: Dict. containing matching scores of boxes for each class
         match: Dict. containing match/non-match info of boxes in each class
     """
-    # classes_count = len(np.unique(np.concatenate(ground_truth_class_args)))
     num_classes = len(class_to_arg)
     num_positives = {label_id: 0 for label_id in range(1, num_classes + 1)}
     score = {label_id: [] for label_id in range(1, num_classes + 1)}
@@ -34,73 +139,14 @@ def compute_matches(dataset, detector, class_to_arg, iou_thresh=0.5):
         # obtaining predictions
         image = load_image(sample['image'])
         results = detector(image)
-        predicted_boxes, predicted_class_args, predicted_scores = [], [], []
-        for box2D in results['boxes2D']:
-            predicted_scores.append(box2D.score)
-            predicted_class_args.append(class_to_arg[box2D.class_name])
-            predicted_boxes.append(list(box2D.coordinates))
-        predicted_boxes = np.array(predicted_boxes, dtype=np.float32)
-        predicted_class_args = np.array(predicted_class_args)
-        predicted_scores = np.array(predicted_scores, dtype=np.float32)
-        # setting difficulties to ``Easy`` if they are None
-        if difficulties is None:
-            difficulties = np.zeros(len(ground_truth_boxes), dtype=bool)
-        # iterating over each class present in the image
-        class_args = np.concatenate(
-            (predicted_class_args, ground_truth_class_args))
-        class_args = np.unique(class_args).astype(int)
-        for class_arg in class_args:
-            # masking predictions by class
-            class_mask = class_arg == predicted_class_args
-            class_predicted_boxes = predicted_boxes[class_mask]
-            class_predicted_scores = predicted_scores[class_mask]
-            # sort score from maximum to minimum for masked predictions
-            sorted_args = class_predicted_scores.argsort()[::-1]
-            class_predicted_boxes = class_predicted_boxes[sorted_args]
-            class_predicted_scores = class_predicted_scores[sorted_args]
-            # masking ground truths by class
-            class_mask = class_arg == ground_truth_class_args
-            class_ground_truth_boxes = ground_truth_boxes[class_mask]
-            class_difficulties = difficulties[class_mask]
-            # the number of positives equals the number of easy boxes
-            num_easy = np.logical_not(class_difficulties).sum()
+        predictions = boxes2D_to_arrays(results['boxes2D'], class_to_arg)
+        image_matches = match_detections(
+            *predictions, ground_truth_boxes, ground_truth_class_args,
+            difficulties, iou_thresh)
+        for class_arg, num_easy, class_scores, class_matches in image_matches:
             num_positives[class_arg] = num_positives[class_arg] + num_easy
-            # add all predicted scores to scores
-            score[class_arg].extend(class_predicted_scores)
-            # if not predicted boxes for this class continue
-            if len(class_predicted_boxes) == 0:
-                continue
-            # if not ground truth boxes continue but add zeros as matches
-            if len(class_ground_truth_boxes) == 0:
-                match[class_arg].extend((0,) * len(class_predicted_boxes))
-                continue
-
-            # evaluation on VOC follows integer typed bounding boxes.
-            class_predicted_boxes = class_predicted_boxes.copy()
-            class_predicted_boxes[:, 2:] = (
-                class_predicted_boxes[:, 2:] + 1)
-            class_ground_truth_boxes = class_ground_truth_boxes.copy()
-            class_ground_truth_boxes[:, 2:] = (
-                class_ground_truth_boxes[:, 2:] + 1)
-
-            ious = compute_ious(
-                class_predicted_boxes, class_ground_truth_boxes)
-            ground_truth_args = ious.argmax(axis=1)
-            # set -1 if there is no matching ground truth
-            ground_truth_args[ious.max(axis=1) < iou_thresh] = -1
-            selected = np.zeros(len(class_ground_truth_boxes), dtype=bool)
-            for ground_truth_arg in ground_truth_args:
-                if ground_truth_arg >= 0:
-                    if class_difficulties[ground_truth_arg]:
-                        match[class_arg].append(-1)
-                    else:
-                        if not selected[ground_truth_arg]:
-                            match[class_arg].append(1)
-                        else:
-                            match[class_arg].append(0)
-                    selected[ground_truth_arg] = True
-                else:
-                    match[class_arg].append(0)
+            score[class_arg].extend(class_scores)
+            match[class_arg].extend(class_matches)
     return num_positives, score, match
 
 
@@ -203,3 +249,333 @@ def evaluateMAP(detector, dataset, class_to_arg, iou_thresh=0.5,
     average_precisions = calculate_average_precisions(
         precision, recall, use_07_metric)
     return {'ap': average_precisions, 'map': np.nanmean(average_precisions)}
+
+
+class IncrementalMAPEvaluator(object):
+    """Accumulates detection matches image by image for computing the mean
+    average precision at any time, without re-running a detector.
+
+    Scores and matches are stored per class in growable numpy buffers.
+    Evaluators of different shards (e.g. evaluated in separate processes)
+    can be pickled and combined with ``merge``.
+
+    # Arguments
+        class_to_arg: Dict. of class names and their id
+        iou_thresh: Float indicating intersection over union threshold for
+            assigning a prediction as correct.
+        buffer_size: Int. Initial number of detections allocated per class.
+
+    # Example
+        ``` python
+        evaluator = IncrementalMAPEvaluator(class_to_arg)
+        for sample in dataset:
+            boxes2D = detect(load_image(sample['image']))['boxes2D']
+            evaluator.add(boxes2D, sample)
+        result = evaluator.compute(use_07_metric=True)
+        ```
+    """
+    def __init__(self, class_to_arg, iou_thresh=0.5, buffer_size=256):
+        self.class_to_arg = class_to_arg
+        self.num_classes = len(class_to_arg)
+        self.iou_thresh = iou_thresh
+        num_labels = self.num_classes + 1
+        self.num_positives = np.zeros(num_labels, dtype=np.int64)
+        self.sizes = np.zeros(num_labels, dtype=np.int64)
+        self.scores = [np.empty(buffer_size, dtype=np.float32)
+                       for _ in range(num_labels)]
+        self.matches = [np.empty(buffer_size, dtype=np.int8)
+                        for _ in range(num_labels)]
+
+    def _to_prediction_arrays(self, predictions):
+        if isinstance(predictions, np.ndarray):
+            predictions = predictions.reshape(-1, 6)
+            return (predictions[:, :4].astype(np.float32),
+                    predictions[:, 4].astype(int),
+                    predictions[:, 5].astype(np.float32))
+        return boxes2D_to_arrays(predictions, self.class_to_arg)
+
+    def _to_ground_truth_arrays(self, ground_truth):
+        difficulties = None
+        if isinstance(ground_truth, dict):
+            if 'difficulties' in ground_truth.keys():
+                difficulties = np.array(ground_truth['difficulties'])
+            ground_truth = ground_truth['boxes']
+        ground_truth = np.asarray(ground_truth).reshape(-1, 5)
+        return ground_truth[:, :4], ground_truth[:, 4], difficulties
+
+    def _append(self, class_arg, scores, matches):
+        start = self.sizes[class_arg]
+        stop = start + len(scores)
+        capacity = len(self.scores[class_arg])
+        if stop > capacity:
+            capacity = max(stop, 2 * capacity)
+            self.scores[class_arg] = np.resize(
+                self.scores[class_arg][:start], capacity)
+            self.matches[class_arg] = np.resize(
+                self.matches[class_arg][:start], capacity)
+        self.scores[class_arg][start:stop] = scores
+        self.matches[class_arg][start:stop] = matches
+        self.sizes[class_arg] = stop
+
+    def add(self, predictions, ground_truth):
+        """Matches the predictions of one image and stores the results.
+
+        # Arguments
+            predictions: List of ``Boxes2D`` or array of shape
+                ``(num_boxes, 6)`` containing in each row
+                ``[x_min, y_min, x_max, y_max, class_arg, score]``.
+            ground_truth: Array of shape ``(num_boxes, 5)`` containing in
+                each row ``[x_min, y_min, x_max, y_max, class_arg]`` or
+                dataset sample with key ``boxes`` and optionally the key
+                ``difficulties``.
+        """
+        image_matches = match_detections(
+            *self._to_prediction_arrays(predictions),
+            *self._to_ground_truth_arrays(ground_truth),
+            iou_thresh=self.iou_thresh)
+        for class_arg, num_easy, class_scores, class_matches in image_matches:
+            self.num_positives[class_arg] += num_easy
+            self._append(class_arg, class_scores, class_matches)
+
+    def merge(self, evaluator):
+        """Adds the stored results of another evaluator to this one.
+
+        # Arguments
+            evaluator: ``IncrementalMAPEvaluator``.
+
+        # Returns
+            This evaluator.
+        """
+        if evaluator.num_classes != self.num_classes:
+            raise ValueError('Evaluators have different number of classes')
+        if evaluator.iou_thresh != self.iou_thresh:
+            raise ValueError('Evaluators have different IOU thresholds')
+        self.num_positives = self.num_positives + evaluator.num_positives
+        for class_arg, size in enumerate(evaluator.sizes):
+            self._append(class_arg, evaluator.scores[class_arg][:size],
+                         evaluator.matches[class_arg][:size])
+        return self
+
+    def compute(self, use_07_metric=False):
+        """Calculates average precisions of all results added so far.
+
+        # Arguments
+            use_07_metric: Boolean. If True the 11 point metric of
+                PASCAL VOC 2007 is used, otherwise the area under the
+                precision-recall curve.
+
+        # Returns
+            Dictionary with average precision per class ``ap`` and mean
+                average precision ``map`` as in ``evaluateMAP``.
+        """
+        class_args = range(1, self.num_classes + 1)
+        num_positives = {arg: self.num_positives[arg] for arg in class_args}
+        scores, matches = {}, {}
+        for class_arg in class_args:
+            size = self.sizes[class_arg]
+            scores[class_arg] = self.scores[class_arg][:size]
+            matches[class_arg] = self.matches[class_arg][:size]
+        precision, recall = calculate_relevance_metrics(
+            num_positives, scores, matches)
+        average_precisions = calculate_average_precisions(
+            precision, recall, use_07_metric)
+        return {'ap': average_precisions,
+                'map': np.nanmean(average_precisions)}
+
+
+def compute_weights_hash(model):
+    """Computes a hash of all the weights of a model.
+
+    # Arguments
+        model: Keras model.
+
+    # Returns
+        String with the hexadecimal SHA1 digest of the weights.
+    """
+    weights_hash = hashlib.sha1()
+    for weights in model.get_weights():
+        weights_hash.update(np.ascontiguousarray(weights).tobytes())
+    return weights_hash.hexdigest()
+
+
+def _compute_detector_hash(detector):
+    weights_hash = compute_weights_hash(detector.model)
+    thresholds = (getattr(detector, 'score_thresh', None),
+                  getattr(detector, 'nms_thresh', None))
+    detector_hash = weights_hash + repr(thresholds)
+    return hashlib.sha1(detector_hash.encode('utf-8')).hexdigest()
+
+
+class DetectionsCache(object):
+    """Disk cache of detections keyed by the weights hash of the detector
+    and the image path.
+
+    All detections of one weights hash are stored in a single ``.npz`` file
+    as arrays of shape ``(num_boxes, 6)`` containing in each row
+    ``[x_min, y_min, x_max, y_max, class_arg, score]``.
+
+    # Arguments
+        directory: String. Directory where the cache files are written.
+        weights_hash: String identifying the detector weights. Detector
+            parameters changing its outputs (e.g. thresholds) should also be
+            included in this string.
+    """
+    def __init__(self, directory, weights_hash):
+        self.directory = directory
+        self.weights_hash = weights_hash
+        self.filepath = os.path.join(directory, weights_hash + '.npz')
+        self.detections = self._load()
+
+    def _load(self):
+        if not os.path.isfile(self.filepath):
+            return {}
+        with np.load(self.filepath) as data:
+            splits = np.cumsum(data['num_boxes'])[:-1]
+            detections = np.split(data['detections'], splits)
+            paths = data['paths'].tolist()
+        return dict(zip(paths, detections))
+
+    def __contains__(self, path):
+        return path in self.detections
+
+    def __getitem__(self, path):
+        return self.detections[path]
+
+    def __setitem__(self, path, detections):
+        self.detections[path] = np.asarray(detections).reshape(-1, 6)
+
+    def save(self):
+        """Writes all detections to ``filepath``."""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        paths = list(self.detections.keys())
+        detections = [self.detections[path] for path in paths]
+        num_boxes = [len(path_detections) for path_detections in detections]
+        detections = np.concatenate(detections + [np.zeros((0, 6))])
+        np.savez(self.filepath, paths=np.array(paths, dtype=str),
+                 num_boxes=np.array(num_boxes, dtype=np.int64),
+                 detections=detections)
+
+
+def boxes2D_to_detections(boxes2D, class_to_arg):
+    """Transforms a list of ``Boxes2D`` into an array of shape
+    ``(num_boxes, 6)`` with rows ``[x_min, y_min, x_max, y_max, class_arg,
+    score]``.
+    """
+    boxes, class_args, scores = boxes2D_to_arrays(boxes2D, class_to_arg)
+    detections = np.zeros((len(boxes2D), 6))
+    if len(boxes2D) > 0:
+        detections[:, :4] = boxes
+        detections[:, 4] = class_args
+        detections[:, 5] = scores
+    return detections
+
+
+def detect_images(detector, image_paths, class_to_arg, batch_size=16,
+                  num_workers=4, cache=None):
+    """Detects objects in all images, decoding the images of the next batch
+    in a thread pool while the detector runs on the current one.
+
+    # Arguments
+        detector: Function for performing inference. If it has a
+            ``call_batch`` method, e.g. ``DetectSingleShot``, images are
+            given to the detector in batches.
+        image_paths: List of strings with the full path of each image.
+        class_to_arg: Dict. of class names and their id
+        batch_size: Int. Number of images given together to the detector.
+        num_workers: Int. Number of threads decoding images.
+        cache: ``DetectionsCache`` or None. Images in the cache are not
+            decoded nor detected and new detections are added to it.
+
+    # Returns
+        List of detection arrays of shape ``(num_boxes, 6)`` and dictionary
+            with the seconds spent waiting for ``decode`` and
+            ``inference``.
+    """
+    timings = {'decode': 0.0, 'inference': 0.0}
+    detections = [None] * len(image_paths)
+    missing_args = []
+    for path_arg, image_path in enumerate(image_paths):
+        if cache is not None and image_path in cache:
+            detections[path_arg] = cache[image_path]
+        else:
+            missing_args.append(path_arg)
+    batches_args = [missing_args[start:start + batch_size]
+                    for start in range(0, len(missing_args), batch_size)]
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        def decode(batch_args):
+            return [executor.submit(load_image, image_paths[arg])
+                    for arg in batch_args]
+
+        next_images = decode(batches_args[0]) if batches_args else []
+        for batch_arg, batch_args in enumerate(batches_args):
+            start = time.perf_counter()
+            images = [image.result() for image in next_images]
+            timings['decode'] += time.perf_counter() - start
+            if batch_arg + 1 < len(batches_args):
+                next_images = decode(batches_args[batch_arg + 1])
+
+            start = time.perf_counter()
+            if hasattr(detector, 'call_batch'):
+                results = detector.call_batch(images)
+            else:
+                results = [detector(image) for image in images]
+            timings['inference'] += time.perf_counter() - start
+            for arg, result in zip(batch_args, results):
+                detections[arg] = boxes2D_to_detections(
+                    result['boxes2D'], class_to_arg)
+                if cache is not None:
+                    cache[image_paths[arg]] = detections[arg]
+    if cache is not None and len(missing_args) > 0:
+        cache.save()
+    return detections, timings
+
+
+def evaluateMAPParallel(detector, dataset, class_to_arg, iou_thresh=0.5,
+                        use_07_metric=False, batch_size=16, num_workers=4,
+                        cache_directory=None, weights_hash=None):
+    """Calculate average precisions as ``evaluateMAP`` while decoding
+    images in parallel, running the detector in batches and caching its
+    detections to disk.
+
+    # Arguments
+        detector: Function for performing inference. If it has a
+            ``call_batch`` method images are detected in batches.
+        dataset: List of dictionaries containing 'image' as key and a
+            string with the image path as value.
+        class_to_arg: Dict. of class names and their id
+        iou_thresh: Float indicating intersection over union threshold for
+            assigning a prediction as correct.
+        use_07_metric: Boolean. If True the PASCAL VOC 2007 11 point metric
+            is used.
+        batch_size: Int. Number of images given together to the detector.
+        num_workers: Int. Number of threads decoding images.
+        cache_directory: String or None. If given, detections are cached in
+            this directory and reused when evaluating again, e.g. with a
+            different ``iou_thresh`` or ``use_07_metric``.
+        weights_hash: String or None. Key of the cached detections. If None
+            it is computed from the weights of ``detector.model`` and the
+            ``score_thresh`` and ``nms_thresh`` of the detector.
+
+    # Returns
+        Dictionary with average precision per class ``ap``, mean average
+            precision ``map`` and the seconds spent in each stage
+            ``timings`` with keys ``decode``, ``inference`` and ``matching``.
+    """
+    cache = None
+    if cache_directory is not None:
+        if weights_hash is None:
+            weights_hash = _compute_detector_hash(detector)
+        cache = DetectionsCache(cache_directory, weights_hash)
+    image_paths = [sample['image'] for sample in dataset]
+    detections, timings = detect_images(
+        detector, image_paths, class_to_arg, batch_size, num_workers, cache)
+
+    start = time.perf_counter()
+    evaluator = IncrementalMAPEvaluator(class_to_arg, iou_thresh)
+    for sample, sample_detections in zip(dataset, detections):
+        evaluator.add(sample_detections, sample)
+    result = evaluator.compute(use_07_metric)
+    timings['matching'] = time.perf_counter() - start
+    result['timings'] = timings
+    return result
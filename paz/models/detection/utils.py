@@ -9,8 +9,12 @@ import tensorflow.keras.backend as K
 
 from ..layers import Conv2DNormalization
 
+import os
+import hashlib
 import numpy as np
-from itertools import product
+
+PRIOR_BOX_CONFIGURATIONS = {}
+PRIOR_BOXES_CACHE = {}
 
 
 def create_multibox_head(tensors, num_classes, num_priors, l2_loss=0.0005,
@@ -66,41 +70,102 @@ def create_multibox_head(tensors, num_classes, num_priors, l2_loss=0.0005,
     return outputs
 
 
-def create_prior_boxes(configuration_name='VOC'):
-    configuration = get_prior_box_configuration(configuration_name)
+def compute_prior_boxes(configuration):
+    """Computes prior boxes in center form of a prior box configuration.
+
+    # Arguments
+        configuration: Dictionary with keys ``feature_map_sizes``,
+            ``image_size``, ``steps``, ``min_sizes``, ``max_sizes`` and
+            ``aspect_ratios``.
+
+    # Returns
+        Numpy array of shape ``(num_prior_boxes, 4)``.
+    """
     image_size = configuration['image_size']
-    feature_map_sizes = configuration['feature_map_sizes']
-    min_sizes = configuration['min_sizes']
-    max_sizes = configuration['max_sizes']
-    steps = configuration['steps']
-    model_aspect_ratios = configuration['aspect_ratios']
-    mean = []
-    for feature_map_arg, feature_map_size in enumerate(feature_map_sizes):
-        step = steps[feature_map_arg]
-        min_size = min_sizes[feature_map_arg]
-        max_size = max_sizes[feature_map_arg]
-        aspect_ratios = model_aspect_ratios[feature_map_arg]
-        for y, x in product(range(feature_map_size), repeat=2):
-            f_k = image_size / step
-            center_x = (x + 0.5) / f_k
-            center_y = (y + 0.5) / f_k
-            s_k = min_size / image_size
-            mean = mean + [center_x, center_y, s_k, s_k]
-            s_k_prime = np.sqrt(s_k * (max_size / image_size))
-            mean = mean + [center_x, center_y, s_k_prime, s_k_prime]
-            for aspect_ratio in aspect_ratios:
-                mean = mean + [center_x, center_y, s_k * np.sqrt(aspect_ratio),
-                               s_k / np.sqrt(aspect_ratio)]
-                mean = mean + [center_x, center_y, s_k / np.sqrt(aspect_ratio),
-                               s_k * np.sqrt(aspect_ratio)]
-
-    output = np.asarray(mean).reshape((-1, 4))
-    # output = np.clip(output, 0, 1)
-    return output
+    prior_boxes = []
+    for feature_map_arg, feature_map_size in enumerate(
+            configuration['feature_map_sizes']):
+        step = configuration['steps'][feature_map_arg]
+        min_size = configuration['min_sizes'][feature_map_arg]
+        max_size = configuration['max_sizes'][feature_map_arg]
+        aspect_ratios = configuration['aspect_ratios'][feature_map_arg]
+        s_k = min_size / image_size
+        s_k_prime = np.sqrt(s_k * (max_size / image_size))
+        sizes = [[s_k, s_k], [s_k_prime, s_k_prime]]
+        for aspect_ratio in aspect_ratios:
+            sizes.append([s_k * np.sqrt(aspect_ratio),
+                          s_k / np.sqrt(aspect_ratio)])
+            sizes.append([s_k / np.sqrt(aspect_ratio),
+                          s_k * np.sqrt(aspect_ratio)])
+        f_k = image_size / step
+        centers = (np.arange(feature_map_size) + 0.5) / f_k
+        center_y, center_x = np.meshgrid(centers, centers, indexing='ij')
+        boxes = np.empty((feature_map_size ** 2, len(sizes), 4))
+        boxes[:, :, 0] = center_x.reshape(-1, 1)
+        boxes[:, :, 1] = center_y.reshape(-1, 1)
+        boxes[:, :, 2:4] = sizes
+        prior_boxes.append(boxes.reshape(-1, 4))
+    return np.concatenate(prior_boxes, axis=0)
+
+
+def _hash_configuration(configuration):
+    keys = ['feature_map_sizes', 'image_size', 'steps',
+            'min_sizes', 'max_sizes', 'aspect_ratios']
+    values = [repr(configuration[key]) for key in keys]
+    return hashlib.sha1(';'.join(values).encode()).hexdigest()
+
+
+def create_prior_boxes(configuration_name='VOC', cache_directory=None):
+    """Creates the prior boxes of a configuration. Prior boxes are computed
+    once per configuration and memoized in memory.
+
+    # Arguments
+        configuration_name: String with the name of a configuration given
+            by ``get_prior_box_configuration`` or a configuration
+            dictionary.
+        cache_directory: String or None. If given, prior boxes are also
+            stored and loaded as ``.npy`` files from this directory.
+
+    # Returns
+        Numpy array of shape ``(num_prior_boxes, 4)`` in center form.
+    """
+    if isinstance(configuration_name, dict):
+        configuration = configuration_name
+    else:
+        configuration = get_prior_box_configuration(configuration_name)
+    key = _hash_configuration(configuration)
+    if key not in PRIOR_BOXES_CACHE:
+        filepath = None
+        if cache_directory is not None:
+            filepath = os.path.join(cache_directory, 'priors_%s.npy' % key)
+        if filepath is not None and os.path.isfile(filepath):
+            prior_boxes = np.load(filepath)
+        else:
+            prior_boxes = compute_prior_boxes(configuration)
+            if filepath is not None:
+                if not os.path.exists(cache_directory):
+                    os.makedirs(cache_directory)
+                np.save(filepath, prior_boxes)
+        PRIOR_BOXES_CACHE[key] = prior_boxes
+    return PRIOR_BOXES_CACHE[key].copy()
+
+
+def register_prior_box_configuration(configuration_name, configuration):
+    """Registers a custom prior box configuration that can then be given
+    by name to ``create_prior_boxes``.
+
+    # Arguments
+        configuration_name: String.
+        configuration: Dictionary with the same keys as the ones returned
+            by ``get_prior_box_configuration``.
+    """
+    PRIOR_BOX_CONFIGURATIONS[configuration_name] = configuration
 
 
 def get_prior_box_configuration(configuration_name='VOC'):
-    if configuration_name in {'VOC', 'FAT'}:
+    if configuration_name in PRIOR_BOX_CONFIGURATIONS:
+        configuration = PRIOR_BOX_CONFIGURATIONS[configuration_name]
+    elif configuration_name in {'VOC', 'FAT'}:
         configuration = {
             'feature_map_sizes': [38, 19, 10, 5, 3, 1],
             'image_size': 300,
@@ -37,8 +37,27 @@ class MultiBoxLoss(object):
         positive_mask = 1.0 - negative_mask
         return positive_mask, negative_mask
 
+    def _hard_negative_loss(self, class_loss, positive_mask, negative_mask):
+        """Sums the largest negative losses of every sample. All samples are
+            sorted at once and the hard negatives are selected by rank.
+        """
+        num_positives_per_sample = K.cast(K.sum(positive_mask, -1), 'int32')
+        num_hard_negatives = self.neg_pos_ratio * num_positives_per_sample
+        num_negatives_per_sample = K.minimum(
+            num_hard_negatives, self.max_num_negatives)
+        negative_class_losses = tf.sort(
+            class_loss * negative_mask, axis=-1, direction='DESCENDING')
+        ranks = tf.range(tf.shape(negative_class_losses)[1])
+        hard_negative_mask = K.less(
+            ranks[tf.newaxis, :], num_negatives_per_sample[:, tf.newaxis])
+        hard_negative_losses = tf.where(
+            hard_negative_mask, negative_class_losses, 0.0)
+        return K.sum(hard_negative_losses, axis=-1)
+
     def compute_loss(self, y_true, y_pred):
         """Computes localization and classification losses in a batch.
+            The cross-entropy and the masks are computed once and shared by
+            all loss components.
 
         # Arguments
             y_true: Tensor of shape '[batch_size, num_boxes, 4 + num_classes]'
@@ -49,10 +68,17 @@ class MultiBoxLoss(object):
         # Returns
             Tensor with loss per sample in batch.
         """
-        localization_loss = self.localization(y_true, y_pred)
-        positive_loss = self.positive_classification(y_true, y_pred)
-        negative_loss = self.negative_classification(y_true, y_pred)
-        return localization_loss + positive_loss + negative_loss
+        batch_size = tf.cast(tf.shape(y_pred)[0], tf.float32)
+        local_loss = self._smooth_l1(y_true[:, :, :4], y_pred[:, :, :4])
+        class_loss = self._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
+        positive_mask, negative_mask = self._calculate_masks(y_true)
+        positive_losses = self.alpha * local_loss + class_loss
+        positive_loss = K.sum(positive_losses * positive_mask, axis=-1)
+        negative_loss = self._hard_negative_loss(
+            class_loss, positive_mask, negative_mask)
+        num_positives = K.sum(K.cast(positive_mask, 'float32'))
+        num_positives = tf.maximum(1.0, num_positives)
+        return ((positive_loss + negative_loss) * batch_size) / num_positives
 
     def localization(self, y_true, y_pred):
         """Computes localization loss in a batch.
@@ -113,15 +139,8 @@ class MultiBoxLoss(object):
         batch_size = tf.cast(tf.shape(y_pred)[0], tf.float32)
         class_loss = self._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
         positive_mask, negative_mask = self._calculate_masks(y_true)
-        num_positives_per_sample = K.cast(K.sum(positive_mask, -1), 'int32')
-        num_hard_negatives = self.neg_pos_ratio * num_positives_per_sample
-        num_negatives_per_sample = K.minimum(
-            num_hard_negatives, self.max_num_negatives)
-        negative_class_losses = class_loss * negative_mask
-        elements = (negative_class_losses, num_negatives_per_sample)
-        negative_class_loss = tf.map_fn(
-            lambda x: K.sum(tf.nn.top_k(x[0], x[1])[0]),
-            elements, dtype=tf.float32)
+        negative_class_loss = self._hard_negative_loss(
+            class_loss, positive_mask, negative_mask)
         num_positives = K.sum(K.cast(positive_mask, 'float32'))
         num_positives = tf.maximum(1.0, num_positives)
         return (negative_class_loss * batch_size) / num_positives
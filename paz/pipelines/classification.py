@@ -45,3 +45,17 @@ class MiniXceptionFER(SequentialProcessor):
         self.add(pr.CopyDomain([0], [1]))
         self.add(pr.ControlMap(pr.ToClassName(self.class_names), [0], [0]))
         self.add(pr.WrapOutput(['class_name', 'scores']))
+
+    def call_batch(self, images):
+        """Classifies a list of RGB faces of any size with one prediction.
+
+        # Arguments
+            images: List of RGB images (numpy arrays).
+
+        # Returns
+            List with one dictionary with keys ``class_name`` and ``scores``
+                per given image.
+        """
+        predict = self.processors[0]
+        postprocess = SequentialProcessor(self.processors[1:])
+        return [postprocess(scores) for scores in predict.call_batch(images)]
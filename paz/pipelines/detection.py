@@ -41,9 +41,8 @@ class PreprocessBoxes(SequentialProcessor):
     """
     def __init__(self, num_classes, prior_boxes, IOU, variances):
         super(PreprocessBoxes, self).__init__()
-        self.add(pr.MatchBoxes(prior_boxes, IOU),)
-        self.add(pr.EncodeBoxes(prior_boxes, variances))
-        self.add(pr.BoxClassToOneHotVector(num_classes))
+        self.add(pr.MatchAndEncodeBoxes(
+            num_classes, prior_boxes, IOU, variances))
 
 
 class AugmentDetection(SequentialProcessor):
@@ -61,10 +60,12 @@ class AugmentDetection(SequentialProcessor):
         IOU: Float. Intersection over union used to match boxes.
         variances: List of two floats indicating variances to be encoded
             for encoding bounding boxes.
+        single_warp: Boolean. If ``True`` the expansion, crop, flip and
+            resize of the image are composed into a single affine warp.
     """
     def __init__(self, prior_boxes, split=pr.TRAIN, num_classes=21, size=300,
                  mean=pr.BGR_IMAGENET_MEAN, IOU=.5,
-                 variances=[0.1, 0.1, 0.2, 0.2]):
+                 variances=[0.1, 0.1, 0.2, 0.2], single_warp=False):
         super(AugmentDetection, self).__init__()
         # image processors
         self.augment_image = AugmentImage()
@@ -72,7 +73,11 @@ class AugmentDetection(SequentialProcessor):
         self.preprocess_image = PreprocessImage((size, size), mean)
 
         # box processors
-        self.augment_boxes = AugmentBoxes()
+        if single_warp:
+            self.augment_boxes = pr.RandomExpandCropFlipResize(
+                size, pr.BGR_IMAGENET_MEAN)
+        else:
+            self.augment_boxes = AugmentBoxes()
         args = (num_classes, prior_boxes, IOU, variances)
         self.preprocess_boxes = PreprocessBoxes(*args)
 
@@ -99,10 +104,17 @@ class DetectSingleShot(Processor):
         nms_thresh: Float between [0, 1].
         mean: List of three elements indicating the per channel mean.
         draw: Boolean. If ``True`` prediction are drawn in the returned image.
+        vectorized: Boolean. If ``True`` detections are returned as a single
+            columnar ``Boxes2D`` message instead of a list of ``Box2D``.
+
+    # Batched inference
+        ``call_batch`` takes a list of images, preprocesses them into a
+        single tensor and runs one forward pass. Box decoding and
+        non-maximum suppression are then applied to the whole batch at once.
     """
     def __init__(self, model, class_names, score_thresh, nms_thresh,
                  mean=pr.BGR_IMAGENET_MEAN, variances=[0.1, 0.1, 0.2, 0.2],
-                 draw=True):
+                 draw=True, vectorized=False):
         self.model = model
         self.class_names = class_names
         self.score_thresh = score_thresh
@@ -111,19 +123,28 @@ class DetectSingleShot(Processor):
         self.draw = draw
 
         super(DetectSingleShot, self).__init__()
-        preprocessing = SequentialProcessor(
+        self.preprocess_image = SequentialProcessor(
             [pr.ResizeImage(self.model.input_shape[1:3]),
              pr.ConvertColorSpace(pr.RGB2BGR),
              pr.SubtractMeanImage(mean),
-             pr.CastImage(float),
-             pr.ExpandDims(axis=0)])
+             pr.CastImage(float)])
+        preprocessing = SequentialProcessor(
+            [self.preprocess_image, pr.ExpandDims(axis=0)])
         postprocessing = SequentialProcessor(
             [pr.Squeeze(axis=None),
              pr.DecodeBoxes(self.model.prior_boxes, self.variances),
              pr.NonMaximumSuppressionPerClass(self.nms_thresh),
-             pr.FilterBoxes(self.class_names, self.score_thresh)])
+             pr.FilterBoxes(self.class_names, self.score_thresh, vectorized)])
         self.predict = pr.Predict(self.model, preprocessing, postprocessing)
 
+        self.postprocess_batch = SequentialProcessor(
+            [pr.DecodeBoxes(self.model.prior_boxes, self.variances),
+             pr.NonMaximumSuppressionPerClass(
+                 self.nms_thresh, vectorized=True)])
+        self.filter_boxes = pr.FilterBoxes(
+            self.class_names, self.score_thresh, vectorized)
+        self._batch = np.zeros((0, *self.model.input_shape[1:]), np.float32)
+
         self.denormalize = pr.DenormalizeBoxes2D()
         self.draw_boxes2D = pr.DrawBoxes2D(self.class_names)
         self.wrap = pr.WrapOutput(['image', 'boxes2D'])
@@ -135,6 +156,41 @@ class DetectSingleShot(Processor):
             image = self.draw_boxes2D(image, boxes2D)
         return self.wrap(image, boxes2D)
 
+    def _fill_batch(self, images):
+        """Preprocesses all images into a buffer that is only reallocated
+        when a larger batch than any previous one is given.
+        """
+        if len(images) > len(self._batch):
+            shape = (len(images), *self.model.input_shape[1:])
+            self._batch = np.zeros(shape, np.float32)
+        batch = self._batch[:len(images)]
+        for sample_arg, image in enumerate(images):
+            batch[sample_arg] = self.preprocess_image(image)
+        return batch
+
+    def call_batch(self, images):
+        """Detects objects in a list of images with a single forward pass.
+
+        # Arguments
+            images: List of RGB images (numpy arrays).
+
+        # Returns
+            List with one dictionary with keys ``image`` and ``boxes2D``
+                per given image.
+        """
+        if len(images) == 0:
+            return []
+        batch = self._fill_batch(images)
+        boxes = self.postprocess_batch(self.predict.infer(batch))
+        outputs = []
+        for image, sample_boxes in zip(images, boxes):
+            boxes2D = self.filter_boxes(sample_boxes)
+            boxes2D = self.denormalize(image, boxes2D)
+            if self.draw:
+                image = self.draw_boxes2D(image, boxes2D)
+            outputs.append(self.wrap(image, boxes2D))
+        return outputs
+
 
 class SSD512COCO(DetectSingleShot):
     """Single-shot inference pipeline with SSD512 trained on COCO.
@@ -371,10 +427,10 @@ class DetectMiniXceptionFER(Processor):
         self.square.add(pr.SquareBoxes2D())
         self.square.add(pr.OffsetBoxes2D(offsets))
         self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
 
         # classification
         self.classify = MiniXceptionFER()
+        self.classify_crops = pr.PredictBoxes2D(self.classify)
 
         # drawing and wrapping
         self.class_names = self.classify.class_names
@@ -385,11 +441,10 @@ class DetectMiniXceptionFER(Processor):
         boxes2D = self.detect(image.copy())['boxes2D']
         boxes2D = self.square(boxes2D)
         boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
-        for cropped_image, box2D in zip(cropped_images, boxes2D):
-            predictions = self.classify(cropped_image)
-            box2D.class_name = predictions['class_name']
-            box2D.score = np.amax(predictions['scores'])
+        predictions = self.classify_crops(image, boxes2D)
+        for prediction, box2D in zip(predictions, boxes2D):
+            box2D.class_name = prediction['class_name']
+            box2D.score = np.amax(prediction['scores'])
         image = self.draw(image, boxes2D)
         return self.wrap(image, boxes2D)
 
@@ -416,7 +471,7 @@ class DetectKeypoints2D(Processor):
         self.square.add(pr.SquareBoxes2D())
         self.square.add(pr.OffsetBoxes2D(offsets))
         self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
+        self.estimate_crops = pr.PredictBoxes2D(estimate_keypoints)
         self.change_coordinates = pr.ChangeKeypointsCoordinateSystem()
         self.draw = pr.DrawKeypoints2D(self.num_keypoints, radius, False)
         self.draw_boxes = pr.DrawBoxes2D(detect.class_names, detect.colors)
@@ -426,10 +481,10 @@ class DetectKeypoints2D(Processor):
         boxes2D = self.detect(image)['boxes2D']
         boxes2D = self.square(boxes2D)
         boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
+        predictions = self.estimate_crops(image, boxes2D)
         keypoints2D = []
-        for cropped_image, box2D in zip(cropped_images, boxes2D):
-            keypoints = self.estimate_keypoints(cropped_image)['keypoints']
+        for prediction, box2D in zip(predictions, boxes2D):
+            keypoints = prediction['keypoints']
             keypoints = self.change_coordinates(keypoints, box2D)
             keypoints2D.append(keypoints)
             image = self.draw(image, keypoints)
@@ -10,11 +10,14 @@ class GetHeatmapsAndTags(pr.Processor):
             Flipped list of keypoint order.
         data_with_center: Boolean. True is the model is trained using the
             center.
-        image: Numpy array. Input image of shape (H, W)
+        image: Numpy array. Input image of shape (1, H, W, 3). If
+            ``with_flip`` is ``True`` the image and its horizontal flip are
+            predicted in a single batch of two.
 
     # Returns
-        heatmaps: Numpy array of shape (1, num_keypoints, H, W)
-        Tags: Numpy array of shape (1, num_keypoints, H, W)
+        heatmaps: List of numpy arrays of shape (1, num_keypoints, H, W).
+            The second array is the flip-test prediction if ``with_flip``.
+        Tags: List of numpy arrays of shape (1, num_keypoints, H, W)
     """
     def __init__(self, model, flipped_keypoint_order, with_flip,
                  data_with_center, scale_output=True, axes=[0, 3, 1, 2]):
@@ -31,15 +34,16 @@ class GetHeatmapsAndTags(pr.Processor):
             self.postprocess.add(pr.ScaleOutput(2, full_scaling=True))
 
     def call(self, image):
+        if self.with_flip:
+            image = np.concatenate([image, np.flip(image, [2])], axis=0)
         outputs = self.predict(image)
-        heatmaps = self.get_heatmaps(outputs, with_flip=False)
-        tags = self.get_tags(outputs, with_flip=False)
+        flipped_outputs = [output[1:] for output in outputs]
+        outputs = [output[:1] for output in outputs]
+        heatmaps = [self.get_heatmaps(outputs, with_flip=False)]
+        tags = [self.get_tags(outputs, with_flip=False)]
         if self.with_flip:
-            outputs = self.predict(np.flip(image, [2]))
-            heatmaps_flip = self.get_heatmaps(outputs, self.with_flip)
-            tags_flip = self.get_tags(outputs, self.with_flip)
-            heatmaps = [heatmaps, heatmaps_flip]
-            tags = [tags, tags_flip]
+            heatmaps.append(self.get_heatmaps(flipped_outputs, self.with_flip))
+            tags.append(self.get_tags(flipped_outputs, self.with_flip))
         heatmaps = self.postprocess(heatmaps)
         tags = self.postprocess(tags)
         return heatmaps, tags
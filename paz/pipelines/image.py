@@ -6,13 +6,21 @@ from ..backend.image import get_affine_transform
 class AugmentImage(SequentialProcessor):
     """Augments an RGB image by randomly changing contrast, brightness
         saturation and hue.
+
+    # Arguments
+        batch: Boolean. If ``True`` it augments a uint8 batch of images of
+            shape ``(N, H, W, 3)`` drawing different values for every image,
+            and saturation and hue share a single HSV conversion.
     """
-    def __init__(self):
+    def __init__(self, batch=False):
         super(AugmentImage, self).__init__()
-        self.add(pr.RandomContrast())
-        self.add(pr.RandomBrightness())
-        self.add(pr.RandomSaturation())
-        self.add(pr.RandomHue())
+        self.add(pr.RandomContrast(batch=batch))
+        self.add(pr.RandomBrightness(batch=batch))
+        if batch:
+            self.add(pr.RandomSaturationHue())
+        else:
+            self.add(pr.RandomSaturation())
+            self.add(pr.RandomHue())
 
 
 class PreprocessImage(SequentialProcessor):
@@ -88,13 +88,30 @@ class EstimateKeypoints2D(Processor):
         self.draw = pr.DrawKeypoints2D(self.num_keypoints, self.radius, False)
         self.wrap = pr.WrapOutput(['image', 'keypoints'])
 
-    def call(self, image):
-        keypoints = self.predict(image)
+    def _postprocess(self, image, keypoints):
         keypoints = self.denormalize(keypoints, image)
         if self.draw:
             image = self.draw(image, keypoints)
         return self.wrap(image, keypoints)
 
+    def call(self, image):
+        return self._postprocess(image, self.predict(image))
+
+    def call_batch(self, images):
+        """Estimates the keypoints of a list of images of any size with one
+        prediction.
+
+        # Arguments
+            images: List of images (numpy arrays).
+
+        # Returns
+            List with one dictionary with keys ``image`` and ``keypoints``
+                per given image.
+        """
+        keypoints = self.predict.call_batch(images)
+        return [self._postprocess(image, image_keypoints)
+                for image, image_keypoints in zip(images, keypoints)]
+
 
 class FaceKeypointNet2D32(EstimateKeypoints2D):
     """KeypointNet2D model trained with Kaggle Facial Detection challenge.
@@ -153,7 +170,8 @@ class GetKeypoints(pr.Processor):
         super(GetKeypoints, self).__init__()
         self.group_keypoints = pr.SequentialProcessor(
             [pr.TopKDetections(max_num_instance), pr.GroupKeypointsByTag(
-                keypoint_order, tag_thresh, detection_thresh)])
+                keypoint_order, tag_thresh, detection_thresh,
+                max_num_instance)])
         self.adjust_keypoints = pr.AdjustKeypointsLocations()
         self.get_scores = pr.GetScores()
         self.refine_keypoints = pr.RefineKeypointsLocations()
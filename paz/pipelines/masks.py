@@ -12,14 +12,28 @@ class PredictRGBMask(SequentialProcessor):
     """
     def __init__(self, model, epsilon=0.15):
         super(PredictRGBMask, self).__init__()
-        self.add(pr.ResizeImage(model.input_shape[1:3]))
-        self.add(pr.NormalizeImage())
-        self.add(pr.ExpandDims(0))
-        self.add(pr.Predict(model))
-        self.add(pr.Squeeze(0))
-        self.add(pr.ReplaceLowerThanThreshold(epsilon))
-        self.add(pr.DenormalizeImage())
-        self.add(pr.CastImage('uint8'))
+        preprocess = SequentialProcessor([
+            pr.ResizeImage(model.input_shape[1:3]),
+            pr.NormalizeImage(),
+            pr.ExpandDims(0)])
+        postprocess = SequentialProcessor([
+            pr.Squeeze(0),
+            pr.ReplaceLowerThanThreshold(epsilon),
+            pr.DenormalizeImage(),
+            pr.CastImage('uint8')])
+        self.add(pr.Predict(model, preprocess, postprocess))
+
+    def call_batch(self, images):
+        """Predicts the RGB masks of a list of images of any size with one
+        prediction.
+
+        # Arguments
+            images: List of RGB images (numpy arrays).
+
+        # Returns
+            List of RGB masks.
+        """
+        return self.processors[0].call_batch(images)
 
 
 class RGBMaskToObjectPoints3D(SequentialProcessor):
@@ -68,7 +82,24 @@ class Pix2Points(Processor):
         self.wrap = pr.WrapOutput(['points2D', 'points3D', 'RGB_mask'])
 
     def call(self, image):
-        RGB_mask = self.predict_RGBMask(image)
+        return self._mask_to_points(image, self.predict_RGBMask(image))
+
+    def call_batch(self, images):
+        """Predicts the points of a list of images of any size with one
+        prediction.
+
+        # Arguments
+            images: List of RGB images (numpy arrays).
+
+        # Returns
+            List with one dictionary with keys ``points2D``, ``points3D``
+                and ``RGB_mask`` per given image.
+        """
+        RGB_masks = self.predict_RGBMask.call_batch(images)
+        return [self._mask_to_points(image, RGB_mask)
+                for image, RGB_mask in zip(images, RGB_masks)]
+
+    def _mask_to_points(self, image, RGB_mask):
         if self.resize:
             H, W, num_channels = image.shape
             RGB_mask = resize_image(RGB_mask, (W, H), self.method)
@@ -52,7 +52,7 @@ class EstimatePoseKeypoints(Processor):
         self.square.add(pr.SquareBoxes2D())
         self.square.add(pr.OffsetBoxes2D(offsets))
         self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
+        self.estimate_crops = pr.PredictBoxes2D(estimate_keypoints)
         self.change_coordinates = pr.ChangeKeypointsCoordinateSystem()
         self.solve_PNP = pr.SolvePNP(model_points, camera)
         self.draw_keypoints = pr.DrawKeypoints2D(self.num_keypoints, radius)
@@ -64,10 +64,10 @@ class EstimatePoseKeypoints(Processor):
         boxes2D = self.detect(image)['boxes2D']
         boxes2D = self.square(boxes2D)
         boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
+        predictions = self.estimate_crops(image, boxes2D)
         poses6D, keypoints2D = [], []
-        for cropped_image, box2D in zip(cropped_images, boxes2D):
-            keypoints = self.estimate_keypoints(cropped_image)['keypoints']
+        for prediction, box2D in zip(predictions, boxes2D):
+            keypoints = prediction['keypoints']
             keypoints = self.change_coordinates(keypoints, box2D)
             pose6D = self.solve_PNP(keypoints)
             image = self.draw_keypoints(image, keypoints)
@@ -181,7 +181,27 @@ class RGBMaskToPose6D(pr.Processor):
                                          self.camera.intrinsics)
 
     def call(self, image, box2D=None):
-        results = self.predict_points(image)
+        return self._estimate_pose(image, self.predict_points(image), box2D)
+
+    def call_batch(self, images, boxes2D=None):
+        """Predicts the pose6D of a list of images of any size with one
+        prediction of the segmentation model.
+
+        # Arguments
+            images: List of RGB images (numpy arrays).
+            boxes2D: List of ``Box2D`` messages or ``None``. If given, every
+                image is considered a crop of the corresponding box.
+
+        # Returns
+            List with one dictionary of inferences per given image.
+        """
+        if boxes2D is None:
+            boxes2D = [None] * len(images)
+        predictions = self.predict_points.call_batch(images)
+        return [self._estimate_pose(image, results, box2D) for
+                image, results, box2D in zip(images, predictions, boxes2D)]
+
+    def _estimate_pose(self, image, results, box2D):
         points2D, points3D = results['points2D'], results['points3D']
         H, W = image.shape[:2]
         points2D = denormalize_keypoints2D(points2D, H, W)
@@ -239,7 +259,7 @@ class PIX2POSE(Processor):
         self.postprocess_boxes.add(pr.OffsetBoxes2D(offsets))
 
         self.clip = pr.ClipBoxes2D()
-        self.crop = pr.CropBoxes2D()
+        self.estimate_crops = pr.PredictBoxes2D(self.estimate_pose, True)
         self.wrap = pr.WrapOutput(['image', 'boxes2D', 'poses6D'])
         self.unwrap = pr.UnwrapDictionary(['pose6D', 'points2D', 'points3D'])
         self.draw_boxes2D = pr.DrawBoxes2D(detect.class_names)
@@ -252,10 +272,8 @@ class PIX2POSE(Processor):
     def call(self, image):
         boxes2D = self.postprocess_boxes(self.detect(image))
         boxes2D = self.clip(image, boxes2D)
-        cropped_images = self.crop(image, boxes2D)
         poses6D, points2D, points3D = [], [], []
-        for crop, box2D in zip(cropped_images, boxes2D):
-            results = self.estimate_pose(crop, box2D)
+        for results in self.estimate_crops(image, boxes2D):
             pose6D, set_points2D, set_points3D = self.unwrap(results)
             points2D.append(set_points2D), points3D.append(set_points3D)
             poses6D.append(pose6D)
@@ -6,9 +6,11 @@ from .detection import RoundBoxes2D
 from .detection import ClipBoxes2D
 from .detection import FilterClassBoxes2D
 from .detection import CropBoxes2D
+from .detection import PredictBoxes2D
 from .detection import ToBoxes2D
 from .detection import MatchBoxes
 from .detection import EncodeBoxes
+from .detection import MatchAndEncodeBoxes
 from .detection import DecodeBoxes
 from .detection import NonMaximumSuppressionPerClass
 from .detection import FilterBoxes
@@ -32,6 +34,7 @@ from .image import RandomSaturation
 from .image import RandomBrightness
 from .image import RandomContrast
 from .image import RandomHue
+from .image import RandomSaturationHue
 from .image import ResizeImage
 from .image import ResizeImages
 from .image import RandomImageBlur
@@ -65,6 +68,7 @@ from .geometric import ToImageBoxCoordinates
 from .geometric import ToNormalizedBoxCoordinates
 from .geometric import RandomSampleCrop
 from .geometric import Expand
+from .geometric import RandomExpandCropFlipResize
 from .geometric import ApplyTranslation
 from .geometric import RandomTranslation
 from .geometric import RandomKeypointTranslation
@@ -1,25 +1,39 @@
 from __future__ import division
 
+import threading
 import numpy as np
 
-from ..abstract import Processor, Box2D
+from ..abstract import Processor, Box2D, Boxes2D
 from ..backend.boxes import match
+from ..backend.boxes import match_with_index
+from ..backend.boxes import index_prior_boxes
+from ..backend.boxes import match_and_encode
 from ..backend.boxes import encode
-from ..backend.boxes import decode
+from ..backend.boxes import decode_with_constants
+from ..backend.boxes import compute_decode_constants
 from ..backend.boxes import offset
 from ..backend.boxes import clip
 from ..backend.boxes import nms_per_class
+from ..backend.boxes import nms_per_class_vectorized
 from ..backend.boxes import denormalize_box
 from ..backend.boxes import make_box_square
+from ..backend.boxes import make_boxes_square
+from ..backend.boxes import offset_boxes
+from ..backend.boxes import clip_boxes
+from ..backend.boxes import denormalize_boxes
 
 
 class SquareBoxes2D(Processor):
     """Transforms bounding rectangular boxes into square bounding boxes.
+        Accepts a list of ``Box2D`` or a ``Boxes2D`` message.
     """
     def __init__(self):
         super(SquareBoxes2D, self).__init__()
 
     def call(self, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            boxes2D.coordinates = make_boxes_square(boxes2D.coordinates)
+            return boxes2D
         for box2D in boxes2D:
             box2D.coordinates = make_box_square(box2D.coordinates)
         return boxes2D
@@ -36,6 +50,10 @@ class DenormalizeBoxes2D(Processor):
 
     def call(self, image, boxes2D):
         shape = image.shape[:2]
+        if isinstance(boxes2D, Boxes2D):
+            boxes2D.coordinates = denormalize_boxes(
+                boxes2D.coordinates, shape)
+            return boxes2D
         for box2D in boxes2D:
             box2D.coordinates = denormalize_box(box2D.coordinates, shape)
         return boxes2D
@@ -48,6 +66,9 @@ class RoundBoxes2D(Processor):
         super(RoundBoxes2D, self).__init__()
 
     def call(self, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            boxes2D.coordinates = boxes2D.coordinates.astype(int)
+            return boxes2D
         for box2D in boxes2D:
             box2D.coordinates = [int(x) for x in box2D.coordinates]
         return boxes2D
@@ -64,6 +85,9 @@ class FilterClassBoxes2D(Processor):
         super(FilterClassBoxes2D, self).__init__()
 
     def call(self, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            mask = np.isin(boxes2D.class_name, self.valid_class_names)
+            return boxes2D[mask]
         filtered_boxes2D = []
         for box2D in boxes2D:
             if box2D.class_name in self.valid_class_names:
@@ -88,12 +112,47 @@ class CropBoxes2D(Processor):
         return image_crops
 
 
+class PredictBoxes2D(Processor):
+    """Crops all boxes of an image and evaluates a second-stage function
+        on the crops. If the function has a ``call_batch`` method all crops
+        are evaluated with one call i.e. with a single model prediction.
+
+    # Arguments
+        function: Function applied to every crop. If ``with_boxes2D`` is
+            ``True`` it also receives the ``Box2D`` of the crop.
+        with_boxes2D: Boolean. If ``True`` the boxes are also given to
+            ``function`` i.e. ``function(crop, box2D)`` or
+            ``function.call_batch(crops, boxes2D)``.
+
+    # Returns
+        List with the output of ``function`` for every box.
+    """
+    def __init__(self, function, with_boxes2D=False):
+        super(PredictBoxes2D, self).__init__()
+        self.function = function
+        self.with_boxes2D = with_boxes2D
+        self.crop = CropBoxes2D()
+
+    def call(self, image, boxes2D):
+        crops = self.crop(image, boxes2D)
+        if len(crops) == 0:
+            return []
+        args = (crops, list(boxes2D)) if self.with_boxes2D else (crops,)
+        if hasattr(self.function, 'call_batch'):
+            return self.function.call_batch(*args)
+        return [self.function(*sample_args) for sample_args in zip(*args)]
+
+
 class ClipBoxes2D(Processor):
     """Clips boxes coordinates into the image dimensions"""
     def __init__(self):
         super(ClipBoxes2D, self).__init__()
 
     def call(self, image, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            boxes2D.coordinates = clip_boxes(
+                boxes2D.coordinates, image.shape[:2])
+            return boxes2D
         image_height, image_width = image.shape[:2]
         for box2D in boxes2D:
             box2D.coordinates = clip(box2D.coordinates, image.shape[:2])
@@ -111,6 +170,10 @@ class OffsetBoxes2D(Processor):
         self.offsets = offsets
 
     def call(self, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            boxes2D.coordinates = offset_boxes(
+                boxes2D.coordinates, self.offsets)
+            return boxes2D
         for box2D in boxes2D:
             box2D.coordinates = offset(box2D.coordinates, self.offsets)
         return boxes2D
@@ -150,14 +213,22 @@ class MatchBoxes(Processor):
         iou: Float in [0, 1]. Intersection over union in which prior boxes
             will be considered positive. A positive box is box with a class
             different than `background`.
-        variance: List of two floats.
+        indexed: Boolean. If True a spatial index of the prior boxes is
+            built once and only overlapping prior boxes are matched with
+            each box; otherwise the full intersection over union matrix is
+            computed. Both give identical results.
     """
-    def __init__(self, prior_boxes, iou=.5):
+    def __init__(self, prior_boxes, iou=.5, indexed=True):
         self.prior_boxes = prior_boxes
         self.iou = iou
+        self.indexed = indexed
+        if self.indexed:
+            self.prior_index = index_prior_boxes(self.prior_boxes)
         super(MatchBoxes, self).__init__()
 
     def call(self, boxes):
+        if self.indexed:
+            return match_with_index(boxes, self.prior_index, self.iou)
         boxes = match(boxes, self.prior_boxes, self.iou)
         return boxes
 
@@ -179,6 +250,74 @@ class EncodeBoxes(Processor):
         return encoded_boxes
 
 
+class MatchAndEncodeBoxes(Processor):
+    """Matches prior boxes with ground truth boxes, encodes them and
+    transforms their classes to one-hot vectors in a single step.
+    Equivalent to ``MatchBoxes``, ``EncodeBoxes`` and
+    ``BoxClassToOneHotVector``, but writing all targets directly into one
+    float32 array.
+
+    # Arguments
+        num_classes: Int. Total number of classes.
+        prior_boxes: Numpy array of shape (num_boxes, 4).
+        iou: Float in [0, 1]. Intersection over union in which prior boxes
+            will be considered positive.
+        variances: List of four float values.
+        reuse_buffer: Boolean. If True targets are written into a buffer of
+            the calling thread that is overwritten by its next call.
+            Otherwise a new array is allocated at every call.
+
+    # Call arguments
+        boxes: Numpy array of shape `(num_boxes, 4 + 1)` or a list with one
+            of these arrays per sample.
+
+    # Returns
+        Numpy array of shape `(num_prior_boxes, 4 + num_classes)` or of
+            shape `(num_samples, num_prior_boxes, 4 + num_classes)` if a
+            list is given.
+    """
+    def __init__(self, num_classes, prior_boxes, iou=.5,
+                 variances=[0.1, 0.1, 0.2, 0.2], reuse_buffer=False):
+        self.num_classes = num_classes
+        self.prior_boxes = prior_boxes
+        self.iou = iou
+        self.variances = variances
+        self.reuse_buffer = reuse_buffer
+        self.prior_index = index_prior_boxes(self.prior_boxes)
+        self._buffers = threading.local()
+        super(MatchAndEncodeBoxes, self).__init__()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_buffers']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._buffers = threading.local()
+
+    def _get_output(self, num_samples):
+        shape = (num_samples, len(self.prior_boxes), 4 + self.num_classes)
+        if not self.reuse_buffer:
+            return np.empty(shape, dtype=np.float32)
+        buffer = getattr(self._buffers, 'output', None)
+        if buffer is None or len(buffer) < num_samples:
+            buffer = np.empty(shape, dtype=np.float32)
+            self._buffers.output = buffer
+        return buffer[:num_samples]
+
+    def call(self, boxes):
+        is_batch = isinstance(boxes, (list, tuple))
+        samples_boxes = boxes if is_batch else [boxes]
+        output = self._get_output(len(samples_boxes))
+        for sample_boxes, sample_output in zip(samples_boxes, output):
+            sample_boxes = np.reshape(sample_boxes, (-1, 5))
+            match_and_encode(
+                sample_boxes, self.prior_boxes, self.prior_index,
+                self.num_classes, self.iou, self.variances, sample_output)
+        return output if is_batch else output[0]
+
+
 class DecodeBoxes(Processor):
     """Decodes bounding boxes.
 
@@ -189,10 +328,12 @@ class DecodeBoxes(Processor):
     def __init__(self, prior_boxes, variances=[0.1, 0.1, 0.2, 0.2]):
         self.prior_boxes = prior_boxes
         self.variances = variances
+        self.constants = compute_decode_constants(
+            self.prior_boxes, self.variances)
         super(DecodeBoxes, self).__init__()
 
     def call(self, boxes):
-        decoded_boxes = decode(boxes, self.prior_boxes, self.variances)
+        decoded_boxes = decode_with_constants(boxes, *self.constants)
         return decoded_boxes
 
 
@@ -202,14 +343,23 @@ class NonMaximumSuppressionPerClass(Processor):
     # Arguments
         nms_thresh: Float between [0, 1].
         conf_thresh: Float between [0, 1].
+        vectorized: Boolean. If ``True`` all classes are suppressed in a
+            single pass with ``nms_per_class_vectorized``. This engine also
+            accepts batched boxes of shape
+            ``(batch_size, num_boxes, 4 + num_classes)``.
     """
-    def __init__(self, nms_thresh=.45, conf_thresh=0.01):
+    def __init__(self, nms_thresh=.45, conf_thresh=0.01, vectorized=False):
         self.nms_thresh = nms_thresh
         self.conf_thresh = conf_thresh
+        self.vectorized = vectorized
+        if self.vectorized:
+            self._apply_nms = nms_per_class_vectorized
+        else:
+            self._apply_nms = nms_per_class
         super(NonMaximumSuppressionPerClass, self).__init__()
 
     def call(self, boxes):
-        boxes = nms_per_class(boxes, self.nms_thresh, self.conf_thresh)
+        boxes = self._apply_nms(boxes, self.nms_thresh, self.conf_thresh)
         return boxes
 
 
@@ -219,15 +369,21 @@ class FilterBoxes(Processor):
     # Arguments
         class_names: List of class names.
         conf_thresh: Float between [0, 1].
+        vectorized: Boolean. If ``True`` all confident boxes are selected
+            with a single mask and returned as one ``Boxes2D`` message
+            instead of a list of ``Box2D`` messages.
     """
-    def __init__(self, class_names, conf_thresh=0.5):
+    def __init__(self, class_names, conf_thresh=0.5, vectorized=False):
         self.class_names = class_names
         self.conf_thresh = conf_thresh
+        self.vectorized = vectorized
         self.arg_to_class = dict(zip(
             list(range(len(self.class_names))), self.class_names))
         super(FilterBoxes, self).__init__()
 
     def call(self, boxes):
+        if self.vectorized:
+            return self._filter_vectorized(boxes)
         num_classes = boxes.shape[0]
         boxes2D = []
         for class_arg in range(1, num_classes):
@@ -244,6 +400,14 @@ class FilterBoxes(Processor):
                 boxes2D.append(Box2D(coordinates, score, class_name))
         return boxes2D
 
+    def _filter_vectorized(self, boxes):
+        confidence_mask = boxes[1:, :, 4] >= self.conf_thresh
+        class_args, box_args = np.nonzero(confidence_mask)
+        class_args = class_args + 1
+        detections = boxes[class_args, box_args]
+        return Boxes2D(detections[:, :4], detections[:, 4],
+                       class_args, self.class_names)
+
 
 class CropImage(Processor):
     """Crop images using a list of ``box2D``.
@@ -1,6 +1,6 @@
 import numpy as np
 
-from ..abstract import Processor
+from ..abstract import Processor, Boxes2D
 from ..backend.image import lincolor
 from ..backend.image import draw_rectangle
 from ..backend.image import put_text
@@ -53,6 +53,8 @@ class DrawBoxes2D(Processor):
         super(DrawBoxes2D, self).__init__()
 
     def call(self, image, boxes2D):
+        if isinstance(boxes2D, Boxes2D):
+            return self._draw_columnar(image, boxes2D)
         for box2D in boxes2D:
             x_min, y_min, x_max, y_max = box2D.coordinates
             class_name = box2D.class_name
@@ -67,6 +69,31 @@ class DrawBoxes2D(Processor):
             draw_rectangle(image, (x_min, y_min), (x_max, y_max), color, 2)
         return image
 
+    def _draw_columnar(self, image, boxes2D):
+        """Draws a ``Boxes2D`` message converting all coordinates, colors
+            and labels at once before drawing.
+        """
+        coordinates = boxes2D.coordinates.astype(int).tolist()
+        class_names = boxes2D.class_name
+        if class_names is None:
+            class_names = [None] * len(boxes2D)
+        colors = [self.class_to_color[name] for name in class_names]
+        if self.weighted:
+            colors = np.array(colors, dtype=float).reshape(len(colors), -1)
+            colors = colors * boxes2D.scores[:, np.newaxis]
+            colors = colors.astype(int).tolist()
+        scores = boxes2D.scores.tolist()
+        for box, score, class_name, color in zip(
+                coordinates, scores, class_names, colors):
+            x_min, y_min, x_max, y_max = box
+            if self.with_score:
+                text = '{:0.2f}, {}'.format(score, class_name)
+            else:
+                text = '{}'.format(class_name)
+            put_text(image, text, (x_min, y_min - 10), self.scale, color, 1)
+            draw_rectangle(image, (x_min, y_min), (x_max, y_max), color, 2)
+        return image
+
 
 class DrawKeypoints2D(Processor):
     """Draws keypoints into image.
@@ -5,7 +5,10 @@ from ..abstract import Processor
 from ..backend.boxes import flip_left_right
 from ..backend.boxes import to_image_coordinates
 from ..backend.boxes import to_normalized_coordinates
-from ..backend.boxes import compute_iou
+from ..backend.boxes import sample_expansion
+from ..backend.boxes import sample_crop
+from ..backend.boxes import crop_boxes
+from ..backend.boxes import compute_crop_flip_resize_matrix
 from ..backend.image import warp_affine
 from ..backend.image import translate_image
 from ..backend.image import sample_scaled_translation
@@ -53,6 +56,19 @@ class ToNormalizedBoxCoordinates(Processor):
         return image, boxes
 
 
+SAMPLE_CROP_OPTIONS = (
+    # using entire original input image
+    None,
+    # sample a patch s.t. MIN jaccard w/ obj in .1,.3,.4,.7,.9
+    (0.1, None),
+    (0.3, None),
+    (0.7, None),
+    (0.9, None),
+    # randomly sample a patch
+    (None, None),
+)
+
+
 class RandomSampleCrop(Processor):
     """Crops and image while adjusting the bounding boxes.
     Boxes should be in point form.
@@ -61,101 +77,19 @@ class RandomSampleCrop(Processor):
     """
     def __init__(self, probability=0.5):
         self.probability = probability
-        self.sample_options = (
-            # using entire original input image
-            None,
-            # sample a patch s.t. MIN jaccard w/ obj in .1,.3,.4,.7,.9
-            (0.1, None),
-            (0.3, None),
-            (0.7, None),
-            (0.9, None),
-            # randomly sample a patch
-            (None, None),
-        )
+        self.sample_options = SAMPLE_CROP_OPTIONS
         super(RandomSampleCrop, self).__init__()
 
     def call(self, image, boxes):
         if self.probability < np.random.rand():
             return image, boxes
-        labels = boxes[:, -1:]
-        boxes = boxes[:, :4]
-        height, width, _ = image.shape
-        while True:
-            # randomly choose a mode
-            mode = np.random.choice(self.sample_options)
-            if mode is None:
-                boxes = np.hstack([boxes, labels])
-                return image, boxes
-
-            min_iou, max_iou = mode
-            if min_iou is None:
-                min_iou = float('-inf')
-            if max_iou is None:
-                max_iou = float('inf')
-
-            # max trails (50)
-            for _ in range(50):
-                current_image = image
-
-                w = np.random.uniform(0.3 * width, width)
-                h = np.random.uniform(0.3 * height, height)
-
-                # aspect ratio constraint b/t .5 & 2
-                if h / w < 0.5 or h / w > 2:
-                    continue
-
-                left = np.random.uniform(width - w)
-                top = np.random.uniform(height - h)
-
-                # convert to integer rect x1,y1,x2,y2
-                rect = np.array(
-                    [int(left), int(top), int(left + w), int(top + h)])
-
-                # calculate IoU (jaccard overlap) b/t the cropped and gt boxes
-                overlap = compute_iou(rect, boxes)
-
-                # is min and max overlap constraint satisfied? if not try again
-                if overlap.max() < min_iou or overlap.min() > max_iou:
-                    continue
-
-                # cut the crop from the image
-                current_image = current_image[rect[1]:rect[3], rect[0]:rect[2],
-                                              :]
-
-                # keep overlap with gt box IF center in sampled patch
-                centers = (boxes[:, :2] + boxes[:, 2:]) / 2.0
-
-                # mask in all gt boxes that above and to the left of centers
-                m1 = (rect[0] < centers[:, 0]) * (rect[1] < centers[:, 1])
-
-                # mask in all gt boxes that under and to the right of centers
-                m2 = (rect[2] > centers[:, 0]) * (rect[3] > centers[:, 1])
-
-                # mask in that both m1 and m2 are true
-                mask = m1 * m2
-
-                # have any valid boxes? try again if not
-                if not mask.any():
-                    continue
-
-                # take only matching gt boxes
-                current_boxes = boxes[mask, :].copy()
-
-                # take only matching gt labels
-                current_labels = labels[mask]
-
-                # should we use the box left and top corner or the crop's
-                current_boxes[:, :2] = np.maximum(current_boxes[:, :2],
-                                                  rect[:2])
-                # adjust to crop (by substracting crop's left,top)
-                current_boxes[:, :2] -= rect[:2]
-
-                current_boxes[:, 2:] = np.minimum(current_boxes[:, 2:],
-                                                  rect[2:])
-                # adjust to crop (by substracting crop's left,top)
-                current_boxes[:, 2:] -= rect[:2]
-                return current_image, np.hstack(
-                    [current_boxes, current_labels])
+        height, width = image.shape[:2]
+        crop_box, mask = sample_crop(
+            boxes[:, :4], height, width, self.sample_options)
+        if crop_box is None:
+            return image, boxes
+        image = image[crop_box[1]:crop_box[3], crop_box[0]:crop_box[2], :]
+        return image, crop_boxes(boxes, crop_box, mask)
 
 
 class Expand(Processor):
@@ -178,26 +112,89 @@ class Expand(Processor):
         if self.probability < np.random.rand():
             return image, boxes
         height, width, num_channels = image.shape
-        ratio = np.random.uniform(1, self.max_ratio)
-        left = np.random.uniform(0, width * ratio - width)
-        top = np.random.uniform(0, height * ratio - height)
-        expanded_image = np.zeros((int(height * ratio),
-                                   int(width * ratio), num_channels),
-                                  dtype=image.dtype)
+        expanded_height, expanded_width, left, top = sample_expansion(
+            height, width, self.max_ratio)
+        expanded_image = np.zeros(
+            (expanded_height, expanded_width, num_channels), dtype=image.dtype)
 
         if self.mean is None:
             expanded_image[:, :, :] = np.mean(image, axis=(0, 1))
         else:
             expanded_image[:, :, :] = self.mean
 
-        expanded_image[int(top):int(top + height),
-                       int(left):int(left + width)] = image
+        expanded_image[top:top + height, left:left + width] = image
         expanded_boxes = boxes.copy()
-        expanded_boxes[:, 0:2] = boxes[:, 0:2] + (int(left), int(top))
-        expanded_boxes[:, 2:4] = boxes[:, 2:4] + (int(left), int(top))
+        expanded_boxes[:, 0:2] = boxes[:, 0:2] + (left, top)
+        expanded_boxes[:, 2:4] = boxes[:, 2:4] + (left, top)
         return expanded_image, expanded_boxes
 
 
+class RandomExpandCropFlipResize(Processor):
+    """Randomly expands, crops and flips an image with its boxes and resizes
+        it with a single affine warp. The parameters of every step are
+        sampled as in ``Expand``, ``RandomSampleCrop`` and
+        ``RandomFlipBoxesLeftRight`` using only the image shape and boxes.
+        No intermediate image is allocated.
+
+    # Arguments
+        size: Int or list of two ints ``(height, width)`` of the output.
+        mean: None/List: If `None` expanded image is filled with
+            the image mean.
+        max_ratio: Float. Maximum expansion ratio.
+        expand_probability: Float between ''[0, 1]''.
+        crop_probability: Float between ''[0, 1]''.
+
+    # Returns
+        Image of shape ``(height, width, channels)`` and boxes in normalized
+            coordinates.
+    """
+    def __init__(self, size, mean=None, max_ratio=2, expand_probability=0.5,
+                 crop_probability=0.5):
+        super(RandomExpandCropFlipResize, self).__init__()
+        if isinstance(size, int):
+            size = (size, size)
+        self.size = size
+        self.mean = mean
+        self.max_ratio = max_ratio
+        self.expand_probability = expand_probability
+        self.crop_probability = crop_probability
+        self.sample_options = SAMPLE_CROP_OPTIONS
+
+    def call(self, image, boxes):
+        height, width = image.shape[:2]
+        boxes = to_image_coordinates(boxes, image)
+        offset, shape = np.zeros(2), (height, width)
+        if not (self.expand_probability < np.random.rand()):
+            expanded_height, expanded_width, left, top = sample_expansion(
+                height, width, self.max_ratio)
+            offset, shape = np.array([left, top]), (expanded_height,
+                                                    expanded_width)
+            boxes[:, :4] = boxes[:, :4] + np.tile(offset, 2)
+
+        if not (self.crop_probability < np.random.rand()):
+            crop_box, mask = sample_crop(
+                boxes[:, :4], shape[0], shape[1], self.sample_options)
+            if crop_box is not None:
+                boxes = crop_boxes(boxes, crop_box, mask)
+                offset = offset - crop_box[:2]
+                shape = (crop_box[3] - crop_box[1], crop_box[2] - crop_box[0])
+
+        flip = bool(np.random.randint(0, 2))
+        if flip:
+            boxes = flip_left_right(boxes, shape[1])
+        boxes[:, [0, 2]] = boxes[:, [0, 2]] / shape[1]
+        boxes[:, [1, 3]] = boxes[:, [1, 3]] / shape[0]
+
+        fill_color = self.mean
+        if fill_color is None:
+            fill_color = np.mean(image, axis=(0, 1)).astype(image.dtype)
+        matrix = compute_crop_flip_resize_matrix(
+            offset, shape, flip, self.size)
+        image = warp_affine(image, matrix, np.asarray(fill_color).tolist(),
+                            self.size[::-1])
+        return image, boxes
+
+
 class ApplyTranslation(Processor):
     """Applies a translation of image and labels.
 
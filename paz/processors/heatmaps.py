@@ -1,5 +1,4 @@
 import numpy as np
-import tensorflow as tf
 
 from ..abstract import Processor
 from paz import processors as pr
@@ -8,12 +7,13 @@ from ..backend.keypoints import transform_keypoint
 from ..backend.image import resize_image
 from ..backend.keypoints import add_offset_to_point
 from ..backend.heatmaps import get_keypoints_locations, get_keypoints_heatmap
-from ..backend.heatmaps import get_top_k_keypoints_numpy
+from ..backend.heatmaps import extract_heatmap_peaks
 from ..backend.heatmaps import get_tags_heatmap, get_valid_detections
-from ..backend.standard import calculate_norm, pad_matrix, tensor_to_numpy
+from ..backend.standard import calculate_norm, pad_matrix
 from ..backend.standard import compare_vertical_neighbours, gather_nd
 from ..backend.standard import compare_horizontal_neighbours
-from ..backend.standard import max_pooling_2d
+from ..backend.standard import compare_vertical_neighbours_batch
+from ..backend.standard import compare_horizontal_neighbours_batch
 
 
 class TransposeOutput(Processor):
@@ -46,17 +46,21 @@ class ScaleOutput(Processor):
         self.scale_factor = int(scale_factor)
         self.full_scaling = full_scaling
 
-    def _resize_output(self, output, size):
-        resized_output = []
-        for heatmap_arg, heatmap in enumerate(output):
-            resized_heatmaps = []
-            for keypoint_arg in range(len(heatmap)):
-                resized = resize_image(output[heatmap_arg][keypoint_arg], size)
-                resized_heatmaps.append(resized)
-            resized_heatmaps = np.stack(resized_heatmaps, axis=0)
-        resized_output.append(resized_heatmaps)
-        resized_output = np.stack(resized_output, axis=0)
-        return resized_output
+    def _resize_output(self, output, size, max_channels=512):
+        """Resizes all maps of an output of shape (batch, num_maps, H, W)
+            at once by stacking them along the channels of a single image.
+        """
+        num_samples, num_maps, H, W = output.shape
+        maps = np.reshape(output, (num_samples * num_maps, H, W))
+        maps = np.transpose(maps, [1, 2, 0])
+        resized_maps = []
+        for start in range(0, len(maps[0, 0]), max_channels):
+            resized = resize_image(np.ascontiguousarray(
+                maps[..., start:start + max_channels]), size)
+            resized_maps.append(np.reshape(resized, (size[1], size[0], -1)))
+        resized_maps = np.concatenate(resized_maps, axis=-1)
+        resized_maps = np.transpose(resized_maps, [2, 0, 1])
+        return np.reshape(resized_maps, (num_samples, num_maps, *size[::-1]))
 
     def call(self, outputs):
         for arg in range(len(outputs)):
@@ -190,7 +194,9 @@ class TopKDetections(Processor):
     """Extract out the top k detections
     # Arguments
         k: Int. Maximum number of instances to be detected.
-        use_numpy: Boolean. Whether to use numpy functions or tf functions.
+        use_numpy: Boolean. Kept for compatibility. Both options extract
+            the peaks with ``extract_heatmap_peaks``, which pools all joints
+            at once and returns the peaks in the order of ``tf.math.top_k``.
         heatmaps: Numpy array of shape (1, num_joints, H, W)
         Tags: Numpy array of shape (1, num_joints, H, W, 2)
 
@@ -203,42 +209,6 @@ class TopKDetections(Processor):
         self.k = k
         self.use_numpy = use_numpy
 
-    def _max_pooing_2d(self, heatmaps, pool_size, strides, padding,
-                       use_numpy=False):
-        if use_numpy:
-            heatmaps = np.squeeze(heatmaps)
-            heatmaps = np.transpose(heatmaps, [2, 0, 1])
-            max_heatmaps = np.zeros_like(heatmaps)
-            for arg, heatmap in enumerate(heatmaps):
-                max_heatmaps[arg] = max_pooling_2d(heatmap, pool_size,
-                                                   strides, padding)
-            max_heatmaps = np.transpose(max_heatmaps, [1, 2, 0])
-            max_pooled_values = np.expand_dims(max_heatmaps, 0)
-        else:
-            max_pooled_values = tf.keras.layers.MaxPooling2D(
-                pool_size, strides, padding)(heatmaps)
-        return max_pooled_values
-
-    def _filter_heatmaps(self, heatmaps):
-        heatmaps = np.transpose(heatmaps, [0, 2, 3, 1])
-        maximum_values = self._max_pooing_2d(heatmaps, pool_size=3, strides=1,
-                                             padding='same',
-                                             use_numpy=self.use_numpy)
-        maximum_values = np.equal(maximum_values, heatmaps)
-        maximum_values = maximum_values.astype(np.float32)
-        filtered_heatmaps = heatmaps * maximum_values
-        filtered_heatmaps = np.transpose(filtered_heatmaps, [0, 3, 1, 2])
-        return filtered_heatmaps
-
-    def _get_top_k_keypoints(self, heatmaps, k, use_numpy):
-        if use_numpy:
-            top_k_keypoints, indices = get_top_k_keypoints_numpy(heatmaps, k)
-        else:
-            top_k_keypoints, indices = tf.math.top_k(heatmaps, k)
-            top_k_keypoints = np.squeeze(top_k_keypoints)
-            indices = tensor_to_numpy(indices)
-        return top_k_keypoints, indices
-
     def _get_top_k_tags(self, tags, indices):
         indices = np.expand_dims(indices, -1)
         gathered = gather_nd(tags, indices, axis=2)
@@ -246,13 +216,11 @@ class TopKDetections(Processor):
 
     def call(self, heatmaps, tags):
         tags = tags.astype(np.int64)
-        heatmaps = self._filter_heatmaps(heatmaps)
         num_images, keypoints_count, H, W = heatmaps.shape[:4]
-        heatmaps = np.reshape(heatmaps, [num_images, keypoints_count, -1])
         tags = np.reshape(tags, [num_images, keypoints_count, W*H, -1])
 
-        top_k_keypoints, indices = self._get_top_k_keypoints(
-            heatmaps, self.k, self.use_numpy)
+        top_k_keypoints, indices = extract_heatmap_peaks(heatmaps, self.k)
+        top_k_keypoints = np.squeeze(top_k_keypoints)
         top_k_tags = self._get_top_k_tags(tags, indices)
         top_k_locations = get_keypoints_locations(indices, W)
 
@@ -269,17 +237,26 @@ class GroupKeypointsByTag(Processor):
         keypoint_order: List of length 17 (number of keypoints).
         tag_thresh: Float.
         detection_thresh: Float.
+        max_num_people: Int. Number of groups preallocated by the
+            vectorized engine. It grows if more groups are found.
+        vectorized: Boolean. If ``True`` groups are kept in arrays of shape
+            ``(max_num_people, num_keypoints, 5)`` together with the running
+            sums of their tags, instead of dictionaries keyed by tag.
+            Both engines output the same groups.
         Detection: Numpy array containing the location, value and tags
                    of top k keypoints
 
     # Returns
         grouped_keypoints: Numpy array. keypoints grouped by tag
     """
-    def __init__(self, keypoint_order, tag_thresh, detection_thresh):
+    def __init__(self, keypoint_order, tag_thresh, detection_thresh,
+                 max_num_people=30, vectorized=True):
         super(GroupKeypointsByTag, self).__init__()
         self.keypoint_order = keypoint_order
         self.tag_thresh = tag_thresh
         self.detection_thresh = detection_thresh
+        self.max_num_people = max_num_people
+        self.vectorized = vectorized
         self.munkres = pr.Munkres()
 
     def _update_dictionary(self, tags, keypoints, arg,
@@ -295,7 +272,16 @@ class GroupKeypointsByTag(Processor):
             grouped_tags.append(np.mean(tag_dict[arg], axis=0))
         return grouped_tags
 
-    def call(self, detections):
+    def _compute_lowest_cost(self, tags, grouped_tags):
+        difference = np.expand_dims(tags, 1) - np.expand_dims(
+            grouped_tags, 0)
+        norm = calculate_norm(difference, order=2, axis=2)
+        norm = pad_matrix(norm, padding='square', value=1e10)
+        lowest_cost = self.munkres.compute(norm)
+        lowest_cost = np.array(lowest_cost).astype(np.int32)
+        return norm, lowest_cost
+
+    def _group_with_dictionaries(self, detections):
         keypoint_dict, tag_dict = {}, {}
         default = np.zeros((detections.shape[0], detections.shape[-1]))
 
@@ -309,12 +295,8 @@ class GroupKeypointsByTag(Processor):
             else:
                 grouped_keys = list(keypoint_dict.keys())
                 grouped_tags = self._group_tags(grouped_keys, tag_dict)
-                difference = np.expand_dims(tags, 1) - np.expand_dims(
-                    grouped_tags, 0)
-                norm = calculate_norm(difference, order=2, axis=2)
-                norm = pad_matrix(norm, padding='square', value=1e10)
-                lowest_cost = self.munkres.compute(norm)
-                lowest_cost = np.array(lowest_cost).astype(np.int32)
+                norm, lowest_cost = self._compute_lowest_cost(
+                    tags, grouped_tags)
 
                 for row_arg, col_arg in lowest_cost:
                     if norm[row_arg][col_arg] < self.tag_thresh:
@@ -328,17 +310,138 @@ class GroupKeypointsByTag(Processor):
         grouped_keypoints = list(keypoint_dict.values())
         return [np.array(grouped_keypoints)]
 
+    def _allocate_groups(self, num_keypoints, num_values, num_tags):
+        self.num_groups = 0
+        self.group_keys = np.zeros(self.max_num_people)
+        self.group_tags_sum = np.zeros((self.max_num_people, num_tags))
+        self.group_tags_count = np.zeros((self.max_num_people, 1))
+        self.grouped_keypoints = np.zeros(
+            (self.max_num_people, num_keypoints, num_values))
+
+    def _add_groups(self, keys):
+        num_groups = self.num_groups + len(keys)
+        num_missing_groups = num_groups - len(self.group_keys)
+        if num_missing_groups > 0:
+            num_new_groups = max(num_missing_groups, len(self.group_keys))
+            grow = (lambda x: np.concatenate(
+                [x, np.zeros((num_new_groups, *x.shape[1:]))]))
+            self.group_keys = grow(self.group_keys)
+            self.group_tags_sum = grow(self.group_tags_sum)
+            self.group_tags_count = grow(self.group_tags_count)
+            self.grouped_keypoints = grow(self.grouped_keypoints)
+        self.group_keys[self.num_groups:num_groups] = keys
+        self.num_groups = num_groups
+
+    def _find_groups(self, keys):
+        group_keys = self.group_keys[:self.num_groups]
+        is_equal = np.equal(np.expand_dims(keys, 1), group_keys)
+        if self.num_groups == 0:
+            return np.zeros(len(keys), dtype=bool), np.zeros(len(keys), int)
+        return np.any(is_equal, axis=1), np.argmax(is_equal, axis=1)
+
+    def _insert_keypoints(self, tags, keypoints, keypoint_arg):
+        """Vectorized equivalent of ``_update_dictionary``. Keypoints are
+        placed in the group whose key is equal to their first tag, creating
+        new groups in order of appearance. If many keypoints share a key
+        the last one is kept. Returns the indices of the updated groups.
+        """
+        keys = tags[:, 0]
+        has_group, group_args = self._find_groups(keys)
+        new_keys, first_args = np.unique(
+            keys[np.logical_not(has_group)], return_index=True)
+        self._add_groups(new_keys[np.argsort(first_args)])
+        has_group, group_args = self._find_groups(keys)
+        group_args, last_args = np.unique(
+            group_args[::-1], return_index=True)
+        last_args = len(keys) - 1 - last_args
+        self.grouped_keypoints[group_args, keypoint_arg] = keypoints[last_args]
+        self.group_tags_sum[group_args] = tags[last_args]
+        self.group_tags_count[group_args] = 1
+        return group_args
+
+    def _assign_keypoints(self, tags, keypoints, keypoint_arg, rows, cols):
+        self.grouped_keypoints[cols, keypoint_arg] = keypoints[rows]
+        self.group_tags_sum[cols] = self.group_tags_sum[cols] + tags[rows]
+        self.group_tags_count[cols] = self.group_tags_count[cols] + 1
+
+    def _group_with_arrays(self, detections):
+        num_keypoints, num_values = detections.shape[0], detections.shape[-1]
+        self._allocate_groups(num_keypoints, num_values, 2)
+        for arg, keypoint_arg in enumerate(self.keypoint_order):
+            keypoints = get_valid_detections(detections[keypoint_arg],
+                                             self.detection_thresh)
+            tags = keypoints[:, -2:]
+            if arg == 0 or self.num_groups == 0:
+                self._insert_keypoints(tags, keypoints, keypoint_arg)
+                continue
+
+            grouped_tags = (self.group_tags_sum[:self.num_groups] /
+                            self.group_tags_count[:self.num_groups])
+            norm, lowest_cost = self._compute_lowest_cost(tags, grouped_tags)
+            rows, cols = lowest_cost[:, 0], lowest_cost[:, 1]
+            is_matched = norm[rows, cols] < self.tag_thresh
+            is_assigned = is_matched
+            if not np.all(is_matched):
+                # re-inserting the keypoints of an unmatched row overwrites
+                # the groups of their keys. Only the last re-insertion and
+                # the matches of other groups or of later rows remain.
+                last_unmatched_row = np.max(rows[np.logical_not(is_matched)])
+                updated_groups = self._insert_keypoints(
+                    tags, keypoints, keypoint_arg)
+                is_kept = np.logical_or(
+                    rows > last_unmatched_row,
+                    np.logical_not(np.isin(cols, updated_groups)))
+                is_assigned = np.logical_and(is_matched, is_kept)
+            self._assign_keypoints(tags, keypoints, keypoint_arg,
+                                   rows[is_assigned], cols[is_assigned])
+
+        if self.num_groups == 0:
+            return [np.array([])]
+        return [self.grouped_keypoints[:self.num_groups].copy()]
+
+    def call(self, detections):
+        if self.vectorized:
+            return self._group_with_arrays(detections)
+        return self._group_with_dictionaries(detections)
+
 
 class AdjustKeypointsLocations(Processor):
     """Adjust the keypoint locations by removing the margins.
     # Arguments
         heatmaps: Numpy array.
         grouped_keypoints: numpy array. keypoints grouped by tag
+        vectorized: Boolean. If True all people and joints are adjusted
+            at once with fancy indexing; otherwise keypoints are adjusted
+            one at a time.
     """
-    def __init__(self):
+    def __init__(self, vectorized=True):
         super(AdjustKeypointsLocations, self).__init__()
+        self.vectorized = vectorized
+
+    def _adjust_vectorized(self, heatmaps, grouped_keypoints):
+        for batch_id, keypoints in enumerate(grouped_keypoints):
+            keypoints = np.asarray(keypoints)
+            if keypoints.size == 0:
+                continue
+            num_objects, num_keypoints = keypoints.shape[:2]
+            keypoint_args = np.tile(np.arange(num_keypoints), num_objects)
+            keypoint_args = keypoint_args.reshape(num_objects, num_keypoints)
+            is_valid = keypoints[:, :, 2] > 0
+            y, x = keypoints[is_valid, 0], keypoints[is_valid, 1]
+            heatmap_args = keypoint_args[is_valid]
+            heatmap = heatmaps[batch_id]
+            y = compare_vertical_neighbours_batch(x, y, heatmap, heatmap_args)
+            x = compare_horizontal_neighbours_batch(
+                x, y, heatmap, heatmap_args)
+            keypoints[is_valid, 0] = y + 0.5
+            keypoints[is_valid, 1] = x + 0.5
+            if keypoints is not grouped_keypoints[batch_id]:
+                grouped_keypoints[batch_id] = keypoints
+        return grouped_keypoints
 
     def call(self, heatmaps, grouped_keypoints):
+        if self.vectorized:
+            return self._adjust_vectorized(heatmaps, grouped_keypoints)
         for batch_id, objects in enumerate(grouped_keypoints):
             for object_id, object in enumerate(objects):
                 for keypoint_id, keypoint in enumerate(object):
@@ -374,9 +477,17 @@ class RefineKeypointsLocations(Processor):
         heatmaps: Numpy array.
         Tgas: Numpy array.
         grouped_keypoints: numpy array. keypoints grouped by tag
+        vectorized: Boolean. If True the tag-distance maps of all people
+            and joints are computed with broadcasting; otherwise each
+            person and joint is refined one at a time.
+        max_elements: Int. Maximum number of elements of the broadcasted
+            tag-distance array. People are processed in chunks that fit
+            this size. Only used if ``vectorized`` is True.
     """
-    def __init__(self):
+    def __init__(self, vectorized=True, max_elements=2**20):
         super(RefineKeypointsLocations, self).__init__()
+        self.vectorized = vectorized
+        self.max_elements = max_elements
 
     def _calculate_tags_mean(self, keypoints, tags):
         keypoints_tags = []
@@ -407,9 +518,67 @@ class RefineKeypointsLocations(Processor):
                 keypoints[i, :3] = updated_keypoints[i, :3]
         return keypoints
 
+    def _calculate_tags_means(self, keypoints, tags):
+        num_objects, num_keypoints = keypoints.shape[:2]
+        is_valid = keypoints[:, :, 2] > 0
+        x = np.where(is_valid, keypoints[:, :, 0], 0).astype(np.int32)
+        y = np.where(is_valid, keypoints[:, :, 1], 0).astype(np.int32)
+        keypoint_args = np.broadcast_to(
+            np.arange(num_keypoints), (num_objects, num_keypoints))
+        keypoints_tags = tags[keypoint_args, y, x]
+        tags_means = [np.mean(object_tags[object_is_valid], axis=0)
+                      for object_tags, object_is_valid
+                      in zip(keypoints_tags, is_valid)]
+        return np.array(tags_means)
+
+    def _find_max_positions(self, heatmaps, tags, tags_means):
+        num_keypoints, H, W = heatmaps.shape
+        chunk_size = self.max_elements // (tags.size or 1)
+        chunk_size = max(1, chunk_size)
+        max_args = []
+        for start in range(0, len(tags_means), chunk_size):
+            means = tags_means[start:start + chunk_size, None, None, None]
+            distances = tags[None] - means
+            if tags.shape[-1] == 1:
+                # sqrt(x ** 2) equals abs(x) under IEEE rounding
+                distances = np.abs(distances[..., 0], out=distances[..., 0])
+            else:
+                distances = np.square(distances, out=distances).sum(axis=-1)
+                distances = np.sqrt(distances, out=distances)
+            distances = np.round(distances, out=distances)
+            normalized = np.subtract(heatmaps, distances, out=distances)
+            normalized = normalized.reshape(-1, num_keypoints, H * W)
+            max_args.append(np.argmax(normalized, axis=-1))
+        return np.unravel_index(np.concatenate(max_args, axis=0), (H, W))
+
+    def _refine_vectorized(self, heatmaps, tags, grouped_keypoints):
+        keypoints = np.asarray(grouped_keypoints)
+        if keypoints.size == 0:
+            return grouped_keypoints
+        num_objects, num_keypoints = keypoints.shape[:2]
+        tags_means = self._calculate_tags_means(keypoints, tags)
+        x, y = self._find_max_positions(heatmaps, tags, tags_means)
+        keypoint_args = np.broadcast_to(
+            np.arange(num_keypoints), (num_objects, num_keypoints))
+        max_heatmaps_values = heatmaps[keypoint_args, x, y]
+        x, y = x + 0.5, y + 0.5
+        y = compare_vertical_neighbours_batch(x, y, heatmaps, keypoint_args)
+        x = compare_horizontal_neighbours_batch(x, y, heatmaps, keypoint_args)
+        is_updated = np.logical_and(
+            max_heatmaps_values > 0, keypoints[:, :, 2] == 0)
+        keypoints[is_updated, 0] = y[is_updated]
+        keypoints[is_updated, 1] = x[is_updated]
+        keypoints[is_updated, 2] = max_heatmaps_values[is_updated]
+        if keypoints is not grouped_keypoints:
+            for arg in range(num_objects):
+                grouped_keypoints[arg] = keypoints[arg]
+        return grouped_keypoints
+
     def call(self, heatmaps, tags, grouped_keypoints):
         if len(tags.shape) == 3:
             tags = np.expand_dims(tags, -1)
+        if self.vectorized:
+            return self._refine_vectorized(heatmaps, tags, grouped_keypoints)
         for arg in range(len(grouped_keypoints)):
             tags_mean = self._calculate_tags_mean(grouped_keypoints[arg], tags)
             updated_keypoints = []
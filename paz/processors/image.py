@@ -8,6 +8,11 @@ from ..backend.image import random_saturation
 from ..backend.image import random_brightness
 from ..backend.image import random_contrast
 from ..backend.image import random_hue
+from ..backend.image import random_saturation_batch
+from ..backend.image import random_brightness_batch
+from ..backend.image import random_contrast_batch
+from ..backend.image import random_hue_batch
+from ..backend.image import random_saturation_hue_batch
 from ..backend.image import resize_image
 from ..backend.image import random_image_blur
 from ..backend.image import random_flip_left_right
@@ -113,13 +118,18 @@ class RandomSaturation(Processor):
     # Arguments
         lower: Float, lower bound for saturation factor.
         upper: Float, upper bound for saturation factor.
+        batch: Boolean. If ``True`` it takes a uint8 batch of images of
+            shape ``(N, H, W, 3)`` and draws a factor for every image.
     """
-    def __init__(self, lower=0.3, upper=1.5):
+    def __init__(self, lower=0.3, upper=1.5, batch=False):
         self.lower = lower
         self.upper = upper
+        self.batch = batch
         super(RandomSaturation, self).__init__()
 
     def call(self, image):
+        if self.batch:
+            return random_saturation_batch(image, self.lower, self.upper)
         return random_saturation(image, self.lower, self.upper)
 
 
@@ -128,12 +138,17 @@ class RandomBrightness(Processor):
 
     # Arguments
         max_delta: Float.
+        batch: Boolean. If ``True`` it takes a uint8 batch of images of
+            shape ``(N, H, W, 3)`` and draws a delta for every image.
     """
-    def __init__(self, delta=32):
+    def __init__(self, delta=32, batch=False):
         self.delta = delta
+        self.batch = batch
         super(RandomBrightness, self).__init__()
 
     def call(self, image):
+        if self.batch:
+            return random_brightness_batch(image, self.delta)
         return random_brightness(image, self.delta)
 
 
@@ -145,13 +160,18 @@ class RandomContrast(Processor):
             to be multiplied with the BGR/RGB image.
         upper: Float, indicating the upper bound of the random number
         to be multiplied with the BGR/RGB image.
+        batch: Boolean. If ``True`` it takes a uint8 batch of images of
+            shape ``(N, H, W, 3)`` and draws a factor for every image.
     """
-    def __init__(self, lower=0.5, upper=1.5):
+    def __init__(self, lower=0.5, upper=1.5, batch=False):
         self.lower = lower
         self.upper = upper
+        self.batch = batch
         super(RandomContrast, self).__init__()
 
     def call(self, image):
+        if self.batch:
+            return random_contrast_batch(image, self.lower, self.upper)
         return random_contrast(image, self.lower, self.upper)
 
 
@@ -161,15 +181,41 @@ class RandomHue(Processor):
     # Arguments
         delta: Int, indicating the range (-delta, delta ) of possible
             hue values.
+        batch: Boolean. If ``True`` it takes a uint8 batch of images of
+            shape ``(N, H, W, 3)`` and draws a hue shift for every image.
     """
-    def __init__(self, delta=18):
+    def __init__(self, delta=18, batch=False):
         self.delta = delta
+        self.batch = batch
         super(RandomHue, self).__init__()
 
     def call(self, image):
+        if self.batch:
+            return random_hue_batch(image, self.delta)
         return random_hue(image, self.delta)
 
 
+class RandomSaturationHue(Processor):
+    """Applies random saturation and hue to a uint8 batch of RGB images of
+        shape ``(N, H, W, 3)`` with a single conversion to and from HSV.
+
+    # Arguments
+        lower: Float, lower bound for saturation factor.
+        upper: Float, upper bound for saturation factor.
+        delta: Int, indicating the range (-delta, delta ) of possible
+            hue values.
+    """
+    def __init__(self, lower=0.3, upper=1.5, delta=18):
+        self.lower = lower
+        self.upper = upper
+        self.delta = delta
+        super(RandomSaturationHue, self).__init__()
+
+    def call(self, images):
+        return random_saturation_hue_batch(
+            images, self.lower, self.upper, self.delta)
+
+
 class ResizeImage(Processor):
     """Resize image.
 
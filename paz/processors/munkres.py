@@ -10,6 +10,7 @@ from ..backend.munkres import find_star_in_col
 from ..backend.munkres import find_prime_in_row
 from ..backend.munkres import get_min_value
 from ..backend.munkres import find_smallest_uncovered
+from ..backend.munkres import compute_assignment
 
 from ..backend.standard import pad_matrix
 
@@ -20,13 +21,20 @@ class Munkres(Processor):
     """
     Provides an implementation of the Munkres algorithm.
 
+    # Arguments
+        vectorized: Boolean. If ``True`` assignments are computed with the
+            shortest augmenting path solver ``compute_assignment``, which
+            is ``O(n^3)`` and solves rectangular matrices without padding.
+            If ``False`` the step-wise Munkres algorithm is used.
+
     # References
     https://brc2.com/the-algorithm-workshop/
     https://software.clapper.org/munkres/
     https://github.com/bmc/munkres
     """
-    def __init__(self):
+    def __init__(self, vectorized=True):
         super(Munkres, self).__init__()
+        self.vectorized = vectorized
         self.Z0_r = 0
         self.Z0_c = 0
         self.done = False
@@ -38,11 +46,14 @@ class Munkres(Processor):
                       6: self._step6}
 
     def compute(self, cost_matrix):
+        if self.vectorized:
+            return compute_assignment(cost_matrix)
+        self.done = False
         self.H, self.W = np.array(cost_matrix).shape[:2]
         self.cost_matrix = pad_matrix(cost_matrix, padding='square')
         self.n = len(self.cost_matrix)
-        self.marked = np.zeros((self.n, self.n), dtype=np.int)
-        self.path = np.zeros((self.n * 2, self.n * 2), dtype=np.int)
+        self.marked = np.zeros((self.n, self.n), dtype=int)
+        self.path = np.zeros((self.n * 2, self.n * 2), dtype=int)
         self.row_covered = np.zeros((self.n, 1), dtype=bool)
         self.col_covered = np.zeros((self.n, 1), dtype=bool)
 
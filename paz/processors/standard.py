@@ -1,4 +1,5 @@
 import numpy as np
+import tensorflow as tf
 
 from ..abstract import Processor
 from ..backend.boxes import to_one_hot
@@ -186,6 +187,12 @@ class SequenceWrapper(Processor):
             tensor name as key and the tensor shape of a single sample as value
             e.g. {2: {'classes': [10]}}.
             The values given here are for the labels of the model.
+
+    # Data types
+        Instead of a shape, a dictionary with keys ``shape`` and ``dtype``
+        can be given to declare the data type used by the sequences when
+        allocating the batches of that tensor
+        e.g. {0: {'input_image': {'shape': [300, 300, 3], 'dtype': 'uint8'}}}.
     """
     def __init__(self, inputs_info, labels_info):
         if not isinstance(inputs_info, dict):
@@ -196,6 +203,8 @@ class SequenceWrapper(Processor):
         self.labels_info = labels_info
         self.inputs_name_to_shape = self._extract_name_to_shape(inputs_info)
         self.labels_name_to_shape = self._extract_name_to_shape(labels_info)
+        self.inputs_name_to_dtype = self._extract_name_to_dtype(inputs_info)
+        self.labels_name_to_dtype = self._extract_name_to_dtype(labels_info)
         self.ordered_input_names = self._extract_ordered_names(inputs_info)
         self.ordered_label_names = self._extract_ordered_names(labels_info)
         super(SequenceWrapper, self).__init__()
@@ -204,9 +213,19 @@ class SequenceWrapper(Processor):
         name_to_shape = {}
         for values in info.values():
             for key, value in values.items():
+                if isinstance(value, dict):
+                    value = value['shape']
                 name_to_shape[key] = value
         return name_to_shape
 
+    def _extract_name_to_dtype(self, info):
+        name_to_dtype = {}
+        for values in info.values():
+            for key, value in values.items():
+                if isinstance(value, dict) and ('dtype' in value):
+                    name_to_dtype[key] = value['dtype']
+        return name_to_dtype
+
     def _extract_ordered_names(self, info):
         arguments = list(info.keys())
         arguments.sort()
@@ -235,21 +254,120 @@ class Predict(Processor):
         model: Class with a ''predict'' method e.g. a Keras model.
         preprocess: Function applied to given inputs.
         postprocess: Function applied to outputted predictions from model.
+        backend: String indicating how the model is evaluated.
+            ``'predict'`` calls ``model.predict``.
+            ``'call'`` calls ``model(x, training=False)`` directly.
+            ``'function'`` calls the model inside a ``tf.function`` traced
+            once with the input signature of the model.
+            ``'auto'`` selects ``'function'`` for Keras models and
+            ``'predict'`` for any other model e.g. ``HaarCascadeDetector``.
+            Keras models evaluated with ``'call'`` or ``'function'`` are
+            warmed up on construction if their input shape is fully defined.
     """
-    def __init__(self, model, preprocess=None, postprocess=None):
+    def __init__(self, model, preprocess=None, postprocess=None,
+                 backend='auto'):
         super(Predict, self).__init__()
         self.model = model
         self.preprocess = preprocess
         self.postprocess = postprocess
+        self.backend = backend
+        self._predict = self._build_predict(backend)
+
+    def _build_predict(self, backend):
+        is_keras_model = isinstance(self.model, tf.keras.Model)
+        if backend == 'auto':
+            backend = 'function' if is_keras_model else 'predict'
+        if backend == 'predict':
+            return self.model.predict
+        if backend not in ['call', 'function']:
+            raise ValueError('Invalid backend', backend)
+        if not is_keras_model:
+            raise ValueError('Backend %s requires a Keras model' % backend)
+
+        input_specs = self._get_input_specs()
+        if backend == 'call':
+            def forward(*inputs):
+                return self._call_model(inputs)
+        else:
+            forward = tf.function(
+                lambda *inputs: self._call_model(inputs), input_specs)
+
+        def predict(x):
+            inputs = x if isinstance(x, (list, tuple)) else [x]
+            if input_specs is not None:
+                inputs = [np.asarray(tensor, spec.dtype.as_numpy_dtype)
+                          for tensor, spec in zip(inputs, input_specs)]
+            outputs = forward(*inputs)
+            return tf.nest.map_structure(lambda y: y.numpy(), outputs)
+
+        self._warm_up(predict, input_specs)
+        return predict
+
+    def _get_input_specs(self):
+        if self.model.inputs is None:
+            return None
+        return [tf.TensorSpec(tensor.shape, tensor.dtype)
+                for tensor in self.model.inputs]
+
+    def _call_model(self, inputs):
+        inputs = inputs[0] if len(inputs) == 1 else list(inputs)
+        return self.model(inputs, training=False)
+
+    def _warm_up(self, predict, input_specs):
+        if input_specs is None:
+            return
+        shapes = [[1] + spec.shape.as_list()[1:] for spec in input_specs]
+        if any(None in shape for shape in shapes):
+            return
+        inputs = [np.zeros(shape, spec.dtype.as_numpy_dtype)
+                  for shape, spec in zip(shapes, input_specs)]
+        predict(inputs[0] if len(inputs) == 1 else inputs)
+
+    def infer(self, x):
+        """Evaluates the model with the selected backend without applying
+        the preprocessing and postprocessing functions.
+
+        # Arguments
+            x: Model inputs.
+
+        # Returns
+            Model outputs as numpy arrays.
+        """
+        return self._predict(x)
 
     def call(self, x):
         if self.preprocess is not None:
             x = self.preprocess(x)
-        y = self.model.predict(x)
+        y = self._predict(x)
         if self.postprocess is not None:
             y = self.postprocess(y)
         return y
 
+    def call_batch(self, inputs):
+        """Preprocesses every input, evaluates the model once on all of
+        them and applies the postprocessing to the output of every input.
+        The preprocessing must return arrays with a leading batch axis of
+        size one e.g. by ending with ``ExpandDims(0)``.
+
+        # Arguments
+            inputs: List of model inputs e.g. image crops of any size.
+
+        # Returns
+            List with the postprocessed prediction of every input.
+        """
+        if len(inputs) == 0:
+            return []
+        if self.preprocess is not None:
+            inputs = [self.preprocess(x) for x in inputs]
+        y = self._predict(np.concatenate(inputs, axis=0))
+        outputs = []
+        for arg in range(len(inputs)):
+            sample = tf.nest.map_structure(lambda z: z[arg:arg + 1], y)
+            if self.postprocess is not None:
+                sample = self.postprocess(sample)
+            outputs.append(sample)
+        return outputs
+
 
 class ToClassName(Processor):
     def __init__(self, labels):
@@ -1,5 +1,5 @@
 import numpy as np
-from paz.abstract.messages import Box2D, Pose6D
+from paz.abstract.messages import Box2D, Boxes2D, Pose6D
 import pytest
 
 
@@ -48,3 +48,32 @@ def test_Pose6D(quaternion, translation, rotation_vector, quaternion_result):
     pose6D = Pose6D(quaternion, translation)
     result = pose6D.from_rotation_vector(rotation_vector, translation)
     assert(result.quaternion.all() == quaternion_result.all())
+
+
+def test_Boxes2D_views_and_selection():
+    coordinates = np.array([[0, 0, 10, 10], [5, 5, 20, 30], [1, 2, 3, 4]])
+    boxes2D = Boxes2D(coordinates, [0.9, 0.5, 0.7], [1, 2, 1],
+                      ['background', 'cat', 'dog'])
+    assert len(boxes2D) == 3
+    box2D = boxes2D[1]
+    assert isinstance(box2D, Box2D)
+    assert box2D.class_name == 'dog'
+    assert box2D.score == 0.5
+    assert np.allclose(box2D.coordinates, [5, 5, 20, 30])
+    selected_boxes2D = boxes2D[boxes2D.class_args == 1]
+    assert isinstance(selected_boxes2D, Boxes2D)
+    assert np.allclose(selected_boxes2D.scores, [0.9, 0.7])
+    assert list(selected_boxes2D.class_name) == ['cat', 'cat']
+
+
+def test_Boxes2D_list_round_trip():
+    class_names = ['background', 'cat', 'dog']
+    boxes2D = [Box2D([0, 0, 10, 10], 0.9, 'dog'),
+               Box2D([1, 2, 3, 4], 0.3, 'cat')]
+    columnar_boxes2D = Boxes2D.from_list(boxes2D, class_names)
+    assert np.allclose(columnar_boxes2D.class_args, [2, 1])
+    for box2D, view in zip(boxes2D, columnar_boxes2D.to_list()):
+        assert np.allclose(box2D.coordinates, view.coordinates)
+        assert box2D.score == view.score
+        assert box2D.class_name == view.class_name
+    assert len(Boxes2D.from_list([], class_names)) == 0
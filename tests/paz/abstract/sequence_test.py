@@ -1,6 +1,10 @@
 from paz.abstract import Processor, SequentialProcessor, ProcessingSequence
+from paz.abstract import ParallelProcessingSequence
+from paz.abstract import ParallelGeneratingSequence
 from paz import processors as pr
+import threading
 import numpy as np
+import pytest
 
 
 class FlipBoxesLeftRight(Processor):
@@ -28,3 +32,163 @@ for _ in range(10):
     batch = sequence.__getitem__(0)
     value_A, value_B = batch[0]['value_A'][0], batch[1]['value_B'][0]
     print(value_B)
+
+
+class AddRandomNoise(Processor):
+    def __init__(self):
+        super(AddRandomNoise, self).__init__()
+
+    def call(self, value_A, value_B):
+        return value_A + np.random.rand(*value_A.shape), value_B
+
+
+class GenerateRandomSample(SequentialProcessor):
+    def __init__(self):
+        super(GenerateRandomSample, self).__init__()
+        self.add(pr.SequenceWrapper({0: {'value_A': [1, 4]}},
+                                    {1: {'value_B': [2, 3]}}))
+
+    def __call__(self):
+        value_A = np.random.rand(1, 4)
+        value_B = np.ones((2, 3))
+        return super(GenerateRandomSample, self).__call__(value_A, value_B)
+
+
+def build_random_processor():
+    random_processor = SequentialProcessor()
+    random_processor.add(pr.UnpackDictionary(['value_A', 'value_B']))
+    random_processor.add(AddRandomNoise())
+    random_processor.add(pr.SequenceWrapper(
+        {0: {'value_A': [1, 4]}}, {1: {'value_B': [2, 3]}}))
+    return random_processor
+
+
+def test_parallel_processing_sequence_matches_serial_order():
+    def build_data():
+        return [{'value_A': np.full((1, 4), arg, dtype=float),
+                 'value_B': np.full((2, 3), arg, dtype=float)}
+                for arg in range(11)]
+    serial = ProcessingSequence(processor, 3, build_data())
+    parallel = ParallelProcessingSequence(processor, 3, build_data(),
+                                          num_workers=3, max_queue_size=2)
+    assert len(serial) == len(parallel)
+    for batch_index in range(len(serial)):
+        serial_inputs, serial_labels = serial[batch_index]
+        inputs, labels = parallel[batch_index]
+        assert np.allclose(serial_inputs['value_A'], inputs['value_A'])
+        assert np.allclose(serial_labels['value_B'], labels['value_B'])
+    parallel.close()
+
+
+def test_parallel_processing_sequence_with_processes_is_reproducible():
+    data_samples = [{'value_A': np.zeros((1, 4)), 'value_B': np.ones((2, 3))}
+                    for arg in range(8)]
+    batches = []
+    for repetition in range(2):
+        sequence = ParallelProcessingSequence(
+            build_random_processor(), 4, data_samples, num_workers=2,
+            use_processes=True, seed=777)
+        batches.append([sequence[arg][0]['value_A'] for arg in range(2)])
+        sequence.close()
+    assert np.allclose(batches[0][0], batches[1][0])
+    assert np.allclose(batches[0][1], batches[1][1])
+    assert not np.allclose(batches[0][0], batches[0][1])
+    values_A = batches[0][0][:, 0]
+    assert len(np.unique(values_A, axis=0)) == len(values_A)
+
+
+class WaitForWorkers(Processor):
+    def __init__(self, num_workers):
+        super(WaitForWorkers, self).__init__()
+        self.barrier = threading.Barrier(num_workers, timeout=5.0)
+
+    def call(self, value_A, value_B):
+        self.barrier.wait()
+        return value_A, value_B
+
+
+def test_parallel_processing_sequence_runs_samples_concurrently():
+    data_samples = [{'value_A': np.zeros((1, 4)), 'value_B': np.ones((2, 3))}
+                    for arg in range(2)]
+    concurrent_processor = SequentialProcessor()
+    concurrent_processor.add(pr.UnpackDictionary(['value_A', 'value_B']))
+    concurrent_processor.add(WaitForWorkers(2))
+    concurrent_processor.add(pr.SequenceWrapper(
+        {0: {'value_A': [1, 4]}}, {1: {'value_B': [2, 3]}}))
+    sequence = ParallelProcessingSequence(
+        concurrent_processor, 2, data_samples, num_workers=2)
+    inputs, labels = sequence[0]
+    sequence.close()
+    assert np.allclose(labels['value_B'], 1.0)
+
+
+def test_parallel_generating_sequence():
+    sequence = ParallelGeneratingSequence(
+        GenerateRandomSample(), 5, 3, as_list=True, num_workers=2)
+    assert len(sequence) == 3
+    for batch_index in range(len(sequence)):
+        inputs, labels = sequence[batch_index]
+        assert inputs[0].shape == (5, 1, 4)
+        assert np.allclose(labels[0], 1.0)
+    sequence.on_epoch_end()
+    sequence.close()
+
+
+def build_typed_processor():
+    typed_processor = SequentialProcessor()
+    typed_processor.add(pr.UnpackDictionary(['value_A', 'value_B']))
+    typed_processor.add(pr.SequenceWrapper(
+        {0: {'value_A': {'shape': [1, 4], 'dtype': 'uint8'}}},
+        {1: {'value_B': [2, 3]}}))
+    return typed_processor
+
+
+def test_sequence_dtypes():
+    data_samples = [{'value_A': np.ones((1, 4)), 'value_B': np.ones((2, 3))}]
+    sequence = ProcessingSequence(
+        build_typed_processor(), 2, data_samples, dtype=np.float32)
+    inputs, labels = sequence[0]
+    assert inputs['value_A'].dtype == np.uint8
+    assert labels['value_B'].dtype == np.float32
+    assert inputs['value_A'].shape == (2, 1, 4)
+
+
+def test_sequence_buffers_are_reused_in_round_robin():
+    data_samples = [{'value_A': np.full((1, 4), arg),
+                     'value_B': np.full((2, 3), arg)} for arg in range(5)]
+    sequence = ProcessingSequence(
+        build_typed_processor(), 2, data_samples, num_buffers=2)
+    batches = [sequence[arg][0]['value_A'] for arg in range(3)]
+    assert batches[0] is not batches[1]
+    assert batches[0] is batches[2]
+    assert np.all(batches[2][0] == 4)
+    assert np.all(batches[2][1] == 0)
+
+
+def test_sequence_batch_processors():
+    data_samples = [{'value_A': np.full((1, 4), arg),
+                     'value_B': np.full((2, 3), arg)} for arg in range(3)]
+    sequence = ProcessingSequence(
+        build_typed_processor(), 3, data_samples,
+        batch_processors={'value_A': lambda batch: batch * 2})
+    inputs, labels = sequence[0]
+    assert np.all(inputs['value_A'] == 2 * np.arange(3)[:, None, None])
+    assert np.all(labels['value_B'] == np.arange(3)[:, None, None])
+
+
+def test_sequence_batch_processors_skip_padded_samples():
+    data_samples = [{'value_A': np.full((1, 4), arg),
+                     'value_B': np.full((2, 3), arg)} for arg in range(3)]
+    sequence = ProcessingSequence(
+        build_typed_processor(), 2, data_samples,
+        batch_processors={'value_A': lambda batch: batch + 1})
+    inputs, labels = sequence[1]
+    assert np.all(inputs['value_A'][0] == 3)
+    assert np.all(inputs['value_A'][1] == 0)
+
+
+def test_sequence_batch_processors_require_uint8():
+    data_samples = [{'value_A': np.ones((1, 4)), 'value_B': np.ones((2, 3))}]
+    with pytest.raises(ValueError):
+        ProcessingSequence(processor, 1, data_samples,
+                           batch_processors={'value_A': lambda batch: batch})
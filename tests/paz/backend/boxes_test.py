@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 
+from paz.backend.boxes import compute_crop_flip_resize_matrix
 from paz.backend.boxes import compute_iou
 from paz.backend.boxes import compute_ious
 from paz.backend.boxes import denormalize_box
@@ -14,6 +15,23 @@ from paz.backend.boxes import to_image_coordinates
 from paz.backend.boxes import to_normalized_coordinates
 from paz.models.detection.utils import create_prior_boxes
 from paz.backend.boxes import extract_bounding_box_corners
+from paz.backend.boxes import nms_per_class
+from paz.backend.boxes import nms_per_class_vectorized
+from paz.backend.boxes import index_prior_boxes
+from paz.backend.boxes import match_with_index
+from paz.backend.boxes import match_and_encode
+from paz.backend.boxes import to_one_hot
+from paz.backend.boxes import compute_decode_constants
+from paz.backend.boxes import decode_with_constants
+from paz.backend.boxes import make_box_square
+from paz.backend.boxes import make_boxes_square
+from paz.backend.boxes import offset
+from paz.backend.boxes import offset_boxes
+from paz.backend.boxes import clip
+from paz.backend.boxes import clip_boxes
+from paz.backend.boxes import denormalize_boxes
+from paz.models.detection.utils import get_prior_box_configuration
+from paz.models.detection.utils import register_prior_box_configuration
 
 # from paz.datasets import VOC
 # from paz.core.ops import get_ground_truths
@@ -200,6 +218,91 @@ def test_extract_corners3D(points3D):
     assert np.allclose(top_right, np.array([267, 310, 299]))
 
 
+@pytest.fixture
+def box_data():
+    random_state = np.random.RandomState(777)
+    num_boxes, num_classes = 300, 6
+    min_corners = random_state.rand(num_boxes, 2)
+    max_corners = min_corners + (0.3 * random_state.rand(num_boxes, 2))
+    scores = random_state.rand(num_boxes, num_classes) ** 3
+    return np.concatenate([min_corners, max_corners, scores], axis=1)
+
+
+def test_nms_per_class_vectorized(box_data):
+    boxes = nms_per_class(box_data, 0.45, 0.01, 200)
+    vectorized_boxes = nms_per_class_vectorized(box_data, 0.45, 0.01, 200)
+    assert vectorized_boxes.shape == (6, 200, 5)
+    assert np.allclose(boxes, vectorized_boxes)
+
+
+def test_nms_per_class_vectorized_top_k(box_data):
+    boxes = nms_per_class(box_data, 0.45, 0.01, 10)
+    vectorized_boxes = nms_per_class_vectorized(box_data, 0.45, 0.01, 10)
+    assert np.allclose(boxes, vectorized_boxes)
+
+
+def test_nms_per_class_vectorized_batch(box_data):
+    batch = np.stack([box_data, box_data[::-1], np.zeros_like(box_data)])
+    vectorized_boxes = nms_per_class_vectorized(batch, 0.45, 0.01, 200)
+    assert vectorized_boxes.shape == (3, 6, 200, 5)
+    for sample, sample_boxes in zip(batch, vectorized_boxes):
+        assert np.allclose(nms_per_class(sample), sample_boxes)
+
+
+@pytest.mark.parametrize('configuration', ['VOC', 'COCO'])
+def test_match_with_index(configuration):
+    random_state = np.random.RandomState(777)
+    prior_boxes = create_prior_boxes(configuration)
+    prior_index = index_prior_boxes(prior_boxes)
+    for num_boxes in [1, 2, 5, 10, 20]:
+        x_min, y_min = random_state.uniform(-0.1, 0.9, (2, num_boxes))
+        width, height = random_state.uniform(0.01, 0.6, (2, num_boxes))
+        class_args = random_state.randint(1, 21, num_boxes)
+        boxes = np.stack([x_min, y_min, x_min + width, y_min + height,
+                          class_args], axis=1)
+        for iou in [0.3, 0.5]:
+            assert np.array_equal(match(boxes.copy(), prior_boxes, iou),
+                                  match_with_index(boxes, prior_index, iou))
+
+
+def test_match_and_encode(boxes_with_label):
+    prior_boxes = create_prior_boxes('VOC')
+    boxes_with_label = boxes_with_label / np.array([500, 500, 500, 500, 1])
+    matches = match(boxes_with_label.copy(), prior_boxes)
+    encoded_boxes = encode(matches, prior_boxes)
+    one_hot_vectors = to_one_hot(encoded_boxes[:, 4].astype(int), 21)
+    target = np.hstack([encoded_boxes[:, :4], one_hot_vectors])
+    prior_index = index_prior_boxes(prior_boxes)
+    targets = match_and_encode(boxes_with_label, prior_boxes, prior_index, 21)
+    assert targets.dtype == np.float32
+    assert np.array_equal(target.astype(np.float32), targets)
+
+
+@pytest.mark.parametrize('shape', [(8732, 25), (3, 8732, 25)])
+def test_decode_with_constants(shape):
+    prior_boxes = create_prior_boxes('VOC')
+    predictions = np.random.normal(0.0, 0.5, shape).astype(np.float32)
+    constants = compute_decode_constants(prior_boxes, [0.1, 0.1, 0.2, 0.2])
+    decoded_boxes = decode_with_constants(predictions, *constants)
+    assert decoded_boxes.dtype == np.float32
+    assert np.allclose(decoded_boxes, decode(predictions, prior_boxes),
+                       atol=1e-6)
+
+
+def test_prior_boxes_registry():
+    configuration = dict(get_prior_box_configuration('VOC'))
+    configuration['feature_map_sizes'] = [40, 20, 10, 5, 3, 1]
+    register_prior_box_configuration('VOC40', configuration)
+    prior_boxes = create_prior_boxes('VOC40')
+    assert len(prior_boxes) == (len(create_prior_boxes('VOC')) +
+                                (40 ** 2 - 38 ** 2) * 4 +
+                                (20 ** 2 - 19 ** 2) * 6)
+    prior_boxes[:] = 0.0
+    assert np.array_equal(create_prior_boxes('VOC40'),
+                          create_prior_boxes(configuration))
+    assert not np.all(create_prior_boxes('VOC40') == 0.0)
+
+
 # def test_data_loader_check():
 #     voc_root = './examples/object_detection/data/VOCdevkit/'
 #     data_names = [['VOC2007', 'VOC2012'], 'VOC2007']
@@ -221,3 +324,46 @@ def test_extract_corners3D(points3D):
 #         boxes_count.append(len(boxes))
 #     assert image_count == target_image_count
 #     assert target_box_count == boxes_count
+
+
+def test_compute_crop_flip_resize_matrix():
+    matrix = compute_crop_flip_resize_matrix((0, 0), (20, 30), False, (20, 30))
+    assert np.allclose(matrix, [[1, 0, 0], [0, 1, 0]])
+    matrix = compute_crop_flip_resize_matrix((-5, -2), (10, 8), True, (20, 8))
+    points = np.array([[5, 2, 1], [12, 11, 1]])
+    assert np.allclose(points @ matrix.T, [[7, 0.5], [0, 18.5]])
+
+
+@pytest.fixture
+def pixel_boxes():
+    x_min, y_min = np.random.uniform(-50, 500, (2, 100))
+    width, height = np.random.uniform(1, 200, (2, 100))
+    return np.stack([x_min, y_min, x_min + width, y_min + height], axis=1)
+
+
+def test_make_boxes_square_matches_make_box_square(pixel_boxes):
+    pixel_boxes = pixel_boxes.astype(int)
+    targets = [make_box_square(box) for box in pixel_boxes]
+    square_boxes = make_boxes_square(pixel_boxes)
+    assert np.issubdtype(square_boxes.dtype, np.integer)
+    assert np.array_equal(square_boxes, targets)
+
+
+def test_offset_boxes_matches_offset(pixel_boxes):
+    targets = [offset(box, (0.1, 0.3)) for box in pixel_boxes]
+    offsetted_boxes = offset_boxes(pixel_boxes, (0.1, 0.3))
+    assert np.issubdtype(offsetted_boxes.dtype, np.integer)
+    assert np.array_equal(offsetted_boxes, targets)
+
+
+def test_clip_boxes_matches_clip(pixel_boxes):
+    targets = [clip(box, (300, 400)) for box in pixel_boxes]
+    assert np.allclose(clip_boxes(pixel_boxes, (300, 400)), targets)
+
+
+def test_denormalize_boxes_matches_denormalize_box(pixel_boxes):
+    boxes = pixel_boxes / 700.0
+    targets = [denormalize_box(box, (480, 640)) for box in boxes]
+    values = denormalize_boxes(boxes, (480, 640))
+    assert values.dtype.kind == 'i'
+    assert np.array_equal(values, targets)
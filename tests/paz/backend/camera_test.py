@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import queue
+import pytest
+import cv2
+import numpy as np
+
+from paz.backend.camera import FrameGrabber, StageTimer, VideoPlayer
+from paz.backend.camera import put_latest, VideoProcessor
+from paz.abstract.messages import Box2D
+from paz.backend import camera
+
+
+class FakeCamera(object):
+    def __init__(self, period=0.002):
+        self.period = period
+        self.frame_arg = 0
+        self.opened = False
+
+    def start(self):
+        self.opened = True
+
+    def stop(self):
+        self.opened = False
+
+    def is_open(self):
+        return self.opened
+
+    def read(self):
+        time.sleep(self.period)
+        self.frame_arg = self.frame_arg + 1
+        return np.full((8, 8, 3), self.frame_arg % 256, dtype=np.uint8)
+
+
+def test_stage_timer():
+    timer = StageTimer(window_size=3)
+    assert timer.fps == 0.0 and timer.latency == 0.0
+    for arg in range(5):
+        timer.update(arg - 0.5, arg)
+    assert np.isclose(timer.fps, 1.0)
+    assert np.isclose(timer.latency, 0.5)
+
+
+def test_put_latest():
+    bounded_queue = queue.Queue(2)
+    assert not put_latest(bounded_queue, 0)
+    assert not put_latest(bounded_queue, 1)
+    assert put_latest(bounded_queue, 2)
+    assert [bounded_queue.get(), bounded_queue.get()] == [1, 2]
+
+
+def test_frame_grabber_returns_latest_frame():
+    camera = FakeCamera()
+    camera.start()
+    grabber = FrameGrabber(camera).start()
+    frame, timestamp = grabber.read(timeout=1.0)
+    time.sleep(0.05)
+    latest_frame, latest_timestamp = grabber.read(timeout=1.0)
+    grabber.stop()
+    assert latest_timestamp > timestamp
+    assert latest_frame[0, 0, 0] > frame[0, 0, 0] + 1
+    assert grabber.num_dropped_frames > 0
+
+
+def test_video_player_pipelined():
+    outputs = []
+
+    def render(output):
+        outputs.append(output)
+        return len(outputs) < 5
+
+    def pipeline(image):
+        time.sleep(0.01)
+        return {'image': image}
+
+    camera = FakeCamera()
+    player = VideoPlayer((8, 8), pipeline, camera, pipelined=True)
+    player._run_pipelined(render)
+    assert len(outputs) == 5
+    assert not camera.is_open()
+    statistics = player.statistics()
+    assert statistics['inference']['latency'] >= 0.01
+    assert statistics['capture']['fps'] > statistics['inference']['fps']
+    assert statistics['dropped_frames'] > 0
+
+
+def test_video_player_pipelined_raises_pipeline_error():
+    def pipeline(image):
+        raise RuntimeError('pipeline failed')
+
+    camera = FakeCamera()
+    player = VideoPlayer((8, 8), pipeline, camera, pipelined=True)
+    with pytest.raises(RuntimeError, match='pipeline failed'):
+        player._run_pipelined(lambda output: True)
+    assert not camera.is_open()
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    video_path = str(tmp_path / 'video.avi')
+    writer = cv2.VideoWriter(
+        video_path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (32, 24))
+    for frame_arg in range(20):
+        writer.write(np.full((24, 32, 3), frame_arg * 10, dtype=np.uint8))
+    writer.release()
+    return video_path
+
+
+class DetectBrightness(object):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, image):
+        box = Box2D(np.array([0, 0, 4, 4]), float(image.mean()), 'frame')
+        return {'image': image, 'boxes2D': [box]}
+
+    def call_batch(self, images):
+        self.batch_sizes.append(len(images))
+        return [self(image) for image in images]
+
+
+def test_video_processor_batches_and_resumes(video_path, tmp_path):
+    pipeline = DetectBrightness()
+    processor = VideoProcessor(pipeline, batch_size=3, stride=2)
+    results_path = str(tmp_path / 'results.jsonl')
+    output_path = str(tmp_path / 'output.avi')
+    statistics = processor.process(
+        video_path, output_path, results_path, max_frames=4)
+    assert statistics['num_frames'] == 4
+    assert statistics['fps'] > 0
+    assert pipeline.batch_sizes == [3, 1]
+    assert os.path.isfile(output_path)
+
+    statistics = processor.process(
+        video_path, output_path, results_path, resume=True)
+    assert statistics['start_frame'] == 7
+    with open(results_path, 'r') as results_file:
+        results = [json.loads(line) for line in results_file]
+    assert [result['frame'] for result in results] == list(range(0, 20, 2))
+    scores = [result['boxes2D'][0]['score'] for result in results]
+    assert np.all(np.diff(scores) > 0)
+    assert os.path.isfile(str(tmp_path / 'output_00000007.avi'))
+
+
+def test_video_processor_npz_results(video_path, tmp_path):
+    results_path = str(tmp_path / 'results')
+    processor = VideoProcessor(DetectBrightness())
+    statistics = processor.process(video_path, None, results_path)
+    assert statistics['num_frames'] == 20
+    assert len(os.listdir(results_path)) == 20
+    results = np.load(os.path.join(results_path, 'frame_00000003.npz'))
+    assert np.array_equal(results['boxes2D/coordinates'], [[0, 0, 4, 4]])
+    assert results['boxes2D/class_name'][0] == 'frame'
+
+
+def test_video_processor_resume_removes_partial_line(video_path, tmp_path):
+    results_path = str(tmp_path / 'results.jsonl')
+    processor = VideoProcessor(DetectBrightness())
+    processor.process(video_path, None, results_path, max_frames=3)
+    with open(results_path, 'a') as results_file:
+        results_file.write('{"frame": 3, "boxes2D": [')
+    statistics = processor.process(
+        video_path, None, results_path, resume=True)
+    assert statistics['start_frame'] == 3
+    with open(results_path, 'r') as results_file:
+        results = [json.loads(line) for line in results_file]
+    assert [result['frame'] for result in results] == list(range(20))
+
+
+def test_video_processor_raises_decode_error(video_path, monkeypatch):
+    def convert_color_space(image, flag):
+        raise RuntimeError('decode failed')
+
+    monkeypatch.setattr(camera, 'convert_color_space', convert_color_space)
+    processor = VideoProcessor(DetectBrightness())
+    with pytest.raises(RuntimeError, match='decode failed'):
+        processor.process(video_path)
@@ -1,4 +1,5 @@
 import numpy as np
+import tensorflow as tf
 from paz.backend import heatmaps
 import pytest
 
@@ -85,3 +86,19 @@ def test_get_keypoints_coordinates(keypoint_indices, output,
 def test_get_valid_detections(detections, valid_detections):
     estimated_detection = heatmaps.get_valid_detections(detections, 0.2)
     assert np.allclose(estimated_detection, valid_detections)
+
+
+@pytest.mark.parametrize('k', [1, 20, 200])
+def test_extract_heatmap_peaks_matches_tensorflow(k):
+    values = np.round(np.random.normal(0, 1, (1, 5, 13, 17)), 1)
+    values = values.astype('float32')
+    max_values = tf.nn.max_pool2d(
+        np.transpose(values, [0, 2, 3, 1]), 3, 1, 'SAME').numpy()
+    max_values = np.transpose(max_values, [0, 3, 1, 2])
+    assert np.array_equal(heatmaps.max_pooling_heatmaps(values), max_values)
+    peaks = values * np.equal(max_values, values)
+    target_values, target_indices = tf.math.top_k(
+        np.reshape(peaks, (1, 5, -1)), k)
+    peak_values, indices = heatmaps.extract_heatmap_peaks(values, k)
+    assert np.array_equal(peak_values, target_values.numpy())
+    assert np.array_equal(indices, target_indices.numpy())
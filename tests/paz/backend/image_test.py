@@ -1,9 +1,15 @@
+import pytest
 import numpy as np
 
 from paz.backend.image import replace_lower_than_threshold
 from paz.backend.image import image_to_normalized_device_coordinates
 from paz.backend.image import normalized_device_coordinates_to_image
 from paz.backend.image import normalize_min_max
+from paz.backend.image import random_saturation, random_saturation_batch
+from paz.backend.image import random_brightness, random_brightness_batch
+from paz.backend.image import random_contrast, random_contrast_batch
+from paz.backend.image import random_hue, random_hue_batch
+from paz.backend.image import random_saturation_hue_batch
 
 
 def test_replace_lower_than_threshold():
@@ -34,3 +40,34 @@ def test_normalize_min_max():
     assert np.allclose(values, np.array([0.0, 0.5, 1.0]))
 
 
+@pytest.fixture
+def images():
+    return np.random.randint(0, 256, (4, 16, 24, 3)).astype(np.uint8)
+
+
+@pytest.mark.parametrize('function, batch_function', [
+    (random_saturation, random_saturation_batch),
+    (random_brightness, random_brightness_batch),
+    (random_contrast, random_contrast_batch),
+    (random_hue, random_hue_batch)])
+def test_photometric_batch(images, function, batch_function):
+    np.random.seed(777)
+    targets = np.array([function(image.copy()) for image in images])
+    np.random.seed(777)
+    values = batch_function(images)
+    assert values.dtype == np.uint8
+    assert np.array_equal(values, targets)
+
+
+def test_random_saturation_hue_batch(images):
+    values = random_saturation_hue_batch(images, 1.0, 1.0, 0)
+    assert values.shape == images.shape
+    assert np.array_equal(values, random_hue_batch(images, 0))
+
+
+@pytest.mark.parametrize('batch_function', [
+    random_saturation_batch, random_brightness_batch,
+    random_contrast_batch, random_hue_batch])
+def test_photometric_batch_rejects_non_uint8(images, batch_function):
+    with pytest.raises(ValueError):
+        batch_function(images.astype(np.float64))
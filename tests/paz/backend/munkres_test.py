@@ -1,6 +1,7 @@
 from paz.processors import Munkres
 from paz.backend import munkres
 import pytest
+import numpy as np
 
 
 DISALLOWED = munkres.DISALLOWED_OBJ()
@@ -104,3 +105,35 @@ def test_matrix_cost(cost_matrices):
 def test_get_min_value(rectangular_cost_matrix, expected_min_value):
     min_value = munkres.get_min_value(rectangular_cost_matrix[0])
     assert (min_value == expected_min_value)
+
+
+def test_matrix_cost_stepwise(cost_matrices):
+    m = Munkres(vectorized=False)
+    for cost_matrix, expected_total in cost_matrices:
+        indexes = m.compute(cost_matrix)
+        total_cost = sum([cost_matrix[r][c] for r, c in indexes])
+        assert abs(expected_total - total_cost) < 1e-6
+
+
+def test_compute_assignment_rectangular(rectangular_cost_matrix):
+    indexes = munkres.compute_assignment(rectangular_cost_matrix)
+    assert indexes == [(0, 1), (1, 3), (2, 0)]
+    transposed_cost_matrix = list(map(list, zip(*rectangular_cost_matrix)))
+    indexes = munkres.compute_assignment(transposed_cost_matrix)
+    assert indexes == [(0, 2), (1, 0), (3, 1)]
+
+
+def test_compute_assignment_matches_stepwise():
+    random_state = np.random.RandomState(777)
+    stepwise = Munkres(vectorized=False)
+    for size in [2, 5, 12]:
+        cost_matrix = random_state.rand(size, size)
+        indexes = munkres.compute_assignment(cost_matrix)
+        stepwise_indexes = stepwise.compute(cost_matrix.copy())
+        assert indexes == stepwise_indexes
+
+
+def test_compute_assignment_unsolvable():
+    cost_matrix = [[1, DISALLOWED], [2, DISALLOWED]]
+    with pytest.raises(munkres.UnsolvableMatrix):
+        munkres.compute_assignment(cost_matrix)
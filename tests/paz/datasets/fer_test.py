@@ -0,0 +1,65 @@
+import os
+import pytest
+import numpy as np
+import cv2
+
+from paz.datasets import FER, FERPlus
+from paz.datasets.fer import resize_faces
+from paz.backend.image import resize_image
+
+
+USAGES = ['Training', 'PublicTest', 'Training', 'PrivateTest', 'Training']
+
+
+@pytest.fixture
+def faces():
+    return np.random.randint(0, 256, (len(USAGES), 48, 48), dtype=np.uint8)
+
+
+@pytest.fixture
+def dataset_path(tmp_path, faces):
+    with open(tmp_path / 'fer2013.csv', 'w') as f:
+        f.write('emotion,pixels,Usage\n')
+        for arg, (face, usage) in enumerate(zip(faces, USAGES)):
+            pixels = ' '.join(map(str, face.ravel()))
+            f.write('%d,%s,%s\n' % (arg, pixels, usage))
+    with open(tmp_path / 'fer2013new.csv', 'w') as f:
+        f.write('Usage,Image name,' + ','.join('abcdefghij') + '\n')
+        for arg, usage in enumerate(USAGES):
+            votes = [0] * 10 if arg == 2 else list(range(arg, arg + 10))
+            f.write('%s,fer%d.png,%s\n' % (usage, arg, ','.join(
+                map(str, votes))))
+    return str(tmp_path)
+
+
+def test_resize_faces(faces):
+    resized_faces = resize_faces(faces, (64, 32), max_channels=2)
+    assert resized_faces.shape == (len(faces), 32, 64)
+    for face, resized_face in zip(faces, resized_faces):
+        target = cv2.resize(face.astype(np.float64), (64, 32))
+        assert np.array_equal(resized_face, target)
+
+
+@pytest.mark.parametrize('image_size', [(48, 48), (64, 32)])
+def test_FER_cache(dataset_path, tmp_path, faces, image_size):
+    cache_path = str(tmp_path / 'cache')
+    for _ in range(2):
+        data = FER(dataset_path, 'train', image_size=image_size,
+                   cache_path=cache_path).load_data()
+        assert len(data) == 3
+        for sample, arg in zip(data[:], [0, 2, 4]):
+            target = resize_image(faces[arg].astype(np.float64), image_size)
+            assert np.array_equal(sample['image'], target)
+            assert np.argmax(sample['label']) == arg
+    assert isinstance(np.load(os.path.join(cache_path, 'train_faces.npy'),
+                              mmap_mode='r'), np.memmap)
+
+
+def test_FERPlus_cache(dataset_path, tmp_path, faces):
+    data = FERPlus(dataset_path, 'train',
+                   cache_path=str(tmp_path / 'cache')).load_data()
+    assert len(data) == 2
+    for sample, arg in zip(data, [0, 4]):
+        assert np.array_equal(sample['image'], faces[arg])
+        votes = np.arange(arg, arg + 8)
+        assert np.allclose(sample['label'], votes / np.sum(votes))
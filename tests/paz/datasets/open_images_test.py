@@ -0,0 +1,48 @@
+import os
+import pytest
+import numpy as np
+
+from paz.datasets import OpenImages
+
+
+HEADER = 'ImageID,Source,LabelName,Confidence,XMin,XMax,YMin,YMax\n'
+ROWS = [('b', '/m/02', 0.1, 0.5, 0.2, 0.6),
+        ('a', '/m/01', 0.0, 1.0, 0.0, 1.0),
+        ('b', '/m/01', 0.3, 0.4, 0.1, 0.9),
+        ('c', '/m/03', 0.2, 0.3, 0.4, 0.5),
+        ('a', '/m/02', 0.5, 0.7, 0.5, 0.8)]
+
+
+@pytest.fixture
+def dataset_path(tmp_path):
+    with open(tmp_path / 'class-descriptions-boxable.csv', 'w') as f:
+        f.write('/m/01,Dog\n/m/02,Cat\n')
+    with open(tmp_path / 'train-annotations-bbox.csv', 'w') as f:
+        f.write(HEADER)
+        for image_id, label, x_min, x_max, y_min, y_max in ROWS:
+            f.write('%s,xclick,%s,1,%s,%s,%s,%s\n' % (
+                image_id, label, x_min, x_max, y_min, y_max))
+    return str(tmp_path)
+
+
+def test_load_data(dataset_path):
+    data = OpenImages(dataset_path, 'train').load_data()
+    assert len(data) == 2
+    assert data[0]['image'] == os.path.join(dataset_path, 'train', 'b.jpg')
+    assert np.allclose(data[0]['boxes'], [[0.1, 0.2, 0.5, 0.6, 2],
+                                          [0.3, 0.1, 0.4, 0.9, 1]])
+    assert data[1]['image'] == os.path.join(dataset_path, 'train', 'a.jpg')
+    assert np.allclose(data[1]['boxes'], [[0.0, 0.0, 1.0, 1.0, 1],
+                                          [0.5, 0.5, 0.7, 0.8, 2]])
+    assert data[0]['boxes'].dtype == np.float32
+    assert os.path.isdir(os.path.join(
+        dataset_path, 'train-annotations-bbox-index'))
+
+
+def test_load_data_with_class_subset(dataset_path):
+    data_manager = OpenImages(dataset_path, 'train', ['Cat'])
+    data = data_manager.load_data()
+    assert len(data) == 2
+    assert [sample['image'][-5:] for sample in data] == ['b.jpg', 'a.jpg']
+    assert np.allclose(data[:][1]['boxes'], [[0.5, 0.5, 0.7, 0.8, 1]])
+    assert data_manager.class_distribution == {'background': 0, 'Cat': 2}
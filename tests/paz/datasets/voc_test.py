@@ -0,0 +1,74 @@
+import os
+import pytest
+import numpy as np
+
+from paz.datasets import VOC
+
+
+ANNOTATION = """<annotation>
+    <filename>{0}.jpg</filename>
+    <size><width>100</width><height>50</height><depth>3</depth></size>
+    {1}
+</annotation>"""
+
+OBJECT = """<object>
+        <name>{0}</name><difficult>{1}</difficult>
+        <bndbox><xmin>{2}</xmin><ymin>{3}</ymin>
+        <xmax>{4}</xmax><ymax>{5}</ymax></bndbox>
+    </object>"""
+
+
+@pytest.fixture
+def dataset_path(tmp_path):
+    dataset_path = tmp_path / 'VOCdevkit' / 'VOC2007'
+    os.makedirs(dataset_path / 'Annotations')
+    os.makedirs(dataset_path / 'ImageSets' / 'Main')
+    samples = {'000001': [('dog', 0, 1, 2, 30, 40), ('cat', 1, 5, 6, 7, 8)],
+               '000002': [('cat', 0, 10, 10, 90, 45)],
+               '000003': [('person', 1, 3, 4, 50, 20)]}
+    for name, objects in samples.items():
+        objects = ''.join([OBJECT.format(*object) for object in objects])
+        with open(dataset_path / 'Annotations' / (name + '.xml'), 'w') as f:
+            f.write(ANNOTATION.format(name, objects))
+    with open(dataset_path / 'ImageSets' / 'Main' / 'train.txt', 'w') as f:
+        f.write('\n'.join(samples.keys()))
+    return str(tmp_path / 'VOCdevkit')
+
+
+def assert_data_equal(data, cached_data):
+    assert len(data) == len(cached_data)
+    for sample, cached_sample in zip(data, cached_data):
+        assert sample.keys() == cached_sample.keys()
+        assert sample['image'] == cached_sample['image']
+        for key in set(sample.keys()) - set(['image']):
+            assert sample[key].dtype == cached_sample[key].dtype
+            assert np.array_equal(sample[key], cached_sample[key])
+
+
+@pytest.mark.parametrize('evaluate', [True, False])
+@pytest.mark.parametrize('with_difficult_samples', [True, False])
+def test_VOC_cache(dataset_path, tmp_path, evaluate, with_difficult_samples):
+    cache_path = str(tmp_path / 'cache')
+    arguments = (dataset_path, 'train', ['background', 'cat', 'dog'],
+                 'VOC2007', with_difficult_samples, evaluate)
+    data = VOC(*arguments).load_data()
+    written_data = VOC(*arguments, cache_path=cache_path).load_data()
+    assert len(os.listdir(cache_path)) == 1
+    cached_data = VOC(*arguments, cache_path=cache_path).load_data()
+    assert_data_equal(data, written_data)
+    assert_data_equal(data, cached_data)
+
+
+def test_VOC_cache_invalidation(dataset_path, tmp_path):
+    cache_path = str(tmp_path / 'cache')
+    VOC(dataset_path, 'train', cache_path=cache_path).load_data()
+    filepath = os.path.join(dataset_path, 'VOC2007', 'Annotations',
+                            '000002.xml')
+    with open(filepath, 'w') as filedata:
+        filedata.write(ANNOTATION.format(
+            '000002', OBJECT.format('horse', 0, 10, 10, 90, 45)))
+    os.utime(filepath, ns=(0, 0))
+    data = VOC(dataset_path, 'train', cache_path=cache_path).load_data()
+    assert_data_equal(data, VOC(dataset_path, 'train').load_data())
+    assert data[1]['boxes'][0, 4] == VOC(dataset_path).class_names.index(
+        'horse')
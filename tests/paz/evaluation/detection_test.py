@@ -0,0 +1,162 @@
+import os
+import pickle
+import pytest
+import numpy as np
+
+from paz.abstract import Box2D
+from paz.backend.image import write_image
+from paz.evaluation import evaluateMAP, IncrementalMAPEvaluator
+from paz.evaluation import evaluateMAPParallel
+
+
+@pytest.fixture
+def class_to_arg():
+    return {'background': 0, 'cat': 1, 'dog': 2, 'person': 3}
+
+
+@pytest.fixture
+def evaluation_data(tmp_path, class_to_arg):
+    random_state = np.random.RandomState(777)
+    arg_to_class = {arg: name for name, arg in class_to_arg.items()}
+    dataset, detections = [], []
+    for sample_arg in range(30):
+        image_path = str(tmp_path / ('image_%d.png' % sample_arg))
+        write_image(image_path, np.zeros((8, 8, 3), dtype=np.uint8))
+        num_boxes = random_state.randint(0, 5)
+        x_min, y_min = random_state.randint(0, 100, (2, num_boxes))
+        width, height = random_state.randint(10, 50, (2, num_boxes))
+        class_args = random_state.randint(1, 4, num_boxes)
+        boxes = np.stack([x_min, y_min, x_min + width, y_min + height,
+                          class_args], axis=1).astype(np.float32)
+        difficulties = random_state.rand(num_boxes) < 0.2
+        dataset.append({'image': image_path, 'boxes': boxes,
+                        'difficulties': difficulties})
+
+        boxes2D = []
+        for box in boxes:
+            if random_state.rand() < 0.8:
+                noise = random_state.randint(-6, 7, 4)
+                coordinates = box[:4] + noise
+                score = random_state.rand()
+                class_name = arg_to_class[int(box[4])]
+                boxes2D.append(Box2D(coordinates, score, class_name))
+        for false_positive_arg in range(random_state.randint(0, 3)):
+            x_min, y_min = random_state.randint(0, 100, 2)
+            coordinates = [x_min, y_min, x_min + 20, y_min + 20]
+            class_name = arg_to_class[random_state.randint(1, 4)]
+            boxes2D.append(Box2D(coordinates, random_state.rand(), class_name))
+        detections.append(boxes2D)
+    return dataset, detections
+
+
+def replay(detections):
+    detections = iter(detections)
+
+    def detect(image):
+        return {'boxes2D': next(detections)}
+    return detect
+
+
+class ReplayBatches(object):
+    def __init__(self, detections):
+        self.detect = replay(detections)
+        self.batch_sizes = []
+
+    def call_batch(self, images):
+        self.batch_sizes.append(len(images))
+        return [self.detect(image) for image in images]
+
+
+@pytest.mark.parametrize('use_07_metric', [True, False])
+def test_IncrementalMAPEvaluator_matches_evaluateMAP(
+        evaluation_data, class_to_arg, use_07_metric):
+    dataset, detections = evaluation_data
+    result = evaluateMAP(replay(detections), dataset, class_to_arg,
+                         0.5, use_07_metric)
+    evaluator = IncrementalMAPEvaluator(class_to_arg, 0.5, buffer_size=2)
+    for boxes2D, sample in zip(detections, dataset):
+        evaluator.add(boxes2D, sample)
+    incremental_result = evaluator.compute(use_07_metric)
+    assert np.array_equal(result['ap'], incremental_result['ap'],
+                          equal_nan=True)
+    assert result['map'] == incremental_result['map']
+
+
+def test_IncrementalMAPEvaluator_merge(evaluation_data, class_to_arg):
+    dataset, detections = evaluation_data
+    evaluator = IncrementalMAPEvaluator(class_to_arg)
+    shards = [IncrementalMAPEvaluator(class_to_arg) for _ in range(3)]
+    for sample_arg, (boxes2D, sample) in enumerate(zip(detections, dataset)):
+        evaluator.add(boxes2D, sample)
+        shards[sample_arg % 3].add(boxes2D, sample)
+    shards = [pickle.loads(pickle.dumps(shard)) for shard in shards]
+    merged = shards[0].merge(shards[1]).merge(shards[2])
+    assert np.allclose(evaluator.compute()['ap'], merged.compute()['ap'],
+                       equal_nan=True)
+
+
+def test_IncrementalMAPEvaluator_array_predictions(class_to_arg):
+    evaluator = IncrementalMAPEvaluator(class_to_arg)
+    ground_truth = np.array([[10, 10, 50, 50, 1], [60, 60, 90, 90, 2]])
+    predictions = np.array([[11, 10, 50, 49, 1, 0.9],
+                            [60, 60, 90, 90, 1, 0.8]])
+    evaluator.add(predictions, ground_truth)
+    result = evaluator.compute()
+    assert np.isclose(result['ap'][1], 1.0)
+    assert np.isclose(result['ap'][2], 0.0)
+
+
+def test_IncrementalMAPEvaluator_merge_invalid_thresh(class_to_arg):
+    evaluator = IncrementalMAPEvaluator(class_to_arg, 0.5)
+    with pytest.raises(ValueError):
+        evaluator.merge(IncrementalMAPEvaluator(class_to_arg, 0.7))
+
+
+@pytest.mark.parametrize('use_07_metric', [True, False])
+def test_evaluateMAPParallel_matches_evaluateMAP(
+        evaluation_data, class_to_arg, use_07_metric):
+    dataset, detections = evaluation_data
+    result = evaluateMAP(replay(detections), dataset, class_to_arg,
+                         0.5, use_07_metric)
+    detector = ReplayBatches(detections)
+    parallel_result = evaluateMAPParallel(
+        detector, dataset, class_to_arg, 0.5, use_07_metric, batch_size=8)
+    assert detector.batch_sizes == [8, 8, 8, 6]
+    assert np.array_equal(result['ap'], parallel_result['ap'], equal_nan=True)
+    assert set(parallel_result['timings'].keys()) == set(
+        ['decode', 'inference', 'matching'])
+
+
+def test_evaluateMAPParallel_reuses_cached_detections(
+        tmp_path, evaluation_data, class_to_arg):
+    dataset, detections = evaluation_data
+    cache_directory = str(tmp_path / 'cache')
+    evaluateMAPParallel(replay(detections), dataset, class_to_arg,
+                        cache_directory=cache_directory, weights_hash='SSD')
+
+    def detect_raises(image):
+        raise AssertionError('Detections were not cached')
+    result = evaluateMAP(replay(detections), dataset, class_to_arg, 0.7)
+    cached_result = evaluateMAPParallel(
+        detect_raises, dataset, class_to_arg, 0.7,
+        cache_directory=cache_directory, weights_hash='SSD')
+    assert np.array_equal(result['ap'], cached_result['ap'], equal_nan=True)
+
+
+class FakeModel(object):
+    def get_weights(self):
+        return [np.ones((3, 3)), np.zeros(3)]
+
+
+def test_evaluateMAPParallel_cache_key_includes_thresholds(
+        tmp_path, evaluation_data, class_to_arg):
+    dataset, detections = evaluation_data
+    cache_directory = str(tmp_path / 'cache')
+    for score_thresh in [0.5, 0.6]:
+        detector = ReplayBatches(detections)
+        detector.model = FakeModel()
+        detector.score_thresh, detector.nms_thresh = score_thresh, 0.45
+        evaluateMAPParallel(detector, dataset, class_to_arg,
+                            cache_directory=cache_directory)
+        assert detector.batch_sizes == [16, 14]
+    assert len(os.listdir(cache_directory)) == 2
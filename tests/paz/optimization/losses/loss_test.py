@@ -121,3 +121,45 @@ def test_negative_classification_loss(y_true, y_pred, loss,
         negative_classification_loss, dtype='float32')
     assert np.allclose(
         negative_classification_loss, target_negative_classification_loss)
+
+
+@pytest.fixture
+def batch_targets():
+    batch_size, num_boxes, num_classes = 4, 200, 6
+    y_true = np.zeros((batch_size, num_boxes, 4 + num_classes), 'float32')
+    y_true[:, :, :4] = np.random.normal(0, 1, (batch_size, num_boxes, 4))
+    class_args = np.zeros((batch_size, num_boxes), dtype=int)
+    for sample_arg, num_positives in enumerate([0, 3, 20, 60]):
+        class_args[sample_arg, :num_positives] = np.random.randint(
+            1, num_classes, num_positives)
+    y_true[:, :, 4:] = np.eye(num_classes)[class_args]
+    y_pred = np.random.normal(0, 1, (batch_size, num_boxes, 4 + num_classes))
+    y_pred[:, :, 4:] = np.random.dirichlet(
+        np.ones(num_classes), (batch_size, num_boxes))
+    return y_true, y_pred.astype('float32')
+
+
+def test_negative_classification_matches_top_k(batch_targets, loss):
+    import tensorflow as tf
+    y_true, y_pred = batch_targets
+    class_loss = loss._cross_entropy(y_true[:, :, 4:], y_pred[:, :, 4:])
+    positive_mask, negative_mask = loss._calculate_masks(y_true)
+    num_negatives = np.minimum(loss.neg_pos_ratio * np.sum(
+        positive_mask, -1).astype('int32'), loss.max_num_negatives)
+    negative_losses = class_loss * negative_mask
+    target = [np.sum(tf.nn.top_k(sample_losses, num_samples)[0])
+              for sample_losses, num_samples in zip(
+                  negative_losses, num_negatives)]
+    num_positives = max(1.0, np.sum(positive_mask))
+    target = np.array(target) * len(y_true) / num_positives
+    value = loss.negative_classification(y_true, y_pred)
+    assert np.allclose(value, target, rtol=1e-5)
+
+
+def test_multiboxloss_equals_sum_of_components(batch_targets, loss):
+    y_true, y_pred = batch_targets
+    total_loss = loss.compute_loss(y_true, y_pred)
+    components = (loss.localization(y_true, y_pred) +
+                  loss.positive_classification(y_true, y_pred) +
+                  loss.negative_classification(y_true, y_pred))
+    assert np.allclose(total_loss, components, rtol=1e-5)
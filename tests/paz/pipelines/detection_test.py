@@ -166,3 +166,18 @@ def test_boxes_DetectFaceKeypointNet2D32(image_with_faces,
     cv2.setRNGSeed(777)
     detector = DetectFaceKeypointNet2D32()
     assert_inferences(detector, image_with_faces, boxes_FaceKeypointNet2D32)
+
+
+def test_SSD300VOC_call_batch(image_with_everyday_objects, image_with_tools):
+    detector = SSD300VOC()
+    images = [image_with_everyday_objects, image_with_tools]
+    batch_inferences = detector.call_batch([image.copy() for image in images])
+    assert len(batch_inferences) == len(images)
+    for image, inferences in zip(images, batch_inferences):
+        predicted_boxes2D = detector(image.copy())['boxes2D']
+        assert len(predicted_boxes2D) == len(inferences['boxes2D'])
+        for box2D, predicted_box2D in zip(
+                inferences['boxes2D'], predicted_boxes2D):
+            assert np.allclose(box2D.coordinates, predicted_box2D.coordinates)
+            assert np.allclose(box2D.score, predicted_box2D.score)
+            assert (box2D.class_name == predicted_box2D.class_name)
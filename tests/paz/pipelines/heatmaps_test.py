@@ -0,0 +1,53 @@
+import pytest
+import numpy as np
+from tensorflow.keras.layers import Input, Conv2D
+from tensorflow.keras.models import Model
+
+from paz import processors as pr
+from paz.datasets.coco import FLIP_CONFIG
+from paz.pipelines import GetHeatmapsAndTags
+
+
+@pytest.fixture
+def model():
+    inputs = Input((32, 48, 3))
+    x = Conv2D(4, 3, 2, 'same', activation='relu')(inputs)
+    high_resolution_outputs = Conv2D(17, 3, 1, 'same')(x)
+    low_resolution_outputs = Conv2D(34, 3, 2, 'same')(x)
+    return Model(inputs, [low_resolution_outputs, high_resolution_outputs])
+
+
+def test_GetHeatmapsAndTags_flip_test_in_one_batch(model):
+    flipped_keypoint_order = FLIP_CONFIG['COCO']
+    image = np.random.rand(1, 32, 48, 3).astype('float32')
+    get_heatmaps_and_tags = GetHeatmapsAndTags(
+        model, flipped_keypoint_order, True, False)
+    heatmaps, tags = get_heatmaps_and_tags(image)
+
+    predict = pr.SequentialProcessor([
+        pr.Predict(model), pr.TransposeOutput([0, 3, 1, 2]),
+        pr.ScaleOutput(2)])
+    outputs = predict(image)
+    flipped_outputs = predict(np.flip(image, [2]))
+    target_heatmaps = [
+        pr.GetHeatmaps(flipped_keypoint_order)(outputs, False),
+        pr.GetHeatmaps(flipped_keypoint_order)(flipped_outputs, True)]
+    target_tags = [
+        pr.GetTags(flipped_keypoint_order)(outputs, False),
+        pr.GetTags(flipped_keypoint_order)(flipped_outputs, True)]
+    scale = pr.ScaleOutput(2, full_scaling=True)
+    target_heatmaps = scale(target_heatmaps)
+    target_tags = scale(target_tags)
+    assert len(heatmaps) == len(tags) == 2
+    for values, targets in zip(heatmaps + tags, target_heatmaps + target_tags):
+        assert values.shape == (1, 17, 32, 48)
+        assert np.allclose(values, targets, atol=1e-5)
+
+
+def test_GetHeatmapsAndTags_without_flip(model):
+    get_heatmaps_and_tags = pr.SequentialProcessor([
+        GetHeatmapsAndTags(model, FLIP_CONFIG['COCO'], False, False),
+        pr.AggregateResults(False)])
+    heatmaps, tags = get_heatmaps_and_tags(np.random.rand(1, 32, 48, 3))
+    assert heatmaps.shape == (1, 17, 32, 48)
+    assert tags.shape == (1, 17, 32, 48, 1)
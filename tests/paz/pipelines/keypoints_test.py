@@ -131,3 +131,23 @@ def test_FaceKeypointNet2D32(image_with_face, keypoints_FaceKeypointNet2D32):
     predicted_keypoints = inferences['keypoints']
     assert len(predicted_keypoints) == len(labelled_keypoints)
     assert np.allclose(predicted_keypoints, labelled_keypoints)
+
+
+def test_EstimateKeypoints2D_call_batch():
+    from tensorflow.keras.layers import Input, Conv2D, Flatten, Dense
+    from tensorflow.keras.layers import Reshape
+    from tensorflow.keras.models import Model
+    from paz import processors as pr
+    from paz.pipelines import EstimateKeypoints2D
+    inputs = Input((24, 24, 1))
+    x = Flatten()(Conv2D(2, 3, 2)(inputs))
+    outputs = Reshape((5, 2))(Dense(10, activation='tanh')(x))
+    model = Model(inputs, outputs)
+    estimate = EstimateKeypoints2D(model, 5, False, 3, pr.RGB2GRAY)
+    images = [(np.random.rand(*shape, 3) * 255).astype('uint8')
+              for shape in [(40, 50), (70, 70), (65, 30)]]
+    targets = [estimate(image.copy())['keypoints'] for image in images]
+    values = estimate.call_batch([image.copy() for image in images])
+    assert len(values) == len(images)
+    for value, target in zip(values, targets):
+        assert np.allclose(value['keypoints'], target, atol=1e-5)
@@ -26,3 +26,24 @@ def test_random_sample_crop_pass_by_reference(boxes_with_label):
     crop = pr.RandomSampleCrop(probability=1.0)
     crop(np.ones((300, 300, 3)), boxes_with_label)
     assert np.all(initial_boxes_with_label == boxes_with_label)
+
+
+def test_random_expand_crop_flip_resize_matches_sequential(boxes_with_label):
+    image = np.zeros((500, 400, 3), dtype=np.uint8)
+    image[100:300, 50:250] = 255
+    boxes = pr.ToNormalizedBoxCoordinates()(image, boxes_with_label)[1]
+    sequential = pr.SequentialProcessor([
+        pr.ToImageBoxCoordinates(), pr.Expand(mean=(1, 2, 3)),
+        pr.RandomSampleCrop(), pr.RandomFlipBoxesLeftRight(),
+        pr.ToNormalizedBoxCoordinates(),
+        pr.ControlMap(pr.ResizeImage((64, 64)), [0], [0])])
+    augment = pr.RandomExpandCropFlipResize(64, mean=(1, 2, 3))
+    for seed in range(10):
+        np.random.seed(seed)
+        target_image, target_boxes = sequential(image, boxes.copy())
+        np.random.seed(seed)
+        augmented_image, augmented_boxes = augment(image, boxes.copy())
+        assert augmented_image.shape == (64, 64, 3)
+        assert np.allclose(augmented_boxes, target_boxes)
+        differences = np.abs(augmented_image - target_image.astype(int))
+        assert np.mean(differences > 2) < 0.05
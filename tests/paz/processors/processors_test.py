@@ -2,6 +2,8 @@ import pytest
 import numpy as np
 
 import paz.processors as pr
+from paz.abstract import SequentialProcessor, Box2D
+from paz.models.detection.utils import create_prior_boxes
 
 
 @pytest.fixture
@@ -110,3 +112,171 @@ def test_Scale(object_sizes):
     values = np.array([1.0, 0.5, 0.25])
     scaled_values = scale(values)
     assert np.allclose(scaled_values, values * object_sizes)
+
+
+@pytest.fixture
+def keypoint_detections():
+    random_state = np.random.RandomState(777)
+    num_keypoints, k = 17, 20
+    person_tags = random_state.randint(0, 25, k)
+    detections = np.zeros((num_keypoints, k, 5))
+    detections[:, :, :2] = random_state.randint(0, 128, (num_keypoints, k, 2))
+    detections[:, :, 2] = random_state.rand(num_keypoints, k)
+    tag_noise = random_state.randint(-1, 2, (num_keypoints, k, 2))
+    detections[:, :, 3:] = person_tags[None, :, None] + tag_noise
+    return detections
+
+
+@pytest.mark.parametrize('tag_thresh', [0.5, 1, 3])
+def test_GroupKeypointsByTag_vectorized(keypoint_detections, tag_thresh):
+    keypoint_order = [0, 1, 2, 3, 4, 5, 6, 11, 12, 7, 8, 9, 10, 13, 14, 15, 16]
+    group_with_dictionaries = pr.GroupKeypointsByTag(
+        keypoint_order, tag_thresh, 0.2, vectorized=False)
+    group_with_arrays = pr.GroupKeypointsByTag(
+        keypoint_order, tag_thresh, 0.2, max_num_people=2, vectorized=True)
+    grouped_keypoints = group_with_dictionaries(keypoint_detections)[0]
+    vectorized_grouped_keypoints = group_with_arrays(keypoint_detections)[0]
+    assert np.array_equal(grouped_keypoints, vectorized_grouped_keypoints)
+
+
+@pytest.fixture
+def grouped_keypoints(keypoint_detections):
+    keypoint_order = [0, 1, 2, 3, 4, 5, 6, 11, 12, 7, 8, 9, 10, 13, 14, 15, 16]
+    group = pr.GroupKeypointsByTag(keypoint_order, 1, 0.2)
+    return group(keypoint_detections)
+
+
+@pytest.fixture
+def heatmaps_and_tags():
+    random_state = np.random.RandomState(777)
+    heatmaps = random_state.rand(1, 17, 128, 128)
+    heatmaps[heatmaps < 0.5] = 0.0
+    tags = 25 * random_state.rand(1, 17, 128, 128, 2)
+    return heatmaps, tags
+
+
+def test_AdjustKeypointsLocations_vectorized(
+        heatmaps_and_tags, grouped_keypoints):
+    heatmaps = heatmaps_and_tags[0]
+    adjust_per_keypoint = pr.AdjustKeypointsLocations(vectorized=False)
+    adjust_with_arrays = pr.AdjustKeypointsLocations(vectorized=True)
+    keypoints = adjust_per_keypoint(
+        heatmaps, [grouped_keypoints[0].copy()])[0]
+    vectorized_keypoints = adjust_with_arrays(
+        heatmaps, [grouped_keypoints[0].copy()])[0]
+    assert np.array_equal(keypoints, vectorized_keypoints)
+
+
+@pytest.mark.parametrize('tag_dimension', [1, 2])
+def test_RefineKeypointsLocations_vectorized(
+        heatmaps_and_tags, grouped_keypoints, tag_dimension):
+    heatmaps, tags = heatmaps_and_tags
+    tags = tags[0, ..., :tag_dimension]
+    refine_per_keypoint = pr.RefineKeypointsLocations(vectorized=False)
+    refine_with_arrays = pr.RefineKeypointsLocations(
+        vectorized=True, max_elements=2**16)
+    keypoints = refine_per_keypoint(
+        heatmaps[0], tags, grouped_keypoints[0].copy())
+    vectorized_keypoints = refine_with_arrays(
+        heatmaps[0], tags, grouped_keypoints[0].copy())
+    assert np.array_equal(keypoints, vectorized_keypoints)
+
+
+def test_MatchAndEncodeBoxes_batch():
+    prior_boxes = create_prior_boxes('VOC')
+    preprocess_boxes = SequentialProcessor([
+        pr.MatchBoxes(prior_boxes, 0.5),
+        pr.EncodeBoxes(prior_boxes),
+        pr.BoxClassToOneHotVector(21)])
+    match_and_encode = pr.MatchAndEncodeBoxes(21, prior_boxes, 0.5)
+    batch = [np.array([[0.1, 0.2, 0.4, 0.6, 3.0], [0.5, 0.5, 0.9, 0.8, 7.0]]),
+             np.array([[0.0, 0.0, 1.0, 1.0, 20.0]])]
+    targets = match_and_encode(batch)
+    assert targets.shape == (2, len(prior_boxes), 4 + 21)
+    for boxes, sample_targets in zip(batch, targets):
+        target = preprocess_boxes(boxes.copy()).astype(np.float32)
+        assert np.array_equal(target, sample_targets)
+        assert np.array_equal(match_and_encode(boxes), sample_targets)
+
+
+def test_Boxes2D_postprocessing_matches_Box2D_lists():
+    class_names = ['background', 'cat', 'dog', 'bird']
+    x_min, y_min = np.random.uniform(0, 0.7, (2, 4, 10))
+    width, height = np.random.uniform(0.05, 0.3, (2, 4, 10))
+    scores = np.random.uniform(0, 1, (4, 10))
+    boxes = np.stack([x_min, y_min, x_min + width, y_min + height, scores], 2)
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    draw = pr.DrawBoxes2D(class_names, with_score=False)
+
+    boxes2D = pr.FilterBoxes(class_names, 0.3)(boxes)
+    columnar_boxes2D = pr.FilterBoxes(class_names, 0.3, True)(boxes)
+    for function in [pr.DenormalizeBoxes2D(), pr.ClipBoxes2D()]:
+        boxes2D = function(image, boxes2D)
+        columnar_boxes2D = function(image, columnar_boxes2D)
+    for function in [pr.SquareBoxes2D(), pr.OffsetBoxes2D((0.1, 0.2))]:
+        boxes2D = function(boxes2D)
+        columnar_boxes2D = function(columnar_boxes2D)
+    boxes2D = pr.ClipBoxes2D()(image, boxes2D)
+    columnar_boxes2D = pr.ClipBoxes2D()(image, columnar_boxes2D)
+
+    assert np.issubdtype(columnar_boxes2D.coordinates.dtype, np.integer)
+    crops = pr.CropBoxes2D()(image, boxes2D)
+    columnar_crops = pr.CropBoxes2D()(image, columnar_boxes2D)
+    assert len(crops) == len(columnar_crops)
+    for crop, columnar_crop in zip(crops, columnar_crops):
+        assert crop.shape == columnar_crop.shape
+
+    filter_class = pr.FilterClassBoxes2D(['cat', 'bird'])
+    for function in [pr.RoundBoxes2D(), filter_class]:
+        boxes2D = function(boxes2D)
+        columnar_boxes2D = function(columnar_boxes2D)
+    assert len(boxes2D) == len(columnar_boxes2D)
+    for box2D, view in zip(boxes2D, columnar_boxes2D):
+        assert np.array_equal(box2D.coordinates, view.coordinates)
+        assert box2D.score == view.score
+        assert box2D.class_name == view.class_name
+    image_A = draw(image.copy(), boxes2D)
+    image_B = draw(image.copy(), columnar_boxes2D)
+    assert np.array_equal(image_A, image_B)
+
+
+def test_ScaleOutput_resizes_every_sample_and_map():
+    outputs = [np.random.rand(2, 20, 12, 16).astype('float32'),
+               np.random.rand(2, 4, 24, 32).astype('float32')]
+    first_sample = [output[:1].copy() for output in outputs]
+    second_map = outputs[0][1, 3].copy()
+    scaled = pr.ScaleOutput(2, full_scaling=True)(outputs)
+    scaled_sample = pr.ScaleOutput(2, full_scaling=True)(first_sample)
+    assert scaled[0].shape == (2, 20, 24, 32)
+    assert scaled[1].shape == (2, 4, 48, 64)
+    for values, sample_values in zip(scaled, scaled_sample):
+        assert np.allclose(values[:1], sample_values)
+    assert np.allclose(scaled[0][1, 3], pr.ResizeImage((32, 24))(
+        second_map), atol=1e-6)
+
+
+def test_PredictBoxes2D_uses_call_batch():
+    class CropShapes(pr.Processor):
+        def __init__(self):
+            super(CropShapes, self).__init__()
+            self.num_calls = 0
+
+        def call(self, image, box2D):
+            return image.shape[:2], box2D.class_name
+
+        def call_batch(self, images, boxes2D):
+            self.num_calls = self.num_calls + 1
+            return [self.call(image, box2D)
+                    for image, box2D in zip(images, boxes2D)]
+
+    image = np.zeros((100, 120, 3))
+    boxes2D = [Box2D([10, 20, 50, 40], 1.0, 'a'),
+               Box2D([0, 0, 30, 90], 1.0, 'b')]
+    crop_shapes = CropShapes()
+    predict_boxes2D = pr.PredictBoxes2D(crop_shapes, with_boxes2D=True)
+    targets = [((20, 40), 'a'), ((90, 30), 'b')]
+    assert predict_boxes2D(image, boxes2D) == targets
+    assert crop_shapes.num_calls == 1
+    assert predict_boxes2D(image, []) == []
+    predict_boxes2D = pr.PredictBoxes2D(lambda crop: crop.shape[:2])
+    assert predict_boxes2D(image, boxes2D) == [(20, 40), (90, 30)]
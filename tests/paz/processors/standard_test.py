@@ -1,5 +1,11 @@
+import pytest
+import numpy as np
+from tensorflow.keras.layers import Input, Dense
+from tensorflow.keras.models import Model
+
 from paz.abstract import SequentialProcessor, Processor
 from paz.processors import ControlMap, StochasticProcessor, Stochastic
+from paz.processors import Predict
 
 
 class Sum(Processor):
@@ -161,6 +167,38 @@ def test_stochastic_functions_with_probability():
         assert stochastic_add_one(10.0) in [10.0, 11.0]
 
 
+@pytest.fixture
+def dense_model():
+    inputs = Input((4,))
+    outputs = [Dense(3)(inputs), Dense(2)(inputs)]
+    return Model(inputs, outputs)
+
+
+@pytest.mark.parametrize('backend', ['auto', 'call', 'function'])
+def test_predict_backends(dense_model, backend):
+    x = np.random.rand(5, 4)
+    predict = Predict(dense_model, backend=backend)
+    values = predict(x)
+    targets = dense_model.predict(x)
+    assert len(values) == len(targets)
+    for value, target in zip(values, targets):
+        assert isinstance(value, np.ndarray)
+        assert np.allclose(value, target, atol=1e-6)
+
+
+def test_predict_backend_auto_without_keras_model():
+    class DoubleModel(object):
+        def predict(self, x):
+            return 2.0 * x
+    predict = Predict(DoubleModel(), MultiplyByFactor(0.5))
+    assert predict(10.0) == 10.0
+
+
+def test_predict_invalid_backend(dense_model):
+    with pytest.raises(ValueError):
+        Predict(dense_model, backend='interpreter')
+
+
 # test_controlmap_reduction_and_selection_to_arg_1()
 # test_controlmap_reduction_and_selection_to_arg_2()
 # test_controlmap_reduction_and_flip()
@@ -181,3 +219,16 @@ print(pipeline(*sample))
 # print(pipeline(5, 5))
 # print(pipeline(5, 5, 6))
 '''
+
+
+@pytest.mark.parametrize('backend', ['predict', 'function'])
+def test_predict_call_batch(dense_model, backend):
+    inputs = [np.random.rand(4) for _ in range(3)]
+    predict = Predict(dense_model, lambda x: np.expand_dims(x, 0),
+                      lambda y: [y[0][0], y[1][0]], backend=backend)
+    values = predict.call_batch(inputs)
+    assert len(values) == len(inputs)
+    for x, value in zip(inputs, values):
+        for sample_value, target in zip(value, predict(x)):
+            assert np.allclose(sample_value, target, atol=1e-6)
+    assert predict.call_batch([]) == []